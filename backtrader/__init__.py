@@ -60,6 +60,7 @@ from .writer import *
 from .signal import *
 
 from .cerebro import *
+from .optscheduler import *
 from .timer import *
 from .flt import *
 
@@ -175,6 +175,24 @@ class Analyzer(with_metaclass(MetaAnalyzer, object)):
 
         self.notify_order(order)
 
+    def _notifiers(self, kind):
+        '''Returns the methods which ``_notify_{kind}`` would end up calling
+        for this analyzer and its children (in the same order), leaving out
+        the ``notify_{kind}`` methods which are not overridden'''
+        name = '_notify_' + kind
+        if getattr(self.__class__, name) != getattr(Analyzer, name):
+            return [getattr(self, name)]  # custom dispatching, respect it
+
+        notifiers = list()
+        for child in self._children:
+            notifiers.extend(child._notifiers(kind))
+
+        name = 'notify_' + kind
+        if getattr(self.__class__, name) != getattr(Analyzer, name):
+            notifiers.append(getattr(self, name))
+
+        return notifiers
+
     def _nextstart(self):
         for child in self._children:
             child._nextstart()
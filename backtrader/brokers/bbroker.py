@@ -21,18 +21,262 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+import bisect
 import collections
 import datetime
+import itertools
 
 import backtrader as bt
 from backtrader.comminfo import CommInfoBase
 from backtrader.order import Order, BuyOrder, SellOrder
 from backtrader.position import Position
+from backtrader.utils.dateintern import date2numarray
 from backtrader.utils.py3 import string_types, integer_types
 
+try:
+    import numpy as np
+except ImportError:
+    np = None  # the datetimes of the histories are converted one by one
+
 __all__ = ['BackBroker', 'BrokerBack']
 
 
+def _histdatetime(dt):
+    '''Converts the datetime of an element of a history (a ``date``, a
+    ``datetime`` or a string with format YYYY-MM-DD[THH:MM:SS[.us]]) to a
+    ``datetime``'''
+    if isinstance(dt, string_types):
+        dtfmt = '%Y-%m-%d'
+        if 'T' in dt:
+            dtfmt += 'T%H:%M:%S'
+            if '.' in dt:
+                dtfmt += '.%f'
+        return datetime.datetime.strptime(dt, dtfmt)
+
+    if isinstance(dt, datetime.datetime):
+        return dt
+
+    if isinstance(dt, datetime.date):
+        return datetime.datetime(year=dt.year, month=dt.month, day=dt.day)
+
+    return dt
+
+
+def _histcolumns(hist, names, optional=()):
+    '''Returns the columns ``names`` of a history in columnar form as lists
+    (``None`` for the ``optional`` ones not present) or ``None`` if ``hist``
+    is an iterable of elements.
+
+    The columnar form is a mapping of sequences (``dict``, ...) or a
+    ``pandas.DataFrame``, in which the ``datetime`` may also be the index.
+    The datetimes are converted with ``_histdatetime``'''
+    if hasattr(hist, 'columns') and hasattr(hist, 'index'):  # DataFrame
+        if names[0] not in hist.columns:
+            hist = hist.reset_index()
+            hist = hist.rename(columns={hist.columns[0]: names[0]})
+    elif not hasattr(hist, 'keys'):
+        return None  # iterable of elements
+
+    columns = list()
+    for name in names:
+        try:
+            column = hist[name]
+        except KeyError:
+            if name not in optional:
+                raise
+
+            columns.append(None)
+            continue
+
+        column = getattr(column, 'values', column)  # pandas.Series
+        if np is not None and np.asarray(column).dtype.kind == 'M':
+            # datetime64 values: convert all of them to datetime at once
+            column = np.asarray(column).astype('datetime64[us]').tolist()
+        elif hasattr(column, 'tolist'):
+            column = column.tolist()  # numpy scalars to python
+        else:
+            column = list(column)
+
+        columns.append(column)
+
+    columns[0] = [_histdatetime(dt) for dt in columns[0]]
+    return columns
+
+
+class _OrderHistory(object):
+    '''History of orders given in columnar form (see ``_histcolumns``)
+
+    The datetimes are converted only once to the numeric format of the target
+    data of each order (when the datas are running, to have their timezones)
+    and the orders are bucketed per data. The orders to execute with the
+    current bar of a data are found with a binary search from the position of
+    the last executed one.
+
+    The orders due at the same time are executed in the order of the history
+    '''
+    def __init__(self, dts, sizes, prices, dkeys, notify):
+        self.columns = (dts, sizes, prices, dkeys)
+        self.notify = notify
+        self.buckets = None  # [data, nums, rows, cursor]
+
+    def _bucketize(self, broker):
+        dts, sizes, prices, dkeys = self.columns
+        if dkeys is None:
+            dkeys = [None] * len(dts)
+
+        buckets = collections.OrderedDict()
+        for row, dkey in enumerate(dkeys):
+            d = broker._histdata(dkey)
+            buckets.setdefault(d, []).append(row)
+
+        self.buckets = list()
+        for d, rows in buckets.items():
+            ddts = [dts[row] for row in rows]
+            if np is not None:
+                ddts = np.array(ddts, dtype='datetime64[us]')
+                nums = date2numarray(ddts, tz=d._tz).tolist()
+            else:
+                nums = [d.date2num(dt) for dt in ddts]
+
+            self.buckets.append([d, nums, rows, 0])
+
+    def due(self, broker):
+        '''Returns the rows of the orders which can be executed and their
+        target datas'''
+        if self.buckets is None:
+            self._bucketize(broker)
+
+        rows = list()
+        for bucket in self.buckets:
+            d, nums, drows, cursor = bucket
+            if not len(d):
+                continue  # may start later as other data feeds
+
+            end = bisect.bisect_right(nums, d.datetime[0], cursor)
+            if end > cursor:
+                rows.extend((row, d) for row in drows[cursor:end])
+                bucket[3] = end
+
+        rows.sort()  # back to the order of the history
+        return rows
+
+
+class _OrderBook(object):
+    '''Pending orders of the broker, kept in the order in which they were
+    accepted, which is the order in which they are evaluated.
+
+    Resting ``Limit``, ``Stop`` and ``StopLimit`` orders (with no expiration)
+    are indexed per data by their trigger price. An order which triggers when
+    the ``low`` of the bar goes down to its price (buy limit, sell stop) is in
+    the ``low`` book and one which triggers when the ``high`` goes up to its
+    price (sell limit, buy stop) in the ``high`` book. Those not reached by
+    the bar can do nothing and are not evaluated. The rest of the orders are
+    evaluated with each bar
+    '''
+    def __init__(self):
+        self.orders = dict()  # ref -> (seq, order)
+        self.seq = 0  # acceptance counter
+        self.always = dict()  # ref -> (seq, order), evaluated on each bar
+        self.lows = collections.defaultdict(list)  # data -> [(price, seq)]
+        self.highs = collections.defaultdict(list)  # data -> [(price, seq)]
+        self.booked = dict()  # seq -> (order, book, entry)
+        self.cursor = None  # seq of the order being evaluated
+
+    def __len__(self):
+        return len(self.orders)
+
+    def __iter__(self):
+        # while evaluating, those already seen have gone to the end
+        cursor = self.cursor
+        key = (lambda x: (x[0] < cursor, x[0])) if cursor else \
+            (lambda x: x[0])
+        return (o for seq, o in sorted(self.orders.values(), key=key))
+
+    def __contains__(self, order):
+        return order.ref in self.orders
+
+    def append(self, order, seq=None):
+        '''Adds ``order`` at the end or back to its place (``seq``)'''
+        if seq is None:
+            seq = self.seq = self.seq + 1
+
+        self.orders[order.ref] = seq, order
+
+        trigger = self._trigger(order)
+        if trigger is None:
+            self.always[order.ref] = seq, order
+            return
+
+        islow, price = trigger
+        book = (self.lows if islow else self.highs)[order.data]
+        entry = (price, seq)
+        bisect.insort(book, entry)
+        self.booked[seq] = order, book, entry
+
+    def remove(self, order):
+        '''Removes ``order`` and returns its place (``None`` if not
+        pending)'''
+        seq, order = self.orders.pop(order.ref, (None, order))
+        if seq is None:
+            return None
+
+        if self.always.pop(order.ref, None) is None:
+            order, book, entry = self.booked.pop(seq)
+            del book[bisect.bisect_left(book, entry)]
+
+        return seq
+
+    @staticmethod
+    def _trigger(order):
+        '''Returns whether ``order`` triggers with the ``low`` and the trigger
+        price or ``None`` if it has to be evaluated with each bar'''
+        if order.valid:  # can expire
+            return None
+
+        exectype = order.exectype
+        if exectype == Order.Limit:
+            islow, price = order.isbuy(), order.created.price
+        elif exectype == Order.Stop:
+            islow, price = order.issell(), order.created.price
+        elif exectype == Order.StopLimit:
+            if order.triggered:  # a limit order
+                islow, price = order.isbuy(), order.created.pricelimit
+            else:
+                islow, price = order.issell(), order.created.price
+        else:
+            return None
+
+        if price is None or price != price:
+            return None
+
+        return islow, price
+
+    def candidates(self, prices):
+        '''Returns the ``(seq, order)`` pairs of the orders to evaluate, in
+        the order in which they were accepted. ``prices`` returns the open,
+        high and low prices of a data'''
+        inf = float('inf')
+        cands = list(self.always.values())
+        for datas, islow in ((self.lows, True), (self.highs, False)):
+            for data, book in datas.items():
+                if not book:
+                    continue
+
+                popen, phigh, plow = prices(data)
+                if not (plow <= popen <= phigh):  # no assumptions, all
+                    entries = book
+                elif islow:
+                    entries = book[bisect.bisect_left(book, (plow,)):]
+                else:
+                    entries = book[:bisect.bisect_right(book, (phigh, inf))]
+
+                booked = self.booked
+                cands.extend((seq, booked[seq][0]) for price, seq in entries)
+
+        cands.sort(key=lambda x: x[0])
+        return cands
+
+
 class BackBroker(bt.BrokerBase):
     '''Broker Simulator
 
@@ -268,10 +512,13 @@ class BackBroker(bt.BrokerBase):
         self._unrealized = 0.0  # no open position
 
         self.orders = list()  # will only be appending
-        self.pending = collections.deque()  # popleft and append(right)
+        self.pending = _OrderBook()  # accepted and not yet done
         self._toactivate = collections.deque()  # to activate in next cycle
 
         self.positions = collections.defaultdict(Position)
+        self._posrank = dict()  # order of the datas in positions
+        self._posranks = []  # sorted ranks of the non-zero positions
+        self._positems = []  # non-zero positions in the order of positions
         self.d_credit = collections.defaultdict(float)  # credit per data
         self.notifs = collections.deque()
 
@@ -396,9 +643,7 @@ class BackBroker(bt.BrokerBase):
     fundvalue = property(get_fundvalue)
 
     def cancel(self, order, bracket=False):
-        try:
-            self.pending.remove(order)
-        except ValueError:
+        if self.pending.remove(order) is None:
             # If the list didn't have the element we didn't cancel anything
             return False
 
@@ -426,6 +671,38 @@ class BackBroker(bt.BrokerBase):
     def get_value_lever(self, datas=None, mkt=False):
         return self.get_value(datas=datas, mkt=mkt)
 
+    def _posupdate(self, data, position):
+        '''Keeps the index of non-zero positions up to date after the size of
+        the ``position`` of ``data`` has changed
+
+        The open positions are kept in the order of ``positions`` (the sums
+        in ``_get_value`` are done in the same order as walking all of them)
+        by inserting/removing them by rank with ``bisect``
+
+        Zero positions are not in the index and are not valued. A flat data
+        with a ``NaN`` close does therefore not turn the portfolio value into
+        ``NaN`` (as it did when walking all positions)
+        '''
+        rank = self._posrank.get(data)
+        if rank is None:  # positions only grows: rank the new datas
+            newdatas = itertools.islice(self.positions, len(self._posrank),
+                                        None)
+            for d in newdatas:
+                self._posrank[d] = len(self._posrank)
+
+            rank = self._posrank[data]
+
+        ranks = self._posranks
+        idx = bisect.bisect_left(ranks, rank)
+        isopen = idx < len(ranks) and ranks[idx] == rank
+        if position:
+            if not isopen:
+                ranks.insert(idx, rank)
+                self._positems.insert(idx, (data, position))
+        elif isopen:
+            del ranks[idx]
+            del self._positems[idx]
+
     def _get_value(self, datas=None, lever=False):
         pos_value = 0.0
         pos_value_unlever = 0.0
@@ -436,9 +713,13 @@ class BackBroker(bt.BrokerBase):
             self._fundshares += c / self._fundval
             self.cash += c
 
-        for data in datas or self.positions:
+        if datas:
+            positems = [(data, self.positions[data]) for data in datas]
+        else:
+            positems = self._positems  # zero positions have no value
+
+        for data, position in positems:
             comminfo = self.getcommissioninfo(data)
-            position = self.positions[data]
             # use valuesize:  returns raw value, rather than negative adj val
             if not self.p.shortcash:
                 dvalue = comminfo.getvalue(position, data.close[0])
@@ -619,12 +900,11 @@ class BackBroker(bt.BrokerBase):
         ocoref = self._ocos.get(parentref, None)
         ocol = self._ocol.pop(ocoref, None)
         if ocol:
-            for i in range(len(self.pending) - 1, -1, -1):
-                o = self.pending[i]
-                if o is not None and o.ref in ocol:
-                    del self.pending[i]
-                    o.cancel()
-                    self.notify(o)
+            ocol = set(ocol)
+            for o in reversed([x for x in self.pending if x.ref in ocol]):
+                self.pending.remove(o)
+                o.cancel()
+                self.notify(o)
 
     def _ocoize(self, order, oco):
         oref = order.ref
@@ -637,6 +917,12 @@ class BackBroker(bt.BrokerBase):
             self._ocol[ocoref].append(oref)  # add to group
 
     def add_order_history(self, orders, notify=True):
+        columns = _histcolumns(orders, ('datetime', 'size', 'price', 'data'),
+                               optional=('data',))
+        if columns is not None:
+            self._userhist.append(_OrderHistory(*columns, notify=notify))
+            return
+
         oiter = iter(orders)
         o = next(oiter, None)
         self._userhist.append([o, oiter, notify])
@@ -644,6 +930,12 @@ class BackBroker(bt.BrokerBase):
     def set_fund_history(self, fund):
         # iterable with the following pro item
         # [datetime, share_value, net asset value]
+        # or the columns "datetime", "share_value", "net_asset_value"
+        columns = _histcolumns(fund,
+                               ('datetime', 'share_value', 'net_asset_value'))
+        if columns is not None:
+            fund = zip(*columns)  # datetimes already converted
+
         fiter = iter(fund)
         f = list(next(fiter))  # must not be empty
         self._fundhist = [f, fiter]
@@ -817,6 +1109,7 @@ class BackBroker(bt.BrokerBase):
 
             # do a real position update if something was executed
             position.update(execsize, price, data.datetime.datetime())
+            self._posupdate(data, position)
 
             if closed and self.p.int2pnl:  # Assign accumulated interest data
                 closedcomm += self.d_credit.pop(data, 0.0)
@@ -1034,9 +1327,8 @@ class BackBroker(bt.BrokerBase):
 
         return None  # no price can be returned
 
-    def _try_exec(self, order):
-        data = order.data
-
+    def _orderprices(self, data):
+        '''Returns the open, high and low prices to execute orders'''
         popen = getattr(data, 'tick_open', None)
         if popen is None:
             popen = data.open[0]
@@ -1046,6 +1338,13 @@ class BackBroker(bt.BrokerBase):
         plow = getattr(data, 'tick_low', None)
         if plow is None:
             plow = data.low[0]
+
+        return popen, phigh, plow
+
+    def _try_exec(self, order):
+        data = order.data
+
+        popen, phigh, plow = self._orderprices(data)
         pclose = getattr(data, 'tick_close', None)
         if pclose is None:
             pclose = data.close[0]
@@ -1083,21 +1382,7 @@ class BackBroker(bt.BrokerBase):
         if not f:
             return self._fhistlast
 
-        dt = f[0]  # date/datetime instance
-        if isinstance(dt, string_types):
-            dtfmt = '%Y-%m-%d'
-            if 'T' in dt:
-                dtfmt += 'T%H:%M:%S'
-                if '.' in dt:
-                    dtfmt += '.%f'
-            dt = datetime.datetime.strptime(dt, dtfmt)
-            f[0] = dt  # update value
-
-        elif isinstance(dt, datetime.datetime):
-            pass
-        elif isinstance(dt, datetime.date):
-            dt = datetime.datetime(year=dt.year, month=dt.month, day=dt.day)
-            f[0] = dt  # Update the value
+        f[0] = dt = _histdatetime(f[0])  # date/datetime instance
 
         # Synchronization with the strategy is not possible because the broker
         # is called before the strategy advances. The 2 lines below would do it
@@ -1110,8 +1395,40 @@ class BackBroker(bt.BrokerBase):
 
         return self._fhistlast
 
+    def _histdata(self, dataidx):
+        '''Returns the target data of an order of a history'''
+        if dataidx is None:
+            return self.cerebro.datas[0]
+        elif isinstance(dataidx, integer_types):
+            return self.cerebro.datas[dataidx]
+        # assume string
+        return self.cerebro.datasbyname[dataidx]
+
+    def _histexec(self, d, size, price, notify):
+        owner = self.cerebro.runningstrats[0]
+        if size > 0:
+            self.buy(owner=owner, data=d,
+                     size=size, price=price,
+                     exectype=Order.Historical,
+                     histnotify=notify,
+                     _checksubmit=False)
+
+        elif size < 0:
+            self.sell(owner=owner, data=d,
+                      size=abs(size), price=price,
+                      exectype=Order.Historical,
+                      histnotify=notify,
+                      _checksubmit=False)
+
     def _process_order_history(self):
         for uhist in self._userhist:
+            if isinstance(uhist, _OrderHistory):
+                dts, sizes, prices, dkeys = uhist.columns
+                for row, d in uhist.due(self):
+                    self._histexec(d, sizes[row], prices[row], uhist.notify)
+
+                continue
+
             uhorder, uhorders, uhnotify = uhist
             while uhorder is not None:
                 uhorder = list(uhorder)  # to support assignment (if tuple)
@@ -1120,52 +1437,15 @@ class BackBroker(bt.BrokerBase):
                 except IndexError:
                     dataidx = None  # Field not present, use default
 
-                if dataidx is None:
-                    d = self.cerebro.datas[0]
-                elif isinstance(dataidx, integer_types):
-                    d = self.cerebro.datas[dataidx]
-                else:  # assume string
-                    d = self.cerebro.datasbyname[dataidx]
-
+                d = self._histdata(dataidx)
                 if not len(d):
                     break  # may start later as oter data feeds
 
-                dt = uhorder[0]  # date/datetime instance
-                if isinstance(dt, string_types):
-                    dtfmt = '%Y-%m-%d'
-                    if 'T' in dt:
-                        dtfmt += 'T%H:%M:%S'
-                        if '.' in dt:
-                            dtfmt += '.%f'
-                    dt = datetime.datetime.strptime(dt, dtfmt)
-                    uhorder[0] = dt
-                elif isinstance(dt, datetime.datetime):
-                    pass
-                elif isinstance(dt, datetime.date):
-                    dt = datetime.datetime(year=dt.year,
-                                           month=dt.month,
-                                           day=dt.day)
-                    uhorder[0] = dt
-
+                uhorder[0] = dt = _histdatetime(uhorder[0])
                 if dt > d.datetime.datetime():
                     break  # cannot execute yet 1st in queue, stop processing
 
-                size = uhorder[1]
-                price = uhorder[2]
-                owner = self.cerebro.runningstrats[0]
-                if size > 0:
-                    o = self.buy(owner=owner, data=d,
-                                 size=size, price=price,
-                                 exectype=Order.Historical,
-                                 histnotify=uhnotify,
-                                 _checksubmit=False)
-
-                elif size < 0:
-                    o = self.sell(owner=owner, data=d,
-                                  size=abs(size), price=price,
-                                  exectype=Order.Historical,
-                                  histnotify=uhnotify,
-                                  _checksubmit=False)
+                self._histexec(d, uhorder[1], uhorder[2], uhnotify)
 
                 # update to next potential order
                 uhist[0] = uhorder = next(uhorders, None)
@@ -1179,25 +1459,26 @@ class BackBroker(bt.BrokerBase):
 
         # Discount any cash for positions hold
         credit = 0.0
-        for data, pos in self.positions.items():
-            if pos:
-                comminfo = self.getcommissioninfo(data)
-                dt0 = data.datetime.datetime()
-                dcredit = comminfo.get_credit_interest(data, pos, dt0)
-                self.d_credit[data] += dcredit
-                credit += dcredit
-                pos.datetime = dt0  # mark last credit operation
+        for data, pos in self._positems:
+            comminfo = self.getcommissioninfo(data)
+            dt0 = data.datetime.datetime()
+            dcredit = comminfo.get_credit_interest(data, pos, dt0)
+            self.d_credit[data] += dcredit
+            credit += dcredit
+            pos.datetime = dt0  # mark last credit operation
 
         self.cash -= credit
 
         self._process_order_history()
 
-        # Iterate once over all elements of the pending queue
-        self.pending.append(None)
-        while True:
-            order = self.pending.popleft()
-            if order is None:
-                break
+        # Iterate once over the pending orders which can do something with
+        # the prices of the bar. Orders out of the queue cannot be cancelled
+        pending = self.pending
+        for seq, order in pending.candidates(self._orderprices):
+            if pending.remove(order) is None:
+                continue  # cancelled by the execution of a previous one
+
+            pending.cursor = seq
 
             if order.expire():
                 self.notify(order)
@@ -1205,27 +1486,28 @@ class BackBroker(bt.BrokerBase):
                 self._bracketize(order, cancel=True)
 
             elif not order.active():
-                self.pending.append(order)  # cannot yet be processed
+                pending.append(order, seq)  # cannot yet be processed
 
             else:
                 self._try_exec(order)
                 if order.alive():
-                    self.pending.append(order)
+                    pending.append(order, seq)  # trigger may have changed
 
                 elif order.status == Order.Completed:
                     # a bracket parent order may have been executed
                     self._bracketize(order)
 
+        pending.cursor = None
+
         # Operations have been executed ... adjust cash end of bar
-        for data, pos in self.positions.items():
+        for data, pos in self._positems:
             # futures change cash every bar
-            if pos:
-                comminfo = self.getcommissioninfo(data)
-                self.cash += comminfo.cashadjust(pos.size,
-                                                 pos.adjbase,
-                                                 data.close[0])
-                # record the last adjustment price
-                pos.adjbase = data.close[0]
+            comminfo = self.getcommissioninfo(data)
+            self.cash += comminfo.cashadjust(pos.size,
+                                             pos.adjbase,
+                                             data.close[0])
+            # record the last adjustment price
+            pos.adjbase = data.close[0]
 
         self._get_value()  # update value
 
@@ -23,7 +23,9 @@ from __future__ import (absolute_import, division, print_function,
 
 import datetime
 import collections
+import heapq
 import itertools
+import math
 import multiprocessing
 
 import backtrader as bt
@@ -32,7 +34,9 @@ from .utils.py3 import (map, range, zip, with_metaclass, string_types,
 
 from . import linebuffer
 from . import indicator
+from . import shmsupport
 from .brokers import BackBroker
+from .errors import ModuleImportError
 from .metabase import MetaParams
 from . import observers
 from .writer import WriterFile
@@ -41,6 +45,7 @@ from .strategy import Strategy, SignalStrategy
 from .tradingcal import (TradingCalendarBase, TradingCalendar,
                          PandasMarketCalendar)
 from .timer import Timer
+from .analyzer import Analyzer
 
 # Defined here to make it pickable. Ideally it could be defined inside Cerebro
 
@@ -52,6 +57,36 @@ class OptReturn(object):
             setattr(self, k, v)
 
 
+class _ShardCashValue(Analyzer):
+    '''Records the cash and value of the sub-account of a shard at each
+    datetime of the strategy'''
+    def start(self):
+        self.rets = dict(datetime=list(), cash=list(), value=list())
+
+    def notify_cashvalue(self, cash, value):
+        dts = self.rets['datetime']
+        dt = self.strategy.datetime[0]
+        if dts and dts[-1] == dt:  # notified again in the same step
+            self.rets['cash'][-1] = cash
+            self.rets['value'][-1] = value
+        else:
+            dts.append(dt)
+            self.rets['cash'].append(cash)
+            self.rets['value'].append(value)
+
+
+class _CerebroShard(object):
+    '''Runs a shard in the processes of a pool, like ``Cerebro.__call__``
+    does with the combinations of an optimization'''
+    def __init__(self, cerebro, iterstrat):
+        self.cerebro = cerebro
+        self.iterstrat = iterstrat
+
+    def __call__(self, shard):
+        idxs, cash = shard
+        return self.cerebro._runshard(self.iterstrat, idxs, cash)
+
+
 class Cerebro(with_metaclass(MetaParams, object)):
     '''Params:
 
@@ -182,6 +217,9 @@ class Cerebro(with_metaclass(MetaParams, object)):
         for all strategies. This can also be accomplished on a per strategy
         basis with the strategy method ``set_tradehistory``
 
+        The events are kept in columnar form in a ``TradeLog`` per strategy
+        (see the strategy method ``gettradelog``)
+
       - ``optdatas`` (default: ``True``)
 
         If ``True`` and optimizing (and the system can ``preload`` and use
@@ -191,6 +229,15 @@ class Cerebro(with_metaclass(MetaParams, object)):
         The tests show an approximate ``20%`` speed-up moving from a sample
         execution in ``83`` seconds to ``66``
 
+      - ``optshm`` (default: ``False``)
+
+        If ``True`` and the datas are preloaded in the main process (see
+        ``optdatas``), the lines of the datas are moved to shared memory
+        segments. The optimization processes work with read-only views of the
+        segments instead of receiving (and holding) a copy of the datas.
+
+        Requires ``numpy`` and Python ``>= 3.8``
+
       - ``optreturn`` (default: ``True``)
 
         If ``True`` the optimization results will not be full ``Strategy``
@@ -264,6 +311,87 @@ class Cerebro(with_metaclass(MetaParams, object)):
 
         Set to ``False`` for compatibility. May be changed to ``True``
 
+      - ``linestorage`` (default: ``array``)
+
+        Storage used by the lines when ``preload`` and ``runonce`` are both
+        active. Possible values:
+
+          - ``array``: each line is kept in a Python ``array.array``
+
+          - ``numpy``: once the length of a line is known (preloaded datas,
+            indicators calculated in ``once`` mode) the values are kept in a
+            contiguous ``float64`` ``numpy.ndarray``, which is available
+            through the ``array`` attribute of the line. This allows vectorized
+            code to take zero-copy views of the values. Requires ``numpy``
+
+      - ``fuseops`` (default: ``False``)
+
+        In ``runonce`` mode the chains of arithmetic/logic operations on lines
+        (like ``(high - low) / (close - open) * 100``) are evaluated as a
+        single expression by the last operation of the chain. The buffers of
+        the intermediate operations are not filled, unless they are used by
+        something else, in which case they are calculated on demand
+
+      - ``indcache`` (default: ``0``)
+
+        Maximum number of entries of the indicator result cache. In
+        ``runonce`` mode the values calculated by the indicators are kept in
+        the cache, keyed on the class, the parameters, the line storage and
+        the contents of the input lines. An identical indicator (for example
+        in the next combination of an optimization) copies the values
+        instead of recalculating them, also those of the indicators it uses
+        (like the moving averages of a ``MACD``). The least recently used
+        entries are evicted.
+
+        Only indicators which depend exclusively on the input lines and the
+        parameters can be cached. ``0`` deactivates the cache
+
+        The cache is kept in each process: the workers of an optimization do
+        not share the calculated values
+
+      - ``shards`` (default: ``1``)
+
+        Number of processes in which a single run (no optimization) is split.
+        The datas are distributed in (consecutive) shards and each shard runs
+        the strategies over its datas with its own broker sub-account. Clones
+        of a data (resampled, replayed) are kept in the shard of the data
+
+        Only meaningful if the logic of the strategies for each data is
+        independent of the other datas. The broker must support ``setcash``
+        and live datas cannot be sharded. Writers cannot be used with shards
+        (``ValueError`` is raised), because each shard would write its own
+        partial output
+
+        Instead of the strategy instances, ``run`` returns a list with an
+        ``OptReturn`` for each strategy with:
+
+          - ``shards``: the results of the strategy in each shard, also
+            ``OptReturn`` instances, which carry the ``analyzers`` and the
+            names of the ``datas`` of the shard
+
+          - ``datetime``, ``cash``, ``value``: the merged series of the
+            sub-accounts, i.e.: all the (numeric) datetimes of the shards and
+            the sum of the cash/value of the sub-accounts at each of them
+
+      - ``shardalloc`` (default: ``None``)
+
+        Weights of the datas (in the order in which they were added) to
+        allocate the cash of the broker to the sub-accounts of the shards.
+        Cash constraints at portfolio level are therefore approximated with
+        the declared allocation. ``None`` allocates the same amount to each
+        data. There must be a weight for each data (``ValueError`` otherwise)
+
+      - ``indworkers`` (default: ``1``)
+
+        Number of threads used to calculate the indicators of a strategy in
+        ``runonce`` mode. The indicators are split in independent groups
+        (for example: the indicators of each data in a multi-data strategy),
+        which are calculated in parallel. The indicators of a group are
+        calculated in order in the same thread
+
+        The gain depends on the calculations releasing the *GIL*, which is
+        the case of the vectorized ones with the ``numpy`` line storage
+
     '''
 
     params = (
@@ -277,6 +405,7 @@ class Cerebro(with_metaclass(MetaParams, object)):
         ('exactbars', False),
         ('optdatas', True),
         ('optreturn', True),
+        ('optshm', False),
         ('objcache', False),
         ('live', False),
         ('writer', False),
@@ -286,6 +415,12 @@ class Cerebro(with_metaclass(MetaParams, object)):
         ('cheat_on_open', False),
         ('broker_coo', True),
         ('quicknotify', False),
+        ('linestorage', 'array'),
+        ('fuseops', False),
+        ('indcache', 0),
+        ('indworkers', 1),
+        ('shards', 1),
+        ('shardalloc', None),
     )
 
     def __init__(self):
@@ -298,6 +433,9 @@ class Cerebro(with_metaclass(MetaParams, object)):
         self.datasbyname = collections.OrderedDict()
         self.strats = list()
         self.optcbs = list()  # holds a list of callbacks for opt strategies
+        self.optsched = None  # scheduler for the optimization combinations
+        self._runfraction = 1.0  # fraction of the datas to run
+        self._sharding = False  # running a shard in a subprocess
         self.observers = list()
         self.analyzers = list()
         self.indicators = list()
@@ -358,6 +496,12 @@ class Cerebro(with_metaclass(MetaParams, object)):
                 brackets are optional
               - ``share_value`` is an float/integer
               - ``net_asset_value`` is a float/integer
+
+            It can also be given in columnar form: a mapping (ex: ``dict``) of
+            sequences or a ``pandas.DataFrame`` with the columns
+            ``datetime``, ``share_value`` and ``net_asset_value``. In a
+            ``DataFrame`` the ``datetime`` can also be the index. The
+            datetimes are converted only once, before the run starts
         '''
         self._fhistory = fund
 
@@ -390,6 +534,22 @@ class Cerebro(with_metaclass(MetaParams, object)):
                 - *string* - a data with that name, assigned for example with
                   ``cerebro.addata(data, name=value)``, will be the target
 
+            The orders can also be given in columnar form: a mapping (ex:
+            ``dict``) of sequences or a ``pandas.DataFrame`` with the columns
+            ``datetime``, ``size``, ``price`` and optionally ``data``. In a
+            ``DataFrame`` the ``datetime`` can also be the index.
+
+            The datetimes are then converted only once to the format of the
+            target datas and the orders are bucketed per data, which makes
+            the lookup of the orders to execute on each bar inexpensive for
+            large histories
+
+            **Note**: in columnar form the orders of each data are processed
+              independently. An order whose data has not yet started (or is
+              not yet due) does not hold back the orders of other datas,
+              unlike with the element-by-element form, in which the first
+              pending order blocks the rest of the history
+
           - ``notify`` (default: *True*)
 
             If ``True`` the 1st strategy inserted in the system will be
@@ -851,6 +1011,29 @@ class Cerebro(with_metaclass(MetaParams, object)):
         '''
         self.optcbs.append(cb)
 
+    def optscheduler(self, schedcls, *args, **kwargs):
+        '''
+        Adds a scheduler (subclass of ``OptScheduler``) which decides which
+        combinations of the strategies added with ``optstrategy`` are run and
+        on which prefix of the datas. Instantiation will happen during ``run``
+        time.
+
+        Without a scheduler all combinations are run with the entire datas.
+        With a scheduler, only the results of the combinations run on the
+        entire datas are delivered (and passed to the ``optcallback``)
+
+        Example:
+
+          - def objective(analyzers):
+                return analyzers.returns.get_analysis()['rtot']
+
+            cerebro.optscheduler(bt.SuccessiveHalving, objective=objective)
+
+        Running on a prefix of the datas needs the datas to be preloaded. Else
+        the entire datas are always used
+        '''
+        self.optsched = (schedcls, args, kwargs)
+
     def optstrategy(self, strategy, *args, **kwargs):
         '''
         Adds a ``Strategy`` class to the mix for optimization. Instantiation
@@ -1015,6 +1198,8 @@ class Cerebro(with_metaclass(MetaParams, object)):
         rv = vars(self).copy()
         if 'runstrats' in rv:
             del(rv['runstrats'])
+        # may hold callables (objective) which cannot be pickled
+        rv['optsched'] = None
         return rv
 
     def runstop(self):
@@ -1037,10 +1222,43 @@ class Cerebro(with_metaclass(MetaParams, object)):
           - For Optimization: a list of lists which contain instances of the
             Strategy classes added with ``addstrategy``
         '''
+        self.runstrats = list()
+        for runstrat in self.run_iter(**kwargs):
+            self.runstrats.append(runstrat)
+
+        if not self.runstrats:
+            return []  # nothing was run
+
+        if not self._dooptimize:
+            # avoid a list of list for regular cases
+            return self.runstrats[0]
+
+        return self.runstrats
+
+    def run_iter(self, ordered=True, chunksize=1, **kwargs):
+        '''Generator version of ``run``, which yields the result of each
+        combination of strategies as soon as it is available, instead of
+        collecting all results before returning. Each result is a list which
+        contains instances of the Strategy classes added with ``addstrategy``
+        (or the ``OptReturn`` instances if ``optreturn`` is active)
+
+        The results are not kept in ``cerebro`` (and therefore cannot be
+        plotted). Any ``kwargs`` are processed like in ``run``
+
+        Args:
+
+          - ``ordered`` (default: ``True``): if ``False`` and the combinations
+            are run in several processes, results are delivered in completion
+            order rather than in the order of the combinations
+
+          - ``chunksize`` (default: ``1``): number of combinations which are
+            sent together to each process. Larger values reduce the overhead
+            of the communication with the processes in large optimizations
+        '''
         self._event_stop = False  # Stop is requested
 
         if not self.datas:
-            return []  # nothing can be run
+            return  # nothing can be run
 
         pkeys = self.params._getkeys()
         for key, val in kwargs.items():
@@ -1054,6 +1272,9 @@ class Cerebro(with_metaclass(MetaParams, object)):
         linebuffer.LineActions.usecache(self.p.objcache)
         indicator.Indicator.usecache(self.p.objcache)
 
+        linebuffer.LineOperationBase.usefusion(self.p.fuseops)
+        indicator.Indicator.useresultcache(self.p.indcache)
+
         self._dorunonce = self.p.runonce
         self._dopreload = self.p.preload
         self._exactbars = int(self.p.exactbars)
@@ -1073,6 +1294,13 @@ class Cerebro(with_metaclass(MetaParams, object)):
             self._dorunonce = False
             self._dopreload = False
 
+        # the length of the lines is only known when preloading and runonce
+        linestorage = 'array'
+        if self._dopreload and self._dorunonce:
+            linestorage = self.p.linestorage
+
+        linebuffer.LineBuffer.usestorage(linestorage)
+
         self.runwriters = list()
 
         # Add the system default writer if requested
@@ -1088,8 +1316,6 @@ class Cerebro(with_metaclass(MetaParams, object)):
         # Write down if any writer wants the full csv output
         self.writers_csv = any(map(lambda x: x.p.csv, self.runwriters))
 
-        self.runstrats = list()
-
         if self.signals:  # allow processing of signals
             signalst, sargs, skwargs = self._signal_strat
             if signalst is None:
@@ -1120,42 +1346,216 @@ class Cerebro(with_metaclass(MetaParams, object)):
             self.addstrategy(Strategy)
 
         iterstrats = itertools.product(*self.strats)
-        if not self._dooptimize or self.p.maxcpus == 1:
-            # If no optimmization is wished ... or 1 core is to be used
-            # let's skip process "spawning"
-            for iterstrat in iterstrats:
-                runstrat = self.runstrategies(iterstrat)
-                self.runstrats.append(runstrat)
+
+        shards = self._getshards()
+        if shards:
+            yield self._runshards(next(iterstrats), shards)
+            return
+
+        optsched = None
+        if self._dooptimize and self.optsched is not None:
+            schedcls, schedargs, schedkwargs = self.optsched
+            optsched = schedcls(*schedargs, **schedkwargs)
+
+        # If no optimmization is wished ... or 1 core is to be used
+        # let's skip process "spawning"
+        pool = None
+        optdatas = False  # datas preloaded for all processes
+        shmlines = list()  # lines moved to shared memory
+        try:
+            if self._dooptimize and self.p.maxcpus != 1:
+                if self.p.optdatas and self._dopreload and self._dorunonce:
+                    optdatas = True
+                    for data in self.datas:
+                        data.reset()
+                        if self._exactbars < 1:  # datas can be full length
+                            data.extend(size=self.params.lookahead)
+                        data._start()
+                        if self._dopreload:
+                            data.preload()
+
+                    if self.p.optshm:
+                        if not shmsupport.available():
+                            raise ModuleImportError(
+                                'numpy and Python >= 3.8 are needed for '
+                                'optshm')
+
+                        for data in self.datas:
+                            for line in data.lines:
+                                line.shmbuffer()
+                                shmlines.append(line)
+
+                pool = multiprocessing.Pool(self.p.maxcpus or None)
+
+            if optsched is None:
+                runstrats = self._runcombos(iterstrats, pool, ordered,
+                                            chunksize)
+            else:
+                runstrats = self._runscheduled(optsched, iterstrats, pool,
+                                               chunksize)
+
+            for runstrat in runstrats:
                 if self._dooptimize:
                     for cb in self.optcbs:
                         cb(runstrat)  # callback receives finished strategy
-        else:
-            if self.p.optdatas and self._dopreload and self._dorunonce:
-                for data in self.datas:
-                    data.reset()
-                    if self._exactbars < 1:  # datas can be full length
-                        data.extend(size=self.params.lookahead)
-                    data._start()
-                    if self._dopreload:
-                        data.preload()
-
-            pool = multiprocessing.Pool(self.p.maxcpus or None)
-            for r in pool.imap(self, iterstrats):
-                self.runstrats.append(r)
-                for cb in self.optcbs:
-                    cb(r)  # callback receives finished strategy
-
-            pool.close()
-
-            if self.p.optdatas and self._dopreload and self._dorunonce:
+
+                yield runstrat
+        finally:
+            # all results delivered, iteration abandoned or failed setup:
+            # release what was allocated
+            if pool is not None:
+                pool.terminate()  # stop workers
+
+            for line in shmlines:
+                line.shmrelease()
+
+            if optdatas:
                 for data in self.datas:
                     data.stop()
 
-        if not self._dooptimize:
-            # avoid a list of list for regular cases
-            return self.runstrats[0]
+    def _runcombos(self, iterstrats, pool, ordered=True, chunksize=1):
+        '''Runs the combinations of strategies, in the processes of ``pool``
+        if not ``None``, and returns an iterable with the results'''
+        if pool is None:
+            return map(self.runstrategies, iterstrats)
+
+        pimap = pool.imap if ordered else pool.imap_unordered
+        return pimap(self, iterstrats, chunksize)
+
+    def _runscheduled(self, optsched, iterstrats, pool, chunksize=1):
+        '''Runs the rounds of combinations of the scheduler delivering the
+        results of the rounds which use the entire datas'''
+        optsched.start(list(iterstrats))
+        try:
+            while True:
+                optround = optsched.nextround()
+                if optround is None:
+                    break
 
-        return self.runstrats
+                combos, self._runfraction = optround
+                results = list(self._runcombos(combos, pool,
+                                               chunksize=chunksize))
+                optsched.roundresults(combos, results)
+
+                if self._runfraction >= 1.0:
+                    for result in results:
+                        yield result
+        finally:
+            self._runfraction = 1.0
+
+    def _getshards(self):
+        '''Returns the shards in which the run is split as a list of
+        ``(idxs, cash)`` (indices of the datas and cash of the sub-account) or
+        an empty list if the run is not sharded'''
+        if self.p.shards <= 1 or self._dooptimize or self._dolive or \
+                self.p.live:
+            return []
+
+        weights = self.p.shardalloc
+        if weights is None:
+            weights = [1.0] * len(self.datas)
+        elif len(weights) != len(self.datas):
+            raise ValueError('shardalloc has %d weights for %d datas' %
+                             (len(weights), len(self.datas)))
+
+        if self.p.writer or self.writers:
+            raise ValueError('writers cannot be used with shards')
+
+        # a data and its clones go to the same shard
+        units = OrderedDict()
+        for i, data in enumerate(self.datas):
+            root = data
+            while getattr(root, '_clone', False):
+                root = root.data
+
+            units.setdefault(id(root), []).append(i)
+
+        units = list(units.values())
+        nshards = min(self.p.shards, len(units))
+        if nshards <= 1:
+            return []
+
+        totweight = float(sum(weights))
+        cash = self._broker.getcash()
+
+        shards = list()
+        for s in range(nshards):
+            sunits = units[s * len(units) // nshards:
+                           (s + 1) * len(units) // nshards]
+            idxs = [i for unit in sunits for i in unit]
+            scash = cash * sum(weights[i] for i in idxs) / totweight
+            shards.append((idxs, scash))
+
+        return shards
+
+    def _runshards(self, iterstrat, shards):
+        '''Runs the shards in a pool of processes and returns the merged
+        results of the strategies'''
+        pool = multiprocessing.Pool(min(self.p.maxcpus or len(shards),
+                                        len(shards)))
+        try:
+            sresults = pool.map(_CerebroShard(self, iterstrat), shards)
+        finally:
+            pool.terminate()
+
+        results = list()
+        for stresults in zip(*sresults):  # results of a strategy per shard
+            # the latest cash/value of each shard is kept up to date and the
+            # sums are taken after the last change of each datetime
+            cashes = [scash for idxs, scash in shards]
+            values = cashes[:]
+            events = sorted((dt, s, i)
+                            for s, sres in enumerate(stresults)
+                            for i, dt in enumerate(sres.datetime))
+
+            dts, cash, value = list(), list(), list()
+            for n, (dt, s, i) in enumerate(events):
+                cashes[s] = stresults[s].cash[i]
+                values[s] = stresults[s].value[i]
+                if n + 1 == len(events) or events[n + 1][0] != dt:
+                    dts.append(dt)
+                    cash.append(sum(cashes))
+                    value.append(sum(values))
+
+            sres = stresults[0]
+            results.append(OptReturn(sres.params, strategycls=sres.strategycls,
+                                     shards=list(stresults),
+                                     datetime=dts, cash=cash, value=value))
+
+        return results
+
+    def _runshard(self, iterstrat, idxs, cash):
+        '''Runs the strategies of ``iterstrat`` over the datas with indices
+        ``idxs`` and a broker sub-account with ``cash``. Returns an
+        ``OptReturn`` for each strategy, with the cash/value series of the
+        sub-account'''
+        self.datas = [self.datas[i] for i in idxs]
+        self.datasbyname = OrderedDict((d._name, d) for d in self.datas)
+        for dataid, data in enumerate(self.datas, 1):
+            data._id = dataid  # ids are consecutive (see adddata)
+        self._broker.setcash(cash)
+        self._sharding = True
+
+        results = list()
+        for strat in self.runstrategies(iterstrat):
+            cashvalue = strat._getanalyzer_slave(-1).rets
+            results.append(self._optreturn(
+                strat, datas=[d._name for d in self.datas], **cashvalue))
+
+        return results
+
+    def _optreturn(self, strat, **kwargs):
+        '''Returns an ``OptReturn`` with the params and analyzers of
+        ``strat``, which can be pickled'''
+        for a in strat.analyzers:
+            a.strategy = None
+            a._parent = None
+            for attrname in dir(a):
+                if attrname.startswith('data'):
+                    setattr(a, attrname, None)
+
+        return OptReturn(strat.params, analyzers=strat.analyzers,
+                         strategycls=type(strat), **kwargs)
 
     def _init_stcount(self):
         self.stcount = itertools.count(0)
@@ -1211,6 +1611,12 @@ class Cerebro(with_metaclass(MetaParams, object)):
                 if self._dopreload:
                     data.preload()
 
+        self._runbars = 0  # no limit: run the entire datas
+        if self._runfraction < 1.0 and self._dopreload:
+            # only a prefix of the datas (optimization scheduler)
+            buflen = max(data.buflen() for data in self.datas)
+            self._runbars = max(1, int(math.ceil(buflen * self._runfraction)))
+
         for stratcls, sargs, skwargs in iterstrat:
             sargs = self.datas + list(sargs)
             try:
@@ -1256,6 +1662,9 @@ class Cerebro(with_metaclass(MetaParams, object)):
                 for ancls, anargs, ankwargs in self.analyzers:
                     strat._addanalyzer(ancls, *anargs, **ankwargs)
 
+                if self._sharding:  # cash/value of the sub-account
+                    strat._addanalyzer_slave(_ShardCashValue)
+
                 sizer, sargs, skwargs = self.sizers.get(idx, defaultsizer)
                 if sizer is not None:
                     strat._addsizer(sizer, *sargs, **skwargs)
@@ -1316,19 +1725,7 @@ class Cerebro(with_metaclass(MetaParams, object)):
 
         if self._dooptimize and self.p.optreturn:
             # Results can be optimized
-            results = list()
-            for strat in runstrats:
-                for a in strat.analyzers:
-                    a.strategy = None
-                    a._parent = None
-                    for attrname in dir(a):
-                        if attrname.startswith('data'):
-                            setattr(a, attrname, None)
-
-                oreturn = OptReturn(strat.params, analyzers=strat.analyzers, strategycls=type(strat))
-                results.append(oreturn)
-
-            return results
+            return [self._optreturn(strat) for strat in runstrats]
 
         return runstrats
 
@@ -1377,6 +1774,9 @@ class Cerebro(with_metaclass(MetaParams, object)):
         data0 = self.datas[0]
         d0ret = True
         while d0ret or d0ret is None:
+            if self._runbars and len(runstrats[0]) >= self._runbars:
+                break  # only a prefix of the datas is run
+
             lastret = False
             # Notify anything from the store even before moving datas
             # because datas may not move due to an error reported by the store
@@ -1441,8 +1841,12 @@ class Cerebro(with_metaclass(MetaParams, object)):
         Strategies are still invoked on a pseudo-event mode in which ``next``
         is called for each data arrival
         '''
-        for strat in runstrats:
-            strat._once()
+        indicator.Indicator.usedigestmemo(True)  # inputs hashed only once
+        try:
+            for strat in runstrats:
+                strat._once()
+        finally:
+            indicator.Indicator.usedigestmemo(False)
 
         # The default once for strategies does nothing and therefore
         # has not moved forward all datas/indicators/observers that
@@ -1451,6 +1855,9 @@ class Cerebro(with_metaclass(MetaParams, object)):
         data0 = self.datas[0]
         datas = self.datas[1:]
         for i in range(data0.buflen()):
+            if self._runbars and i >= self._runbars:
+                break  # only a prefix of the datas is run
+
             data0.advance()
             for data in datas:
                 data.advance(datamaster=data0)
@@ -1497,6 +1904,10 @@ class Cerebro(with_metaclass(MetaParams, object)):
         '''
         datas = sorted(self.datas,
                        key=lambda x: (x._timeframe, x._compression))
+        if self._dopreload and all(self._peekable(d) for d in datas):
+            self._runnext_preloaded(runstrats, datas)
+            return
+
         datas1 = datas[1:]
         data0 = datas[0]
         d0ret = True
@@ -1514,6 +1925,9 @@ class Cerebro(with_metaclass(MetaParams, object)):
         lastqcheck = False
         dt0 = date2num(datetime.datetime.max) - 2  # default at max
         while d0ret or d0ret is None:
+            if self._runbars and len(runstrats[0]) >= self._runbars:
+                break  # only a prefix of the datas is run
+
             # if any has live data in the buffer, no data will wait anything
             newqcheck = not any(d.haslivedata() for d in datas)
             if not newqcheck:
@@ -1641,6 +2055,88 @@ class Cerebro(with_metaclass(MetaParams, object)):
         if self._event_stop:  # stop if requested
             return
 
+    def _peekable(self, data):
+        '''Returns ``True`` if the bars of a preloaded ``data`` can be
+        delivered by ``_runnext_preloaded``: all are in the buffer and known
+        in advance with ``advance_peek``, because nothing (filters, resampling,
+        replaying, live feeding) produces bars on demand'''
+        return not (data.islive() or data.resampling or data.replaying or
+                    data._filters or data._ffilters)
+
+    def _runnext_preloaded(self, runstrats, datas):
+        '''
+        Implementation of run in next mode for preloaded datas, which delivers
+        the same bars as ``_runnext``.
+
+        The next date of each data is kept in a heap and only the datas
+        delivering at the minimum date are looked at and advanced
+        '''
+        dtheap = [(d.advance_peek(), i) for i, d in enumerate(datas)]
+        dtheap = [x for x in dtheap if x[0] != float('inf')]
+        heapq.heapify(dtheap)
+
+        while True:
+            if self._runbars and len(runstrats[0]) >= self._runbars:
+                break  # only a prefix of the datas is run
+
+            self._storenotify()
+            if self._event_stop:  # stop if requested
+                return
+            self._datanotify()
+            if self._event_stop:  # stop if requested
+                return
+
+            if not dtheap:
+                break  # no data delivers anything
+
+            dt0 = dtheap[0][0]
+            dadvanced = []
+            while dtheap and dtheap[0][0] <= dt0:
+                i = heapq.heappop(dtheap)[1]
+                data = datas[i]
+                data.advance(ticks=False)
+                data._tick_fill(force=True)
+                dadvanced.append(i)
+
+            dmaster = datas[dadvanced[0]]  # lowest index at dt0 pops first
+            self._dtmaster = dmaster.num2date(dt0)
+            self._udtmaster = num2date(dt0)
+
+            for i in dadvanced:  # only once per step, even if dates repeat
+                dti = datas[i].advance_peek()
+                if dti != float('inf'):
+                    heapq.heappush(dtheap, (dti, i))
+
+            # Datas may have generated a new notification after next
+            self._datanotify()
+            if self._event_stop:  # stop if requested
+                return
+
+            self._check_timers(runstrats, dt0, cheat=True)
+            if self.p.cheat_on_open:
+                for strat in runstrats:
+                    strat._next_open()
+                    if self._event_stop:  # stop if requested
+                        return
+
+            self._brokernotify()
+            if self._event_stop:  # stop if requested
+                return
+
+            self._check_timers(runstrats, dt0, cheat=False)
+            for strat in runstrats:
+                strat._next()
+                if self._event_stop:  # stop if requested
+                    return
+
+                self._next_writers(runstrats)
+
+        # Last notification chance before stopping
+        self._datanotify()
+        if self._event_stop:  # stop if requested
+            return
+        self._storenotify()
+
     def _runonce(self, runstrats):
         '''
         Actual implementation of run in vector mode.
@@ -1648,9 +2144,13 @@ class Cerebro(with_metaclass(MetaParams, object)):
         Strategies are still invoked on a pseudo-event mode in which ``next``
         is called for each data arrival
         '''
-        for strat in runstrats:
-            strat._once()
-            strat.reset()  # strat called next by next - reset lines
+        indicator.Indicator.usedigestmemo(True)  # inputs hashed only once
+        try:
+            for strat in runstrats:
+                strat._once()
+                strat.reset()  # strat called next by next - reset lines
+        finally:
+            indicator.Indicator.usedigestmemo(False)
 
         # The default once for strategies does nothing and therefore
         # has not moved forward all datas/indicators/observers that
@@ -1659,23 +2159,29 @@ class Cerebro(with_metaclass(MetaParams, object)):
         datas = sorted(self.datas,
                        key=lambda x: (x._timeframe, x._compression))
 
-        while True:
-            # Check next incoming date in the datas
-            dts = [d.advance_peek() for d in datas]
-            dt0 = min(dts)
-            if dt0 == float('inf'):
-                break  # no data delivers anything
+        # Next incoming date of each data, in a heap to only look at (and
+        # advance) the datas delivering at the minimum date
+        dtheap = [(d.advance_peek(), i) for i, d in enumerate(datas)]
+        dtheap = [x for x in dtheap if x[0] != float('inf')]
+        heapq.heapify(dtheap)
+
+        while dtheap:
+            dt0 = dtheap[0][0]
 
-            # Timemaster if needed be
-            # dmaster = datas[dts.index(dt0)]  # and timemaster
             slen = len(runstrats[0])
-            for i, dti in enumerate(dts):
-                if dti <= dt0:
-                    datas[i].advance()
-                    # self._plotfillers2[i].append(slen)  # mark as fill
-                else:
-                    # self._plotfillers[i].append(slen)
-                    pass
+            if self._runbars and slen >= self._runbars:
+                break  # only a prefix of the datas is run
+
+            dadvanced = []
+            while dtheap and dtheap[0][0] <= dt0:
+                i = heapq.heappop(dtheap)[1]
+                datas[i].advance()
+                dadvanced.append(i)
+
+            for i in dadvanced:  # only once per step, even if dates repeat
+                dti = datas[i].advance_peek()
+                if dti != float('inf'):
+                    heapq.heappush(dtheap, (dti, i))
 
             self._check_timers(runstrats, dt0, cheat=True)
 
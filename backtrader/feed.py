@@ -21,18 +21,29 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+import array
 import collections
 import datetime
+import hashlib
 import inspect
 import io
 import os.path
 
+try:
+    import numpy as np
+except ImportError:
+    np = None  # no conversion of tzinput in bulk
+
 import backtrader as bt
 from backtrader import (date2num, num2date, time2num, TimeFrame, dataseries,
                         metabase)
 
-from backtrader.utils.py3 import with_metaclass, zip, range, string_types
-from backtrader.utils import tzparse
+from backtrader.utils.py3 import (with_metaclass, zip, range, string_types,
+                                  integer_types)
+from backtrader.utils import tzparse, colfile
+from backtrader.utils.dateintern import (date2numarray, num2datearray,
+                                         tzmaxoffset)
+from .linebuffer import LineBuffer
 from .dataseries import SimpleFilterWrapper
 from .resamplerfilter import Resampler, Replayer
 from .tradingcal import PandasMarketCalendar
@@ -213,7 +224,10 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
         if not len(self):
             return datetime.datetime.min, 0.0
 
-        dt = self.lines.datetime[0]
+        return self._calcnexteos(self.lines.datetime[0])
+
+    def _calcnexteos(self, dt):
+        '''Returns the next eos for the numeric datetime ``dt``'''
         dtime = num2date(dt)
         if self._calendar is None:
             nexteos = datetime.datetime.combine(dtime, self.p.sessionend)
@@ -432,11 +446,123 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
         return True
 
     def preload(self):
+        self._rsbulk = self._rsbulkok()
+        self._tzbulk = self._tzbulkok()
+        self._tzbulkto = self._tzbulkbound()
         while self.load():
             pass
 
         self._last()
         self.home()
+        self._tzbulkload()
+        self._rsbulkload()
+        self.lines.npbuffer()  # final length known, numpy storage if active
+
+    _tzbulk = False  # tzinput applied once preloaded, see _tzbulkload
+
+    def _tzbulkok(self):
+        '''Returns ``True`` if the conversion of ``tzinput`` (and the
+        checks of ``fromdate`` and ``todate`` which depend on it) can be done
+        once all bars have been preloaded'''
+        return bool(self._tzinput) and np is not None and \
+            (not self._filters or self._rsbulk is not None) and \
+            self.lines.datetime.mode != LineBuffer.QBuffer
+
+    _tzbulkto = float('inf')  # unconverted datetime surely after todate
+
+    def _tzbulkbound(self):
+        '''Returns the bound for the datetime (not yet converted from
+        ``tzinput``) of the bars after which all bars are after ``todate``,
+        for any UTC offset of ``tzinput``'''
+        if not self._tzbulk:
+            return float('inf')
+
+        maxoffset = tzmaxoffset(self._tzinput)
+        if maxoffset is None:
+            maxoffset = 1.0  # no offset reaches a day
+
+        return self.todate + maxoffset
+
+    def _tzinputarray(self, nums):
+        '''Vectorized version of the conversion of ``tzinput`` done by
+        ``load`` for a single bar'''
+        return date2numarray(num2datearray(nums), tz=self._tzinput)
+
+    def _tzbulkload(self):
+        '''Applies ``tzinput``, ``fromdate`` and ``todate`` to the bars
+        preloaded with ``_tzbulk`` active'''
+        if not self._tzbulk:
+            return
+
+        self._tzbulk = False
+        nums = self._tzinputarray(np.asarray(self.lines.datetime.array))
+
+        # same as load: skip bars before fromdate, stop at the 1st after todate
+        over = np.flatnonzero(nums > self.todate)
+        end = over[0] if len(over) else len(nums)
+        keep = np.flatnonzero(nums[:end] >= self.fromdate)
+
+        for line in self.lines:
+            if line is self.lines.datetime:
+                vals = nums[keep]
+            else:
+                vals = np.asarray(line.array, dtype=np.float64)[keep]
+
+            line.loadarray(vals)
+
+    _rsbulk = None  # resampler applied once preloaded, see _rsbulkload
+
+    def _rsbulkok(self):
+        '''Returns the resampler if it is the only filter and can resample
+        the bars in a single pass once all have been preloaded'''
+        if np is None or len(self._filters) != 1 or \
+           self.lines.datetime.mode == LineBuffer.QBuffer:
+            return None
+
+        ff, fargs, fkwargs = self._filters[0]
+        if fargs or fkwargs or not isinstance(ff, Resampler) or \
+           not ff.batchok(self):
+            return None
+
+        return ff
+
+    def _rsbulkload(self):
+        '''Resamples the bars preloaded with ``_rsbulk`` active. If the
+        resampler cannot do it in a single pass, the bars are passed to it one
+        by one'''
+        ff, self._rsbulk = self._rsbulk, None
+        if ff is None:
+            return
+
+        names = self.getlinealiases()
+        bars = dict((name, np.asarray(line.array, dtype=np.float64))
+                    for name, line in zip(names, self.lines))
+
+        rbars = ff.batch(self, bars)
+        if rbars is not None:
+            for name, line in zip(names, self.lines):
+                vals = rbars.get(name)
+                if vals is None:  # not carried over by the resampler
+                    vals = np.full(len(rbars['datetime']), float('NaN'))
+
+                line.loadarray(vals)
+
+            return
+
+        rows = list(zip(*[bars[name].tolist() for name in names]))
+        for line in self.lines:
+            line.reset()
+
+        for row in rows:
+            self.forward()
+            for line, val in zip(self.lines, row):
+                line[0] = val
+
+            ff(self)  # the bar is always taken out of the stream
+            self._fromstack(forward=True)
+
+        self._last()
+        self.home()
 
     def _last(self, datamaster=None):
         # Last chance for filters to deliver something
@@ -489,6 +615,13 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
             # Get a reference to current loaded time
             dt = self.lines.datetime[0]
 
+            if self._tzbulk:
+                if dt > self._tzbulkto:  # after todate whatever the offset
+                    self.backwards(force=True)
+                    break
+
+                return True  # tzinput and date checks done once preloaded
+
             # A bar has been loaded, adapt the time
             if self._tzinput:
                 # Input has been converted at face value but it's not UTC in
@@ -508,6 +641,9 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
                 self.backwards(force=True)
                 break
 
+            if self._rsbulk is not None:
+                return True  # resampled once preloaded
+
             # Pass through filters
             retff = False
             for ff, fargs, fkwargs in self._filters:
@@ -655,14 +791,128 @@ class CSVDataBase(with_metaclass(MetaCSVDataBase, DataBase)):
 
     The return value of ``_loadline`` (True/False) will be the return value
     of ``_load`` which has been overriden by this base class
+
+    Params:
+
+      - ``headers`` (default: ``True``) skip the 1st line of the file
+
+      - ``separator`` (default: ``,``) separator of the fields of a line
+
+      - ``cache`` (default: ``False``)
+
+        If ``True`` and ``dataname`` is a file name, the parsed values of the
+        lines are stored in a binary columnar file next to the source (with
+        the extension ``.btcache``) once the file has been read to the end.
+        Later runs read the values from the cache (memory mapped) and skip the
+        parsing.
+
+        If ``todate`` stops the loading earlier, a preloading run parses the
+        rest of the file to complete the cache. Runs without preloading only
+        write it if they reach the end of the file
+
+        The cache is keyed on the path, size and modification time of the
+        source and on the parameters of the data feed and is discarded if any
+        of them changes. Data feeds with parameters which are not plain
+        values (callables, timezones ...) are not cached
     '''
 
     f = None
-    params = (('headers', True), ('separator', ','),)
+    params = (('headers', True), ('separator', ','), ('cache', False),)
+
+    CACHEEXT = '.btcache'
+
+    # params which do not change the values delivered by _loadline
+    _cachenokey = ('dataname', 'name', 'cache', 'fromdate', 'todate',
+                   'filters')
+    _cachetypes = (
+        type(None), bool, float, datetime.date, datetime.time,
+        datetime.timedelta,
+    ) + string_types + integer_types
+
+    _cfile = None  # replaying cache
+    _crows = None  # recording cache
+
+    def _cachekey(self):
+        '''Returns the key of the cache for the source or ``None`` if the
+        data feed cannot be cached'''
+        path = os.path.abspath(self.p.dataname)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+
+        pvals = list()
+        for pname, pval in self.p._getitems():
+            if pname in self._cachenokey:
+                continue
+            if not isinstance(pval, self._cachetypes):
+                return None  # cannot be reliably keyed
+            pvals.append((pname, pval))
+
+        cls = self.__class__
+        keyval = (cls.__module__, cls.__name__, path, st.st_size, st.st_mtime,
+                  self.lines.getlinealiases(), pvals)
+        return hashlib.sha1(repr(keyval).encode('utf-8')).digest()
+
+    def _startcache(self):
+        self._cfile = self._crows = None
+
+        self._ckey = self._cachekey()
+        if self._ckey is None:
+            return
+
+        self._cpath = self.p.dataname + self.CACHEEXT
+        try:
+            cfile = colfile.ColumnFile(self._cpath)
+        except (IOError, OSError, ValueError):
+            pass  # not present or not usable: record it
+        else:
+            if cfile.key == self._ckey and cfile.ncols == self.lines.size():
+                self._cfile = cfile
+                self._cidx = 0
+                return
+
+            cfile.close()  # stale
+
+        self._crows = [array.array(str('d')) for x in self.lines.itersize()]
+
+    def _savecache(self):
+        crows, self._crows = self._crows, None
+        try:
+            colfile.write(self._cpath, crows, self._ckey)
+        except (IOError, OSError):
+            pass  # the cache is only an optimization
+
+    def _drainsave(self):
+        # Loading may have stopped before the end of the file (todate), but
+        # the cache has to hold the entire source: parse the rest of it. The
+        # values go through a scratch bar, which is discarded afterwards
+        if self._crows is None or self.f is None:
+            return
+
+        self.forward()
+        try:
+            while self._load():  # saves the cache upon reaching the end
+                pass
+        finally:
+            self.backwards(force=True)
+            self._crows = None  # incomplete if the parsing failed
+
+    def _stopcache(self):
+        self._crows = None
+        if self._cfile is not None:
+            self._cfile.close()
+            self._cfile = None
 
     def start(self):
         super(CSVDataBase, self).start()
 
+        if self.f is None and self.p.cache and \
+           not hasattr(self.p.dataname, 'readline'):
+            self._startcache()
+            if self._cfile is not None:
+                return  # values come from the cache, no file to read
+
         if self.f is None:
             if hasattr(self.p.dataname, 'readline'):
                 self.f = self.p.dataname
@@ -677,22 +927,37 @@ class CSVDataBase(with_metaclass(MetaCSVDataBase, DataBase)):
 
     def stop(self):
         super(CSVDataBase, self).stop()
+        self._stopcache()
         if self.f is not None:
             self.f.close()
             self.f = None
 
     def preload(self):
-        while self.load():
-            pass
+        if self._cfile is None or not self._preloadcache():
+            self._rsbulk = self._rsbulkok()
+            self._tzbulk = self._tzbulkok()
+            self._tzbulkto = self._tzbulkbound()
+            while self.load():
+                pass
 
-        self._last()
-        self.home()
+            self._drainsave()  # before the buffers are finalized
+            self._last()
+            self.home()
+            self._tzbulkload()
+            self._rsbulkload()
+
+        self.lines.npbuffer()  # final length known, numpy storage if active
 
         # preloaded - no need to keep the object around - breaks multip in 3.x
-        self.f.close()
-        self.f = None
+        self._stopcache()
+        if self.f is not None:
+            self.f.close()
+            self.f = None
 
     def _load(self):
+        if self._cfile is not None:
+            return self._loadcache()
+
         if self.f is None:
             return False
 
@@ -700,11 +965,64 @@ class CSVDataBase(with_metaclass(MetaCSVDataBase, DataBase)):
         line = self.f.readline()
 
         if not line:
+            if self._crows is not None:
+                self._savecache()  # the entire file has been parsed
             return False
 
         line = line.rstrip('\n')
         linetokens = line.split(self.separator)
-        return self._loadline(linetokens)
+        ret = self._loadline(linetokens)
+        if ret and self._crows is not None:
+            for crow, dline in zip(self._crows, self.lines.itersize()):
+                crow.append(dline[0])
+
+        return ret
+
+    def _preloadcache(self):
+        '''Preloads the values of the cache in a single step. Returns
+        ``False`` if this is not possible (filters other than a resampler
+        ...) and the bars have to be loaded one by one'''
+        if np is None or self.lines.datetime.mode == LineBuffer.QBuffer or \
+           (self._filters and self._rsbulkok() is None):
+            return False
+
+        cols = [np.asarray(col, dtype=np.float64)
+                for col in self._cfile.columns]
+
+        dtidx = [line is self.lines.datetime
+                 for line in self.lines.itersize()].index(True)
+        dtnums = cols[dtidx]
+        if self._tzinput:
+            dtnums = cols[dtidx] = self._tzinputarray(dtnums)
+
+        # same as load: skip bars before fromdate, stop at the 1st after todate
+        over = np.flatnonzero(dtnums > self.todate)
+        end = over[0] if len(over) else len(dtnums)
+        keep = np.flatnonzero(dtnums[:end] >= self.fromdate)
+
+        for i, line in enumerate(self.lines):
+            if i < len(cols):
+                vals = cols[i][keep]  # a copy: the mapping is closed later
+            else:  # extra lines are not cached
+                vals = np.full(len(keep), float('NaN'))
+
+            line.loadarray(vals)
+
+        self.home()
+        self._rsbulk = self._rsbulkok()
+        self._rsbulkload()
+        return True
+
+    def _loadcache(self):
+        idx = self._cidx
+        if idx >= self._cfile.nrows:
+            return False
+
+        self._cidx = idx + 1
+        for col, dline in zip(self._cfile.columns, self.lines.itersize()):
+            dline[0] = col[idx]
+
+        return True
 
     def _getnextline(self):
         if self.f is None:
@@ -52,3 +52,4 @@ from .vchartfile import VChartFile
 
 from .rollover import RollOver
 from .chainer import Chainer
+from .columnar import ColumnarData
@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import array
+import bisect
+
+from backtrader import feed
+from backtrader.linebuffer import LineBuffer
+from backtrader.utils import colfile
+from backtrader.utils.py3 import zip
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # buffers are copied into the default storage
+
+
+# order of the columns in the file
+COLUMNS = ('datetime', 'open', 'high', 'low', 'close', 'volume',
+           'openinterest')
+
+# stored as key in the columnar file to recognize the format
+FORMATKEY = b'btbars:dtohlcvoi'.ljust(20, b'\x00')
+
+
+def writebars(path, columns):
+    '''Writes a file for ``ColumnarData`` with ``columns`` holding the values
+    of the fields in ``COLUMNS`` (in that order). The bars must be sorted by
+    datetime'''
+    colfile.write(path, columns, FORMATKEY)
+
+
+class ColumnarData(feed.DataBase):
+    '''
+    Reads bars from a native binary columnar file (see ``writebars`` and
+    ``tools/rewrite-data.py``) which is memory mapped: only the parts of the
+    file holding the bars in the range ``fromdate`` - ``todate`` are read by
+    the operating system.
+
+    When preloading the columns of the range are handed to the lines in a
+    single operation (zero-copy with the *numpy* line storage) unless filters
+    (other than a resampler) or an input timezone (``tzinput``) are in place.
+    Bars are else delivered one by one without any parsing
+
+    Note:
+
+      - The ``dataname`` parameter is the name of the file
+
+      - The ``datetime`` values are stored in the internal numeric format of
+        the platform and the bars must be sorted
+    '''
+
+    _cfile = None
+
+    def start(self):
+        super(ColumnarData, self).start()
+
+        self._cfile = colfile.ColumnFile(self.p.dataname)
+        if self._cfile.key != FORMATKEY or \
+           self._cfile.ncols != len(COLUMNS):
+            self._cfile.close()
+            raise ValueError('%s: not a columnar bars file' % self.p.dataname)
+
+        self._dlines = [getattr(self.lines, x) for x in COLUMNS]
+        self._idx = self._end = None  # range calculated once started
+
+    def stop(self):
+        super(ColumnarData, self).stop()
+        self._close()
+
+    def _close(self):
+        if self._cfile is not None:
+            self._cfile.close()
+            self._cfile = None
+
+    def _range(self):
+        '''Returns the indices of the 1st bar and past the last bar to deliver
+        taking ``fromdate`` and ``todate`` into account'''
+        dtcol = self._cfile.columns[0]
+        if self._tzinput:  # stored times are not final, load checks them
+            return 0, len(dtcol)
+
+        start = bisect.bisect_left(dtcol, self.fromdate)
+        end = bisect.bisect_right(dtcol, self.todate, start)
+        return start, end
+
+    def _load(self):
+        if self._cfile is None:
+            return False
+
+        if self._idx is None:
+            self._idx, self._end = self._range()
+
+        idx = self._idx
+        if idx >= self._end:
+            return False
+
+        self._idx = idx + 1
+        for col, dline in zip(self._cfile.columns, self._dlines):
+            dline[0] = col[idx]
+
+        return True
+
+    def preload(self):
+        self._rsbulk = self._rsbulkok()
+        if (self._filters and self._rsbulk is None) or self._tzinput or \
+           self.lines.datetime.mode == LineBuffer.QBuffer:
+            # bar by bar, tzinput is then applied in bulk by the base class
+            super(ColumnarData, self).preload()
+        else:
+            self._preloadcolumns()
+            self._rsbulkload()
+
+        self._close()  # preloaded, no need to keep the mapping around
+
+    def _preloadcolumns(self):
+        start, end = self._range()
+        for i, dline in enumerate(self._dlines):
+            col = self._cfile.columns[i]
+            if end <= start:
+                buf = array.array(str('d'))
+            elif np is not None and LineBuffer._npstorage:
+                # copy-on-write mapping, pages are read when touched
+                offset = i * self._cfile.nrows + start
+                buf = np.memmap(
+                    self.p.dataname, dtype=np.float64, mode='c',
+                    offset=colfile.HEADERSIZE + colfile.ITEMSIZE * offset,
+                    shape=(end - start,))
+            elif isinstance(col, array.array):  # Python 2, already a copy
+                buf = col[start:end]
+            else:
+                buf = array.array(str('d'))
+                buf.frombytes(col[start:end].cast('B'))
+
+            dline.reset()
+            dline.array = buf
+
+        self.home()
@@ -21,11 +21,73 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+import array
+
 from backtrader.utils.py3 import filter, string_types, integer_types
 
 from backtrader import date2num
+from backtrader.linebuffer import LineBuffer
+from backtrader.utils.dateintern import date2numarray
 import backtrader.feed as feed
 
+try:
+    import numpy as np
+except ImportError:
+    np = None  # no bulk preloading
+
+
+def _bulkpreload(data, tstamps, columns):
+    '''
+    Preloads ``data`` in a single step from the timestamps ``tstamps`` (index
+    or column of the DataFrame) and ``columns``, a dictionary with the column
+    (or ``None`` if not present) for each of the other lines.
+
+    Returns ``False`` if this is not possible (filters other than a
+    resampler, not datetime like timestamps, ``NaT`` ...) and the data has to
+    be preloaded bar by bar
+    '''
+    if np is None or data.lines.datetime.mode == LineBuffer.QBuffer or \
+       (data._filters and data._rsbulkok() is None):
+        return False
+
+    tstamps = getattr(tstamps, 'dt', tstamps)  # Series accessor, Index
+    try:
+        if tstamps.tz is not None:
+            tstamps = tstamps.tz_convert(None)  # UTC, as date2num does
+    except AttributeError:
+        return False  # not datetime like
+
+    values = np.asarray(tstamps.values)
+    if values.dtype.kind != 'M':
+        return False
+
+    if np.isnat(values).any():
+        return False  # not a date: as the bar by bar load handles it
+
+    dtnums = date2numarray(values)
+    if data._tzinput:
+        dtnums = data._tzinputarray(dtnums)
+
+    # same as load: skip bars before fromdate, stop at the 1st after todate
+    over = np.flatnonzero(dtnums > data.todate)
+    end = over[0] if len(over) else len(dtnums)
+    keep = np.flatnonzero(dtnums[:end] >= data.fromdate)
+
+    columns = dict(columns, datetime=dtnums)
+    for datafield in data.getlinealiases():
+        col = columns.get(datafield, None)
+        if col is None:
+            vals = np.full(len(keep), float('NaN'))
+        else:
+            vals = np.asarray(col, dtype=np.float64)[keep]
+
+        getattr(data.lines, datafield).loadarray(vals)
+
+    data.home()
+    data._rsbulk = data._rsbulkok()
+    data._rsbulkload()
+    return True
+
 
 class PandasDirectData(feed.DataBase):
     '''
@@ -64,6 +126,26 @@ class PandasDirectData(feed.DataBase):
         # reset the iterator on each start
         self._rows = self.p.dataname.itertuples()
 
+    def preload(self):
+        df = self.p.dataname
+
+        columns = dict()
+        for datafield in self.getlinealiases():
+            colidx = getattr(self.params, datafield)
+            if colidx < 0:
+                columns[datafield] = None
+            elif colidx == 0:  # 1st in the tuples from itertuples
+                columns[datafield] = df.index
+            else:
+                columns[datafield] = df.iloc[:, colidx - 1]
+
+        tstamps = columns.pop('datetime')
+        if not _bulkpreload(self, tstamps, columns):
+            super(PandasDirectData, self).preload()
+            return
+
+        self._rows = iter(())  # all rows delivered
+
     def _load(self):
         try:
             row = next(self._rows)
@@ -231,6 +313,26 @@ class PandasData(feed.DataBase):
 
             self._colmapping[k] = v
 
+    def preload(self):
+        df = self.p.dataname
+
+        columns = dict()
+        for datafield in self.getlinealiases():
+            colindex = self._colmapping[datafield]
+            if colindex is not None:
+                colindex = df.iloc[:, colindex]
+            columns[datafield] = colindex
+
+        tstamps = columns.pop('datetime')
+        if tstamps is None:
+            tstamps = df.index  # standard index in the datetime
+
+        if not _bulkpreload(self, tstamps, columns):
+            super(PandasData, self).preload()
+            return
+
+        self._idx = len(df)  # all rows delivered
+
     def _load(self):
         self._idx += 1
 
@@ -76,6 +76,9 @@ class QuandlCSV(feed.CSVDataBase):
     def start(self):
         super(QuandlCSV, self).start()
 
+        if self.f is None:
+            return  # values delivered by the cache, already in order
+
         if not self.params.reverse:
             return
         elif self._online:
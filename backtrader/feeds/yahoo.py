@@ -89,6 +89,9 @@ class YahooFinanceCSVData(feed.CSVDataBase):
     def start(self):
         super(YahooFinanceCSVData, self).start()
 
+        if self.f is None:
+            return  # values delivered by the cache, already in order
+
         if self.p.version == 'v7':
             return  # no need to reverse
 
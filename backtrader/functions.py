@@ -24,8 +24,9 @@ from __future__ import (absolute_import, division, print_function,
 import functools
 import math
 
-from .linebuffer import LineActions
+from .linebuffer import LineActions, PseudoArray
 from .utils.py3 import cmp, range
+from . import npsupport
 
 
 # Generate a List equivalent which uses "is" for contains
@@ -200,6 +201,11 @@ class MultiLogic(Logic):
         arrays = [arg.array for arg in self.args]
         flogic = self.flogic
 
+        srcs = [x.wrapped if isinstance(x, PseudoArray) else x for x in arrays]
+        vals = npsupport.elementop(flogic, srcs, start, end)
+        if vals is not None and npsupport.setslice(dst, start, end, vals):
+            return  # calculated in vectorized form
+
         for i in range(start, end):
             dst[i] = flogic([arr[i] for arr in arrays])
 
@@ -22,8 +22,14 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
 
+import collections
+import copy
+import hashlib
+import threading
+
 from .utils.py3 import range, with_metaclass
 
+from .linebuffer import LineBuffer
 from .lineiterator import LineIterator, IndicatorBase
 from .lineseries import LineSeriesMaker, Lines
 from .metabase import AutoInfoClass
@@ -87,11 +93,123 @@ class MetaIndicator(IndicatorBase.__class__):
             cls.oncestart = cls.oncestart_via_nextstart
 
 
+def linedigest(line):
+    '''Returns a digest of the contents of a line. It is calculated each time,
+    because the values may have been changed in place (replaying, setting
+    values in a data ...) with no change in the storage'''
+    arr = line.array
+    try:
+        return hashlib.sha1(arr).hexdigest()
+    except TypeError:  # no buffer interface (Python 2)
+        return hashlib.sha1(arr.tostring()).hexdigest()
+
+
 class Indicator(with_metaclass(MetaIndicator, IndicatorBase)):
     _ltype = LineIterator.IndType
 
     csv = False
 
+    # Result cache: the values calculated in "once" mode by an indicator and
+    # by the indicators/operations it uses (keyed on the class, the params and
+    # the contents of the input lines) are reused by identical indicators,
+    # like in the different runs of an optimization. Least recently used
+    # entries are evicted when the size is exceeded
+    _rcache = collections.OrderedDict()
+    _rcachesize = 0
+    _rcachelock = threading.Lock()  # indicators may run in parallel
+
+    # digests of the input lines, see usedigestmemo
+    _rdigests = None
+
+    @staticmethod
+    def useresultcache(size):
+        Indicator._rcachesize = size
+        while len(Indicator._rcache) > size:
+            Indicator._rcache.popitem(last=False)
+
+    @staticmethod
+    def usedigestmemo(onoff):
+        '''Keeps the digest of each input line once calculated. Only while the
+        contents of the lines do not change, i.e.: during the "once"
+        calculation of the indicators of a run'''
+        Indicator._rdigests = dict() if onoff else None
+
+    @staticmethod
+    def _linedigest(line):
+        digests = Indicator._rdigests
+        if digests is None:
+            return linedigest(line)
+
+        try:
+            return digests[id(line)][1]
+        except KeyError:
+            digest = linedigest(line)
+            digests[id(line)] = (line, digest)  # line kept: id not reused
+            return digest
+
+    def _resultkey(self):
+        '''Key of the values of the indicator in the result cache'''
+        inputs = tuple(self._linedigest(line)
+                       for data in self.datas for line in data.lines)
+
+        # the storage defines the type of the cached arrays
+        return (self.__class__, tuple(self.params._getvalues()),
+                self._minperiod, LineBuffer._npstorage, inputs)
+
+    def _calclines(self):
+        '''Returns the lines calculated in "once" mode by the indicator and by
+        the indicators/operations it uses, in the order of calculation'''
+        lines = list()
+        for indicator in self._lineiterators[LineIterator.IndType]:
+            if isinstance(indicator, Indicator):
+                lines.extend(indicator._calclines())
+            elif isinstance(indicator, LineIterator):
+                lines.extend(indicator.lines)  # nothing below is cached
+            else:  # line operation, single line
+                lines.append(indicator)
+
+        lines.extend(self.lines)
+        return lines
+
+    def _once(self):
+        if not self._rcachesize:
+            super(Indicator, self)._once()
+            return
+
+        rkey = self._resultkey()
+        try:
+            with self._rcachelock:
+                arrays = self._rcache.pop(rkey)  # reinserted as most recent
+        except TypeError:  # something not hashable (params)
+            super(Indicator, self)._once()
+            return
+        except KeyError:
+            super(Indicator, self)._once()
+            # lazy (fused) operations were not calculated (None)
+            arrays = [None if getattr(line, '_lazylen', None) is not None
+                      else copy.copy(line.array)
+                      for line in self._calclines()]
+        else:
+            # calculation skipped, also that of the children
+            for line, arr in zip(self._calclines(), arrays):
+                if arr is None:  # left lazy, as when calculated
+                    line._lazylen = line._clock.buflen()
+                    del line.array
+                else:
+                    line.array = copy.copy(arr)
+                    line.oncebinding()
+
+        with self._rcachelock:
+            self._rcache[rkey] = arrays
+            while len(self._rcache) > self._rcachesize:
+                self._rcache.popitem(last=False)
+
+    def _oncebynext(self):
+        cls = self.__class__
+        return (cls.once == Indicator.once_via_next or
+                cls.preonce == Indicator.preonce_via_prenext or
+                cls.oncestart == Indicator.oncestart_via_nextstart)
+
     def advance(self, size=1):
         # Need intercepting this call to support datas with
         # different lengths (timeframes)
@@ -26,6 +26,7 @@ import math
 import operator
 
 from ..utils.py3 import map, range
+from .. import npsupport
 
 from . import Indicator
 
@@ -66,6 +67,10 @@ class OperationN(PeriodN):
         period = self.p.period
         func = self.func
 
+        vals = npsupport.windowop(func, src, period, start, end)
+        if vals is not None and npsupport.setslice(dst, start, end, vals):
+            return  # calculated in vectorized form
+
         for i in range(start, end):
             dst[i] = func(src[i - period + 1: i + 1])
 
@@ -360,6 +365,11 @@ class Average(PeriodN):
         dst = self.line.array
         period = self.p.period
 
+        vals = npsupport.windowfsum(src, period, start, end)
+        if vals is not None and npsupport.setslice(dst, start, end,
+                                                   vals / period):
+            return  # calculated in vectorized form
+
         for i in range(start, end):
             dst[i] = math.fsum(src[i - period + 1:i + 1]) / period
 
@@ -408,6 +418,21 @@ class ExponentialSmoothing(Average):
 
         # Seed value from SMA calculated with the call to oncestart
         prev = larray[start - 1]
+
+        # The recursion is inherently sequential, but the data term can be
+        # vectorized (the same rounding takes place, results are identical)
+        dnp = npsupport.ndview(darray)
+        lnp = npsupport.ndview(larray)
+        if dnp is not None and lnp is not None and start < end <= len(dnp):
+            prev = float(prev)
+            vals = list()
+            for dalpha in (dnp[start:end] * alpha).tolist():
+                prev = prev * alpha1 + dalpha
+                vals.append(prev)
+
+            lnp[start:end] = vals
+            return
+
         for i in range(start, end):
             larray[i] = prev = prev * alpha1 + darray[i] * alpha
 
@@ -21,7 +21,12 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+import collections
+import math
+
 import backtrader as bt
+from .. import npsupport
+from ..npsupport import np
 from . import PeriodN
 
 
@@ -29,43 +34,201 @@ __all__ = ['OLS_Slope_InterceptN', 'OLS_TransformationN', 'OLS_BetaN',
            'CointN']
 
 
-class OLS_Slope_InterceptN(PeriodN):
+def _msum(partials, x):
+    '''Adds ``x`` to the non-overlapping ``partials`` (Shewchuk's algorithm,
+    used by ``math.fsum``), which keep the exact sum of all values added'''
+    i = 0
+    for y in partials:
+        if abs(x) < abs(y):
+            x, y = y, x
+        hi = x + y
+        lo = y - (hi - x)
+        if lo:
+            partials[i] = lo
+            i += 1
+        x = hi
+
+    partials[i:] = [x]
+
+
+def _isfinite(x):
+    return not (math.isinf(x) or math.isnan(x))
+
+
+def _olsfit(n, sx, sy, sxx, sxy):
+    '''Returns ``(alpha, beta)`` of the regression (with constant) of y on x
+    for ``n`` values from the sums of x, y, x * x and x * y'''
+    den = n * sxx - sx * sx
+    if not den:
+        return float('NaN'), float('NaN')
+
+    beta = (n * sxy - sx * sy) / den
+    alpha = (sy - beta * sx) / n
+    return alpha, beta
+
+
+class _RollingOLS(object):
+    '''
+    Rolling regression (Ordinary least squares with constant) of y on x over
+    the last ``period`` values, calculated in closed form from the sums of x,
+    y, x * x and x * y.
+
+    The sums are updated in O(1) with the values entering and leaving the
+    window, but are not subject to rounding errors: each sum is kept as the
+    exact partials of ``math.fsum`` and rounded only when delivered. They are
+    therefore the same as the ``math.fsum`` of the window and the same as the
+    vectorized ones of ``_windowfits``
     '''
-    Calculates a linear regression using ``statsmodel.OLS`` (Ordinary least
-    squares) of data1 on data0
+    def __init__(self, period):
+        self.period = period
+        self.window = collections.deque()  # (x, y) values
+        self.sums = [list() for i in range(4)]  # partials of x, y, xx, xy
+        self.nonfinite = 0  # values in the window which cannot be summed
+        self.pos = None  # length of the owner when last updated
+
+    def _add(self, x, y, sign=1.0):
+        terms = (x, y, x * x, x * y)
+        if not all(_isfinite(term) for term in terms):
+            self.nonfinite += int(sign)
+            return
+
+        for partials, term in zip(self.sums, terms):
+            _msum(partials, sign * term)
+
+    def push(self, x, y):
+        '''Adds the values to the window, dropping the oldest if full'''
+        if len(self.window) == self.period:
+            self._add(*self.window.popleft(), sign=-1.0)
+
+        self.window.append((x, y))
+        self._add(x, y)
+
+    def update(self, pos, xs, ys):
+        '''Moves the window to the current values of the lines ``xs`` and
+        ``ys`` at ``pos`` (length of the owner) and returns the fit. Several
+        updates with the same ``pos`` replace the values (replayed bars)'''
+        if pos == self.pos:
+            self._add(*self.window.pop(), sign=-1.0)
+        elif not self.window:  # 1st window, take also the previous values
+            for ago in range(1 - self.period, 0):
+                self.push(xs[ago], ys[ago])
+
+        self.push(xs[0], ys[0])
+        self.pos = pos
+        return self.fit()
+
+    def fit(self):
+        '''Returns ``(alpha, beta)`` for the values in the window'''
+        if self.nonfinite:
+            return float('NaN'), float('NaN')
+
+        sums = [math.fsum(partials) for partials in self.sums]
+        return _olsfit(float(self.period), *sums)
+
+
+def _windowfits(xs, ys, period, start, end):
+    '''Vectorized ``_RollingOLS`` for the windows ending at indices ``start``
+    to ``end - 1`` of the line storages ``xs`` and ``ys``. Returns the arrays
+    ``(alphas, betas)`` or ``None``'''
+    x, y = npsupport.ndview(xs), npsupport.ndview(ys)
+    first = start - period + 1
+    if x is None or y is None or first < 0 or \
+            not start < end <= min(len(x), len(y)):
+        return None
+
+    x, y = x[first:end], y[first:end]
+    sums = list()
+    for term in (x, y, x * x, x * y):
+        tsum = npsupport.windowfsum(term, period, period - 1, len(term))
+        if tsum is None:
+            return None  # the sums cannot be vectorized
+
+        sums.append(tsum)
+
+    n = float(period)
+    sx, sy, sxx, sxy = sums
+    with np.errstate(divide='ignore', invalid='ignore'):
+        den = n * sxx - sx * sx
+        betas = (n * sxy - sx * sy) / den
+        betas[den == 0.0] = float('NaN')
+        alphas = (sy - betas * sx) / n
+
+    return alphas, betas
 
-    Uses ``pandas`` and ``statsmodels``
 
-    Use ``prepend_constant`` to influence the paramter ``prepend`` of
-    sm.add_constant
+class _RollingOLSN(PeriodN):
+    '''
+    Base class of the indicators calculated from the rolling regression of
+    data0 on data1 (see ``_RollingOLS``), in ``next`` and (vectorized if
+    possible) in ``once`` mode
+
+    Subclasses return the values of the lines from ``alpha`` and ``beta`` in
+    ``_olslines``
     '''
     _mindatas = 2  # ensure at least 2 data feeds are passed
 
-    packages = (
-        ('pandas', 'pd'),
-        ('statsmodels.api', 'sm'),
-    )
+    def __init__(self):
+        super(_RollingOLSN, self).__init__()
+        self._ols = _RollingOLS(self.p.period)
+
+    def _olslines(self, alpha, beta):
+        raise NotImplementedError
+
+    def next(self):
+        alpha, beta = self._ols.update(len(self), self.data1, self.data0)
+        for line, val in zip(self.lines, self._olslines(alpha, beta)):
+            line[0] = val
+
+    def once(self, start, end):
+        xs, ys = self.data1.array, self.data0.array
+        period = self.p.period
+
+        fits = _windowfits(xs, ys, period, start, end)
+        if fits is not None:
+            vals = self._olslines(*fits)
+            if all(npsupport.setslice(line.array, start, end, val)
+                   for line, val in zip(self.lines, vals)):
+                return  # calculated in vectorized form
+
+        ols = _RollingOLS(period)
+        for i in range(start - period + 1, end):
+            ols.push(xs[i], ys[i])
+            if i >= start:
+                for line, val in zip(self.lines, self._olslines(*ols.fit())):
+                    line.array[i] = val
+
+
+class OLS_Slope_InterceptN(_RollingOLSN):
+    '''
+    Calculates a linear regression (Ordinary least squares) of data0 on data1
+    over a ``period``
+
+    The regression is calculated in closed form over a rolling window. The
+    values are the same as with ``statsmodels.OLS`` (within floating point
+    precision)
+
+    The values of the lines are the parameters of the regression in the order
+    in which ``statsmodels.OLS`` delivers them after ``sm.add_constant``. Use
+    ``prepend_constant`` to influence the paramter ``prepend`` of
+    sm.add_constant, i.e.: if the constant goes first
+    '''
     lines = ('slope', 'intercept',)
     params = (
         ('period', 10),
         ('prepend_constant', True),
     )
 
-    def next(self):
-        p0 = pd.Series(self.data0.get(size=self.p.period))
-        p1 = pd.Series(self.data1.get(size=self.p.period))
-        p1 = sm.add_constant(p1, prepend=self.p.prepend_constant)
-        slope, intercept = sm.OLS(p0, p1).fit().params
+    def _olslines(self, alpha, beta):
+        if self.p.prepend_constant:
+            return alpha, beta
 
-        self.lines.slope[0] = slope
-        self.lines.intercept[0] = intercept
+        return beta, alpha
 
 
 class OLS_TransformationN(PeriodN):
     '''
-    Calculates the ``zscore`` for data0 and data1. Although it doesn't directly
-    uses any external package it relies on ``OLS_SlopeInterceptN`` which uses
-    ``pandas`` and ``statsmodels``
+    Calculates the ``zscore`` for data0 and data1. It relies on
+    ``OLS_Slope_InterceptN`` for the regression
     '''
     _mindatas = 2  # ensure at least 2 data feeds are passed
     lines = ('spread', 'spread_mean', 'spread_std', 'zscore',)
@@ -82,25 +245,18 @@ class OLS_TransformationN(PeriodN):
         self.l.zscore = (spread - self.l.spread_mean) / self.l.spread_std
 
 
-class OLS_BetaN(PeriodN):
+class OLS_BetaN(_RollingOLSN):
     '''
-    Calculates a regression of data1 on data0 using ``pandas.ols``
+    Calculates the beta of the regression of data0 on data1 (with constant)
+    over a ``period``, like ``pandas.ols`` did
 
-    Uses ``pandas``
+    The regression is calculated in closed form over a rolling window
     '''
-    _mindatas = 2  # ensure at least 2 data feeds are passed
-
-    packages = (
-        ('pandas', 'pd'),
-    )
-
     lines = ('beta',)
     params = (('period', 10),)
 
-    def next(self):
-        y, x = (pd.Series(d.get(size=self.p.period)) for d in self.datas)
-        r_beta = pd.ols(y=y, x=x, window_type='full_sample')
-        self.lines.beta[0] = r_beta.beta['x']
+    def _olslines(self, alpha, beta):
+        return (beta,)
 
 
 class CointN(PeriodN):
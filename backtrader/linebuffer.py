@@ -36,12 +36,17 @@ import collections
 import datetime
 from itertools import islice
 import math
+import operator
 
 from .utils.py3 import range, with_metaclass, string_types
 
 from .lineroot import LineRoot, LineSingle, LineMultiple
 from . import metabase
+from .errors import ModuleImportError
 from .utils import num2date, time2num
+from . import npsupport
+from . import shmsupport
+from .npsupport import np
 
 
 NAN = float('NaN')
@@ -68,10 +73,33 @@ class LineBuffer(LineSingle):
     The class can also hold "bindings" to other LineBuffers. When a value
     is set in this class
     it will also be set in the binding.
+
+    If the *numpy* storage is active (see ``usestorage``) buffers whose final
+    length is known (preloaded datas, lines forwarded in a single shot during
+    ``once``) are held as a contiguous ``float64`` numpy array, which is
+    available through ``array`` and allows taking zero-copy views
     '''
 
     UnBounded, QBuffer = (0, 1)
 
+    _npstorage = False  # class wide switch, see usestorage
+
+    @classmethod
+    def usestorage(cls, storage):
+        '''Chooses the storage for unbounded buffers:
+
+          - ``array``: a Python ``array.array`` of doubles (default)
+          - ``numpy``: a contiguous ``numpy.ndarray`` of ``float64`` once the
+            length of the buffer is known
+        '''
+        if storage not in ('array', 'numpy'):
+            raise ValueError('Unknown line storage: %s' % storage)
+
+        if storage == 'numpy' and np is None:
+            raise ModuleImportError('numpy is needed for line storage numpy')
+
+        cls._npstorage = storage == 'numpy'
+
     def __init__(self):
         self.lines = [self]
         self.mode = self.UnBounded
@@ -125,6 +153,49 @@ class LineBuffer(LineSingle):
         self.lenmark = self.maxlen - (not self.extrasize)
         self.reset()
 
+    def npbuffer(self):
+        '''Moves the buffer to a contiguous float64 numpy array if the numpy
+        storage is active. To be called once the buffer has reached its full
+        length, as it happens after preloading a data feed'''
+        if not self._npstorage or self.mode == self.QBuffer:
+            return
+
+        if not isinstance(self.array, np.ndarray):
+            self.array = np.array(self.array, dtype=np.float64)
+
+    def loadarray(self, values):
+        '''Replaces the buffer with the float64 numpy array ``values`` (the
+        final length is known, as it happens after preloading) in the active
+        storage and rewinds the buffer'''
+        self.reset()
+        if self._npstorage:
+            self.array = values
+        else:
+            self.array.frombytes(values.tobytes())
+
+    def shmbuffer(self):
+        '''Moves the buffer to a shared memory segment (see ``shmsupport``)
+        which has to be released with ``shmrelease``'''
+        self.array = shmsupport.toshared(self.array)
+
+    def shmrelease(self):
+        '''Moves the buffer back from the shared memory segment to the active
+        storage and releases the segment'''
+        shmarr = self.array
+        if self._npstorage:
+            self.array = np.array(shmarr, dtype=np.float64)
+        else:
+            self.array = array.array(str('d'))
+            self.array.frombytes(shmarr.tobytes())
+
+        name = shmarr._shmname
+        del shmarr  # no view of the segment may be left
+        shmsupport.unlink(name)
+
+    def isndarray(self):
+        '''Returns ``True`` if the buffer is held in a numpy array'''
+        return np is not None and isinstance(self.array, np.ndarray)
+
     def getindicators(self):
         return []
 
@@ -181,6 +252,11 @@ class LineBuffer(LineSingle):
             end = self.idx + ago + 1
             return list(islice(self.array, start, end))
 
+        if self.isndarray():  # keep the interface of the default storage
+            return array.array(
+                str('d'), self.array[self.idx + ago - size + 1:
+                                     self.idx + ago + 1])
+
         return self.array[self.idx + ago - size + 1:self.idx + ago + 1]
 
     def getzeroval(self, idx=0):
@@ -209,6 +285,9 @@ class LineBuffer(LineSingle):
         if self.useislice:
             return list(islice(self.array, idx, idx + size))
 
+        if self.isndarray():  # keep the interface of the default storage
+            return array.array(str('d'), self.array[idx:idx + size])
+
         return self.array[idx:idx + size]
 
     def __setitem__(self, ago, value):
@@ -254,6 +333,31 @@ class LineBuffer(LineSingle):
         self.idx += size
         self.lencount += size
 
+        if self._npstorage and self.mode != self.QBuffer:
+            self._npappend(value, size)
+            return
+
+        for i in range(size):
+            self.array.append(value)
+
+    def _npappend(self, value, size):
+        '''Appends to the buffer when the numpy storage is active.
+
+        Enlarging by more than one position (single shot forward in ``once``
+        or ``extend``) allocates the numpy array. Single appends are the
+        domain of event based operation and go to an ``array.array``
+        '''
+        if not size:
+            return
+
+        if size > 1:
+            self.array = np.concatenate(
+                (self.array, np.full(size, value, dtype=np.float64)))
+            return
+
+        if isinstance(self.array, np.ndarray):
+            self.array = array.array(str('d'), self.array)
+
         for i in range(size):
             self.array.append(value)
 
@@ -267,6 +371,10 @@ class LineBuffer(LineSingle):
         # Go directly to property setter to support force
         self.set_idx(self._idx - size, force=force)
         self.lencount -= size
+        if self.isndarray():
+            self.array = self.array[:len(self.array) - size]
+            return
+
         for i in range(size):
             self.array.pop()
 
@@ -294,9 +402,22 @@ class LineBuffer(LineSingle):
         set values in the buffer "future"
         '''
         self.extension += size
+        if self._npstorage and self.mode != self.QBuffer:
+            self._npappend(value, size)
+            return
+
         for i in range(size):
             self.array.append(value)
 
+    def _boundids(self):
+        '''Returns the ids of the line and of the lines bound to it (which are
+        set with its values)'''
+        ids = set([id(self)])
+        for binding in self.bindings:
+            ids |= binding._boundids()
+
+        return ids
+
     def addbinding(self, binding):
         ''' Adds another line binding
 
@@ -338,7 +459,10 @@ class LineBuffer(LineSingle):
         larray = self.array
         blen = self.buflen()
         for binding in self.bindings:
-            binding.array[0:blen] = larray[0:blen]
+            try:
+                binding.array[0:blen] = larray[0:blen]
+            except TypeError:  # array.array binding, numpy source
+                binding.array[0:blen] = array.array(str('d'), larray[0:blen])
 
     def bind2lines(self, binding=0):
         '''
@@ -383,17 +507,47 @@ class LineBuffer(LineSingle):
     def _settz(self, tz):
         self._tz = tz
 
+    _dtcache = None  # decoded timestamps, see _num2date
+    _dtcachesize = 8
+
+    def _num2date(self, x, tz, naive):
+        '''
+        ``num2date`` with a small cache of the decoded timestamps, to decode
+        the timestamp of a bar only once regardless of how many consumers ask
+        for it.
+
+        The cache is keyed by the value itself and is therefore immune to
+        changes of the buffer (moving or overwriting bars)
+        '''
+        dtcache = self._dtcache
+        if dtcache is None:
+            dtcache = self._dtcache = dict()
+
+        key = (x, tz, naive)
+        try:
+            return dtcache[key]
+        except KeyError:
+            pass
+        except TypeError:  # unhashable tz, cannot cache it
+            return num2date(x, tz=tz, naive=naive)
+
+        if len(dtcache) >= self._dtcachesize:
+            dtcache.clear()  # old bars, the current bar will be cached again
+
+        dtcache[key] = dt = num2date(x, tz=tz, naive=naive)
+        return dt
+
     def datetime(self, ago=0, tz=None, naive=True):
-        return num2date(self.array[self.idx + ago],
-                        tz=tz or self._tz, naive=naive)
+        return self._num2date(self.array[self.idx + ago],
+                              tz or self._tz, naive)
 
     def date(self, ago=0, tz=None, naive=True):
-        return num2date(self.array[self.idx + ago],
-                        tz=tz or self._tz, naive=naive).date()
+        return self._num2date(self.array[self.idx + ago],
+                              tz or self._tz, naive).date()
 
     def time(self, ago=0, tz=None, naive=True):
-        return num2date(self.array[self.idx + ago],
-                        tz=tz or self._tz, naive=naive).time()
+        return self._num2date(self.array[self.idx + ago],
+                              tz or self._tz, naive).time()
 
     def dt(self, ago=0):
         '''
@@ -417,7 +571,8 @@ class LineBuffer(LineSingle):
         # To avoid precision errors, this returns the fractional part after
         # having converted it to a datetime.time object to avoid precision
         # errors in comparisons
-        return time2num(num2date(self.array[self.idx + ago]).time())
+        return time2num(self._num2date(self.array[self.idx + ago],
+                                       None, True).time())
 
     def tm_lt(self, other, ago=0):
         '''
@@ -623,6 +778,16 @@ class LineActions(with_metaclass(MetaLineActions, LineBuffer)):
         else:
             self.prenext()
 
+    def _linesio(self):
+        '''Returns the ids of the lines read and written by the calculation
+        in ``once`` mode'''
+        reads = set()
+        for data in self._datas:
+            lines = [data] if isinstance(data, LineSingle) else data.lines
+            reads.update(id(line) for line in lines)
+
+        return reads, self._boundids()
+
     def _once(self):
         self.forward(size=self._clock.buflen())
         self.home()
@@ -669,6 +834,10 @@ class _LineDelay(LineActions):
         src = self.a.array
         ago = self.ago
 
+        vals = npsupport.shiftop(src, ago, start, end)
+        if vals is not None and npsupport.setslice(dst, start, end, vals):
+            return  # calculated in vectorized form
+
         for i in range(start, end):
             dst[i] = src[i + ago]
 
@@ -699,11 +868,185 @@ class _LineForward(LineActions):
         src = self.a.array
         ago = self.ago
 
+        vals = npsupport.shiftop(src, 0, start, end)
+        if vals is not None and \
+                npsupport.setslice(dst, start - ago, end - ago, vals):
+            return  # calculated in vectorized form
+
         for i in range(start, end):
             dst[i - ago] = src[i]
 
 
-class LinesOperation(LineActions):
+class LineOperationBase(LineActions):
+    '''
+    Common base of the operations created with the arithmetic, logic and
+    comparison operators of the lines
+
+    Each operation is a node of an expression graph, whose operands are the
+    previous nodes. If fusion is active (see ``usefusion``) the nodes which
+    are only an operand of other operations are not calculated during
+    ``_once``. The last operation of a chain evaluates the whole expression
+    in a single pass, without filling the buffers of the intermediate nodes.
+
+    The buffer of an intermediate node is materialized on demand, i.e.: the
+    first time its ``array`` is accessed (because it is also referenced by
+    an indicator, by a strategy ...)
+    '''
+    _fuse = False  # class wide switch, see usefusion
+    _fused = False  # operand of a fusable operation
+    _lazylen = None  # length of the not yet materialized buffer
+
+    @classmethod
+    def usefusion(cls, onoff):
+        cls._fuse = onoff
+
+    def _fusable(self):
+        '''Returns ``True`` if the operation can be part of a fused
+        expression'''
+        return True
+
+    def _fusedoperands(self):
+        '''Returns the operands in the order they are passed to
+        ``operation``'''
+        raise NotImplementedError
+
+    def _setoperands(self, *operands):
+        if self._fusable():
+            for operand in operands:
+                if isinstance(operand, LineOperationBase):
+                    operand._fused = True
+
+    def __getattr__(self, name):
+        # only reached if "array" was removed from a node left unevaluated
+        if name == 'array' and self._lazylen is not None:
+            self._materialize()
+            return self.array
+
+        raise AttributeError(name)
+
+    def buflen(self):
+        if self._lazylen is not None:
+            return self._lazylen  # do not materialize to report the length
+
+        return super(LineOperationBase, self).buflen()
+
+    def _once(self):
+        if self._fuse and self._fused and self._fusable() and \
+                not self.bindings:
+            # calculated by the operations using it, if ever needed
+            self._lazylen = self._clock.buflen()
+            del self.array
+            return
+
+        super(LineOperationBase, self)._once()
+
+    def _materialize(self):
+        buflen, self._lazylen = self._lazylen, None
+
+        lencount, idx = self.lencount, self.idx
+        self.reset()
+        self.forward(size=buflen)  # same storage as a regular calculation
+
+        self.preonce(0, self._minperiod - 1)
+        self.oncestart(self._minperiod - 1, self._minperiod)
+        self.once(self._minperiod, buflen)
+
+        self.lencount, self.idx = lencount, idx
+
+    def _fusedtree(self):
+        '''Returns the expression tree of the operation as a tuple
+        ``(operation, operand, ...)`` in which the operands are expanded to
+        trees if not yet materialized, to the storage of lines otherwise or
+        kept as they are if not lines'''
+        tree = [self.operation]
+        for operand in self._fusedoperands():
+            if isinstance(operand, LineOperationBase) and \
+                    operand._lazylen is not None:
+                operand = operand._fusedtree()
+            elif isinstance(operand, LineBuffer):
+                operand = operand.array
+
+            tree.append(operand)
+
+        return tuple(tree)
+
+    def _fusedonce(self, start, end):
+        '''Calculates the operation as a fused expression if some of the
+        operands was left unevaluated. Returns ``True`` if done'''
+        if not self._fusable() or end <= start:
+            return False
+
+        tree = self._fusedtree()
+        if not any(isinstance(x, tuple) for x in tree[1:]):
+            return False  # plain operation, nothing to fuse
+
+        vals = npsupport.exprop(tree, start, end)
+        if vals is not None and npsupport.setslice(self.array, start, end,
+                                                   vals):
+            return True  # calculated in vectorized form
+
+        fusedloop, args = _fusedloop(tree)
+        fusedloop(self.array, start, end, *args)
+        return True
+
+
+# operations which deliver a float if the operands are floats. The result of
+# any other operation is converted to float, as it happens when it is stored
+# in the buffer of an intermediate node
+_FLOATOPS = set([operator.add, operator.sub, operator.mul, operator.truediv,
+                 operator.floordiv, operator.mod, operator.neg, operator.abs,
+                 getattr(operator, 'div', operator.truediv)])
+
+_fusedcache = dict()  # source code -> function
+
+
+def _fusedsource(tree, args, inner=False):
+    '''Returns the source code of the expression for element "i" of a tree
+    adding the referenced operations, storages and constants to args'''
+    op = 'a%d' % len(args)
+    args.append(tree[0])
+
+    operands = list()
+    for operand in tree[1:]:
+        if isinstance(operand, tuple):
+            operands.append(_fusedsource(operand, args, inner=True))
+        else:
+            name = 'a%d' % len(args)
+            args.append(operand)
+            if isinstance(operand, array.array) or \
+                    (np is not None and isinstance(operand, np.ndarray)):
+                name += '[i]'
+
+            operands.append(name)
+
+    src = '%s(%s)' % (op, ', '.join(operands))
+    if inner and tree[0] not in _FLOATOPS:
+        src = 'float(%s)' % src
+
+    return src
+
+
+def _fusedloop(tree):
+    '''Returns a function which evaluates the tree in a single loop and the
+    arguments it takes after "dst, start, end"'''
+    args = list()
+    expr = _fusedsource(tree, args)
+    names = ', '.join('a%d' % i for i in range(len(args)))
+    src = ('def fusedloop(dst, start, end, %s):\n'
+           '    for i in range(start, end):\n'
+           '        dst[i] = %s\n') % (names, expr)
+
+    try:
+        fusedloop = _fusedcache[src]
+    except KeyError:
+        namespace = dict(range=range, float=float)
+        exec(compile(src, '<fusedloop>', 'exec'), namespace)
+        fusedloop = _fusedcache.setdefault(src, namespace['fusedloop'])
+
+    return fusedloop, args
+
+
+class LinesOperation(LineOperationBase):
 
     '''
     Holds an operation that operates on a two operands. Example: mul
@@ -723,6 +1066,10 @@ class LinesOperation(LineActions):
     No real execution time benefits were appreciated and therefore the loops
     have been kept in place for clarity (although the maps are not really
     unclear here)
+
+    If numpy is available and the operands are array backed, the "once"
+    operations are executed on the whole arrays (see ``npsupport``), with the
+    loops remaining as the fallback
     '''
 
     def __init__(self, a, b, operation, r=False):
@@ -740,6 +1087,14 @@ class LinesOperation(LineActions):
         if r:
             self.a, self.b = b, a
 
+        self._setoperands(a, b)
+
+    def _fusable(self):
+        return not self.btime  # the time conversions are not fused
+
+    def _fusedoperands(self):
+        return self.a, self.b
+
     def next(self):
         if self.bline:
             self[0] = self.operation(self.a[0], self.b[0])
@@ -752,6 +1107,9 @@ class LinesOperation(LineActions):
             self[0] = self.operation(self.a, self.b[0])
 
     def once(self, start, end):
+        if self._fuse and self._fusedonce(start, end):
+            return  # calculated as a single expression
+
         if self.bline:
             self._once_op(start, end)
         elif not self.r:
@@ -769,6 +1127,10 @@ class LinesOperation(LineActions):
         srcb = self.b.array
         op = self.operation
 
+        vals = npsupport.binaryop(op, srca, srcb, start, end)
+        if vals is not None and npsupport.setslice(dst, start, end, vals):
+            return  # calculated in vectorized form
+
         for i in range(start, end):
             dst[i] = op(srca[i], srcb[i])
 
@@ -780,6 +1142,11 @@ class LinesOperation(LineActions):
         op = self.operation
         tz = self._tz
 
+        vals = npsupport.timeop(op, srca, srcb, start, end, tz=tz)
+
+        if vals is not None and npsupport.setslice(dst, start, end, vals):
+            return  # calculated in vectorized form
+
         for i in range(start, end):
             dst[i] = op(num2date(srca[i], tz=tz).time(), srcb)
 
@@ -790,6 +1157,10 @@ class LinesOperation(LineActions):
         srcb = self.b
         op = self.operation
 
+        vals = npsupport.binaryop(op, srca, srcb, start, end)
+        if vals is not None and npsupport.setslice(dst, start, end, vals):
+            return  # calculated in vectorized form
+
         for i in range(start, end):
             dst[i] = op(srca[i], srcb)
 
@@ -800,11 +1171,15 @@ class LinesOperation(LineActions):
         srcb = self.b.array
         op = self.operation
 
+        vals = npsupport.binaryop(op, srca, srcb, start, end)
+        if vals is not None and npsupport.setslice(dst, start, end, vals):
+            return  # calculated in vectorized form
+
         for i in range(start, end):
             dst[i] = op(srca, srcb[i])
 
 
-class LineOwnOperation(LineActions):
+class LineOwnOperation(LineOperationBase):
     '''
     Holds an operation that operates on a single operand. Example: abs
 
@@ -817,14 +1192,26 @@ class LineOwnOperation(LineActions):
         self.operation = operation
         self.a = a
 
+        self._setoperands(a)
+
+    def _fusedoperands(self):
+        return (self.a,)
+
     def next(self):
         self[0] = self.operation(self.a[0])
 
     def once(self, start, end):
+        if self._fuse and self._fusedonce(start, end):
+            return  # calculated as a single expression
+
         # cache python dictionary lookups
         dst = self.array
         srca = self.a.array
         op = self.operation
 
+        vals = npsupport.unaryop(op, srca, start, end)
+        if vals is not None and npsupport.setslice(dst, start, end, vals):
+            return  # calculated in vectorized form
+
         for i in range(start, end):
             dst[i] = op(srca[i])
@@ -288,8 +288,7 @@ class LineIterator(with_metaclass(MetaLineIterator, LineSeries)):
     def _once(self):
         self.forward(size=self._clock.buflen())
 
-        for indicator in self._lineiterators[LineIterator.IndType]:
-            indicator._once()
+        self._onceindicators()
 
         for observer in self._lineiterators[LineIterator.ObsType]:
             observer.forward(size=self.buflen())
@@ -305,6 +304,70 @@ class LineIterator(with_metaclass(MetaLineIterator, LineSeries)):
 
         self.home()
 
+        self._oncecalc()
+
+        for line in self.lines:
+            line.oncebinding()
+
+    def _onceindicators(self):
+        for indicator in self._lineiterators[LineIterator.IndType]:
+            indicator._once()
+
+    def _oncebynext(self):
+        '''Returns ``True`` if the calculation in ``once`` mode moves the
+        inputs bar by bar (simulated with ``next``)'''
+        return False
+
+    def _linesio(self):
+        '''Returns the ids of the lines read and written by the calculation
+        in ``once`` mode, including that of the children. Inputs moved bar by
+        bar are also written'''
+        reads = set(id(line) for data in self.datas for line in data.lines)
+        writes = set()
+        for line in self.lines:
+            writes |= line._boundids()
+
+        if self._oncebynext():
+            writes |= reads
+
+        for indicator in self._lineiterators[LineIterator.IndType]:
+            ireads, iwrites = indicator._linesio()
+            reads |= ireads
+            writes |= iwrites
+
+        return reads, writes
+
+    def _oncegroups(self):
+        '''Returns the indicators (in lists which keep the order of
+        calculation) in independent groups: no lines are shared by the groups,
+        unless read by all of them'''
+        indicators = self._lineiterators[LineIterator.IndType]
+        groups = list(range(len(indicators)))  # union-find
+
+        def find(i):
+            while groups[i] != i:
+                groups[i] = i = groups[groups[i]]
+
+            return i
+
+        ios = [indicator._linesio() for indicator in indicators]
+        writers = dict()
+        for i, (reads, writes) in enumerate(ios):
+            for lid in writes:
+                groups[find(i)] = find(writers.setdefault(lid, i))
+
+        for i, (reads, writes) in enumerate(ios):
+            for lid in reads:
+                if lid in writers:
+                    groups[find(i)] = find(writers[lid])
+
+        ogroups = collections.OrderedDict()
+        for i, indicator in enumerate(indicators):
+            ogroups.setdefault(find(i), []).append(indicator)
+
+        return list(ogroups.values())
+
+    def _oncecalc(self):
         # These 3 remain empty for a strategy and therefore play no role
         # because a strategy will always be executed on a next basis
         # indicators are each called with its min period
@@ -312,9 +375,6 @@ class LineIterator(with_metaclass(MetaLineIterator, LineSeries)):
         self.oncestart(self._minperiod - 1, self._minperiod)
         self.once(self._minperiod, self.buflen())
 
-        for line in self.lines:
-            line.oncebinding()
-
     def preonce(self, start, end):
         pass
 
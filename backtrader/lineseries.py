@@ -301,6 +301,13 @@ class Lines(object):
         '''
         return self.lines[line].buflen()
 
+    def npbuffer(self):
+        '''
+        Proxy line operation
+        '''
+        for line in self.lines:
+            line.npbuffer()
+
 
 class MetaLineSeries(LineMultiple.__class__):
     '''
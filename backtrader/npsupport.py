@@ -0,0 +1,370 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+'''
+
+.. module:: npsupport
+
+Vectorized (numpy based) counterparts of the loops used in the ``once``
+methods of lines objects.
+
+Every function returns ``None`` if the calculation cannot be vectorized (numpy
+is not available, the storage of the line is not array like or the values
+could produce a result which is not bit-identical to the one of the Python
+loop) and the caller must then fall back to the loop.
+
+.. moduleauthor:: Daniel Rodriguez
+
+'''
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import array
+import math
+import functools
+import operator
+
+from .utils import num2date
+from .utils.dateintern import num2datearray, MUSECONDS_PER_DAY
+from .utils.py3 import integer_types
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # vectorized operations will not be available
+
+
+def ndview(arr):
+    '''
+    Returns a zero-copy float64 numpy view of the storage of a line, which can
+    be a ``numpy.ndarray`` or an ``array.array``, or ``None`` if no view can be
+    taken (numpy not available, ``deque`` storage ...)
+    '''
+    if np is None:
+        return None
+
+    if isinstance(arr, np.ndarray):
+        if arr.dtype == np.float64 and arr.ndim == 1:
+            return arr
+
+    elif isinstance(arr, array.array):
+        if arr.typecode == 'd' and len(arr):
+            return np.frombuffer(arr, dtype=np.float64)
+
+    return None
+
+
+def _plain(x):
+    '''
+    Values for which the numpy reductions match the Python built-ins: no NaN
+    (order dependent with max/min), no infinites and no negative zeros
+    '''
+    return np.isfinite(x).all() and not np.signbit(x[x == 0.0]).any()
+
+
+def _windows(src, period, start, end):
+    '''Returns the array holding the values of the windows ending at indices
+    ``start`` to ``end - 1`` or ``None``'''
+    src = ndview(src)
+    if src is None or start - period + 1 < 0 or not start < end <= len(src):
+        return None
+
+    return src[start - period + 1:end]
+
+
+def windowmax(src, period, start, end):
+    '''Vectorized ``max`` over the rolling windows of ``period`` values'''
+    x = _windows(src, period, start, end)
+    if x is None or not _plain(x):
+        return None
+
+    swv = np.lib.stride_tricks.sliding_window_view
+    return swv(x, period).max(axis=1)
+
+
+def windowmin(src, period, start, end):
+    '''Vectorized ``min`` over the rolling windows of ``period`` values'''
+    x = _windows(src, period, start, end)
+    if x is None or not _plain(x):
+        return None
+
+    swv = np.lib.stride_tricks.sliding_window_view
+    return swv(x, period).min(axis=1)
+
+
+def windowfsum(src, period, start, end):
+    '''
+    Vectorized ``math.fsum`` over the rolling windows of ``period`` values
+
+    ``fsum`` delivers the correctly rounded sum. The values are scaled to
+    integers (exactly, by a power of 2) and added as 64 bits integers, which
+    is exact. The final conversion to float rounds just once, like ``fsum``
+    does. Values spanning too many binary orders of magnitude cannot be
+    represented in 64 bits and the calculation is not vectorized
+    '''
+    x = _windows(src, period, start, end)
+    if x is None or not np.isfinite(x).all():
+        return None
+
+    nz = x[x != 0.0]
+    if not len(nz):
+        return np.zeros(end - start)
+
+    mant, exps = np.frexp(nz)  # nz = mant * 2 ** exps, 0.5 <= |mant| < 1
+    imant = np.ldexp(mant, 53).astype(np.int64)  # exact integer mantissas
+    lowbits = np.frexp((imant & -imant).astype(np.float64))[1] - 1
+    shift = int((exps - 53 + lowbits).min())  # exponent of the lowest bit
+    top = int(exps.max())  # all values are below 2 ** top
+
+    if (top - shift + int(period).bit_length()) > 62 or shift < -1000:
+        return None  # not representable or could go subnormal
+
+    ints = np.ldexp(x, -shift).astype(np.int64)
+    # integer overflow wraps around, which is harmless for the differences
+    # as long as each window sum fits in 64 bits (checked above)
+    csum = np.concatenate(([0], np.cumsum(ints)))
+    sums = csum[period:] - csum[:-period]
+    return np.ldexp(sums.astype(np.float64), shift)
+
+
+def windowop(func, src, period, start, end):
+    '''
+    Vectorized version of ``func`` applied to the rolling windows of ``period``
+    values if ``func`` is one of ``max``, ``min`` or ``math.fsum``
+    '''
+    if func is max:
+        return windowmax(src, period, start, end)
+    elif func is min:
+        return windowmin(src, period, start, end)
+    elif func is math.fsum:
+        return windowfsum(src, period, start, end)
+
+    return None
+
+
+def elementop(func, srcs, start, end):
+    '''
+    Vectorized element-wise ``max`` or ``min`` over several line storages
+    and/or numeric constants, keeping the semantics of the Python built-ins
+    (the first of equal values is kept and NaN depends on the order)
+    '''
+    if np is None or end <= start:
+        return None
+
+    if func is max:
+        cmpop = np.greater
+    elif func is min:
+        cmpop = np.less
+    else:
+        return None
+
+    operands = list()
+    for src in srcs:
+        x = ndview(src)
+        if x is not None:
+            if end > len(x):
+                return None
+            x = x[start:end]
+        elif isinstance(src, (int, float)):
+            x = float(src)  # constant value
+        else:
+            return None
+
+        operands.append(x)
+
+    res = np.full(end - start, operands[0], dtype=np.float64)
+    for x in operands[1:]:
+        res = np.where(cmpop(x, res), x, res)
+
+    return res
+
+
+# Operations which deliver in numpy exactly the same results as in Python.
+# pow is not included, because numpy may not use the pow function from the
+# platform library (which is what Python uses) and results may differ in the
+# last digit
+if np is not None:
+    _BINARY_UFUNCS = {
+        operator.add: np.add,
+        operator.sub: np.subtract,
+        operator.mul: np.multiply,
+        operator.truediv: np.true_divide,
+        operator.lt: np.less,
+        operator.gt: np.greater,
+        operator.le: np.less_equal,
+        operator.ge: np.greater_equal,
+        operator.eq: np.equal,
+        operator.ne: np.not_equal,
+    }
+
+    _UNARY_UFUNCS = {
+        operator.abs: np.absolute,
+        operator.neg: np.negative,
+        bool: functools.partial(np.not_equal, 0.0),
+    }
+
+# float operands beyond this value are not compared exactly by numpy if
+# they are integers
+_MAXEXACTINT = 2 ** 53
+
+
+def _operand(src, start, end):
+    '''Returns the values (or constant) of an operand or ``None``'''
+    x = ndview(src)
+    if x is not None:
+        return x[start:end] if end <= len(x) else None
+
+    if isinstance(src, float):
+        return src
+
+    if isinstance(src, integer_types) and abs(src) <= _MAXEXACTINT:
+        return float(src)
+
+    return None
+
+
+def binaryop(op, srca, srcb, start, end):
+    '''
+    Vectorized ``op(srca[i], srcb[i])`` where the operands can be line storages
+    or numeric constants. The Python semantics are kept: NaN propagates and
+    a division by zero is not vectorized, to let the loop raise the exception
+    '''
+    if np is None or end <= start:
+        return None
+
+    ufunc = _BINARY_UFUNCS.get(op, None)
+    if ufunc is None:
+        return None
+
+    a = _operand(srca, start, end)
+    b = _operand(srcb, start, end)
+    if a is None or b is None:
+        return None
+
+    if ufunc is np.true_divide and not np.all(b):
+        return None  # ZeroDivisionError is what Python delivers
+
+    return np.broadcast_to(ufunc(a, b), (end - start,))
+
+
+def unaryop(op, src, start, end):
+    '''Vectorized ``op(src[i])`` for ``abs``, ``neg`` and ``bool``'''
+    if np is None or end <= start:
+        return None
+
+    ufunc = _UNARY_UFUNCS.get(op, None)
+    if ufunc is None:
+        return None
+
+    a = ndview(src)
+    if a is None or end > len(a):
+        return None
+
+    return ufunc(a[start:end])
+
+
+def shiftop(src, ago, start, end):
+    '''Vectorized ``src[i + ago]`` for ``i`` in ``start`` to ``end - 1``'''
+    if np is None or end <= start:
+        return None
+
+    a = ndview(src)
+    if a is None or start + ago < 0 or end + ago > len(a):
+        return None  # negative indices would wrap around in Python
+
+    return a[start + ago:end + ago]
+
+
+def timeop(op, src, other, start, end, tz=None):
+    '''
+    Vectorized ``op(num2date(src[i], tz=tz).time(), other)``
+
+    The time of the day only depends on the fractional part of the timestamp
+    (of the local timestamp if ``tz`` is given). The operation is applied in
+    Python once for each different time of the day and the results are
+    scattered
+    '''
+    if np is None or end <= start:
+        return None
+
+    a = ndview(src)
+    if a is None or end > len(a):
+        return None
+
+    a = a[start:end]
+    if not np.isfinite(a).all():
+        return None  # the Python conversion raises the exception
+
+    if tz is None:
+        tods = a - np.trunc(a)
+    else:
+        tods = num2datearray(a, tz).astype(np.int64) % int(MUSECONDS_PER_DAY)
+
+    uniq, idxs, inverse = np.unique(tods, return_index=True,
+                                    return_inverse=True)
+    results = [op(num2date(a[idx], tz=tz).time(), other)
+               for idx in idxs.tolist()]
+    return np.array(results, dtype=np.float64)[inverse.reshape(-1)]
+
+
+def exprop(tree, start, end):
+    '''
+    Vectorized evaluation of an expression tree ``(op, operand, ...)`` in
+    which the operands are trees, line storages or constants. The operations
+    are those supported by ``binaryop`` and ``unaryop``
+    '''
+    if np is None or end <= start:
+        return None
+
+    operands = list()
+    for operand in tree[1:]:
+        if isinstance(operand, tuple):
+            operand = exprop(operand, start, end)
+            if operand is None:
+                return None
+        elif isinstance(operand, (array.array, np.ndarray)):
+            operand = ndview(operand)
+            if operand is None or end > len(operand):
+                return None
+
+            operand = operand[start:end]
+
+        operands.append(operand)
+
+    if len(operands) == 1:
+        vals = unaryop(tree[0], operands[0], 0, end - start)
+    else:
+        vals = binaryop(tree[0], operands[0], operands[1], 0, end - start)
+
+    if vals is not None and vals.dtype != np.float64:
+        vals = vals.astype(np.float64)  # as if stored in a line
+
+    return vals
+
+
+def setslice(dst, start, end, values):
+    '''Stores ``values`` in ``dst[start:end]`` returning ``True`` or ``False``
+    if ``dst`` has no array like storage'''
+    d = ndview(dst)
+    if d is None or start < 0 or end > len(d):
+        return False
+
+    d[start:end] = values
+    return True
@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import math
+import random
+
+from .metabase import MetaParams
+from .utils.py3 import with_metaclass
+
+
+__all__ = ['OptScheduler', 'RandomSearch', 'SuccessiveHalving']
+
+
+class OptScheduler(with_metaclass(MetaParams, object)):
+    '''Base class of the optimization schedulers (see
+    ``Cerebro.optscheduler``), which decide which combinations of strategies
+    generated by ``optstrategy`` are run and with which portion of the datas
+
+    The scheduler works in rounds. Each round is a list of combinations and
+    the fraction of the datas (a prefix of them) to use. Only the results of
+    the rounds using the entire datas (fraction ``1.0``) are delivered by
+    ``run``
+
+    Subclasses override ``nextround`` and receive the results of each round
+    in ``roundresults``
+    '''
+    def start(self, combos):
+        '''Called with the list of all combinations before the 1st round'''
+        self.combos = combos
+
+    def nextround(self):
+        '''Returns a tuple ``(combos, fraction)`` with the combinations to
+        run and the fraction of the datas to use or ``None`` if the
+        optimization is over'''
+        raise NotImplementedError
+
+    def roundresults(self, combos, results):
+        '''Receives the results of the last round (same order as
+        ``combos``)'''
+        pass
+
+
+class RandomSearch(OptScheduler):
+    '''Runs a random sample of the combinations
+
+    Params:
+
+      - ``samples`` (default: ``10``) number of combinations to run
+
+      - ``seed`` (default: ``None``) seed for the random generator to make
+        the sampling repeatable
+    '''
+    params = (
+        ('samples', 10),
+        ('seed', None),
+    )
+
+    def start(self, combos):
+        super(RandomSearch, self).start(combos)
+        self._done = False
+
+    def nextround(self):
+        if self._done:
+            return None
+
+        self._done = True
+        rnd = random.Random(self.p.seed)
+        samples = min(self.p.samples, len(self.combos))
+        idxs = sorted(rnd.sample(range(len(self.combos)), samples))
+        return [self.combos[i] for i in idxs], 1.0
+
+
+class SuccessiveHalving(OptScheduler):
+    '''Successive halving: all combinations are run on a short prefix of the
+    datas, only the best ``1 / eta`` are kept and run on a prefix ``eta``
+    times longer until the survivors are run on the entire datas
+
+    Params:
+
+      - ``objective`` (default: ``None``)
+
+        Callable which receives the analyzers of the 1st strategy of a
+        combination and returns a value (higher is better) with which the
+        combinations are ranked. The signature: ``objective(analyzers)``
+
+        It is needed to rank the combinations (``ValueError`` is raised if
+        missing)
+
+      - ``minfraction`` (default: ``0.25``) fraction of the datas used in
+        the 1st round
+
+      - ``eta`` (default: ``2``) reduction factor of the combinations (and
+        growth factor of the prefix) from round to round
+    '''
+    params = (
+        ('objective', None),
+        ('minfraction', 0.25),
+        ('eta', 2),
+    )
+
+    def __init__(self):
+        if self.p.objective is None:
+            raise ValueError('SuccessiveHalving needs an objective to rank '
+                             'the combinations')
+
+    def start(self, combos):
+        super(SuccessiveHalving, self).start(combos)
+        self._candidates = list(combos)
+        self._fraction = self.p.minfraction
+        self._done = False
+
+    def nextround(self):
+        if self._done or not self._candidates:
+            return None
+
+        fraction = min(self._fraction, 1.0)
+        self._done = fraction >= 1.0
+        return self._candidates, fraction
+
+    def score(self, result):
+        '''Returns the score of the result of a combination. Combinations in
+        which the strategies have been skipped are the worst'''
+        if not result:
+            return float('-inf')
+
+        return self.p.objective(result[0].analyzers)
+
+    def roundresults(self, combos, results):
+        scores = [self.score(result) for result in results]
+        ranked = sorted(range(len(combos)), key=lambda i: scores[i],
+                        reverse=True)
+
+        keep = max(1, int(math.ceil(len(combos) / self.p.eta)))
+        # keep the original order of the combinations
+        self._candidates = [combos[i] for i in sorted(ranked[:keep])]
+        self._fraction *= self.p.eta
@@ -21,10 +21,10 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
-import collections
 from copy import copy
 import datetime
 import itertools
+import operator
 
 from .utils.py3 import range, with_metaclass, iteritems
 
@@ -58,6 +58,10 @@ class OrderExecutionBit(object):
       - pprice: current open position price
 
     '''
+    __slots__ = ('dt', 'size', 'price',
+                 'closed', 'opened', 'closedvalue', 'openedvalue',
+                 'closedcomm', 'openedcomm', 'value', 'comm', 'pnl',
+                 'psize', 'pprice')
 
     def __init__(self,
                  dt=None, size=0, price=0.0,
@@ -114,11 +118,11 @@ class OrderData(object):
       - pprice: current open position price
 
     '''
-    # According to the docs, collections.deque is thread-safe with appends at
-    # both ends, there will be no pop (nowhere) and therefore to know which the
-    # new exbits are two indices are needed. At time of cloning (__copy__) the
-    # indices can be updated to match the previous end, and the new end
-    # (len(exbits)
+    # Appending to a list is thread-safe (as it is for a collections.deque,
+    # which needs a lot more memory), there will be no pop (nowhere) and
+    # therefore to know which the new exbits are two indices are needed. At
+    # time of cloning (__copy__) the indices can be updated to match the
+    # previous end, and the new end (len(exbits)
     # Example: start 0, 0 -> islice(exbits, 0, 0) -> []
     # One added -> copy -> updated 0, 1 -> islice(exbits, 0, 1) -> [1 elem]
     # Other added -> copy -> updated 1, 2 -> islice(exbits, 1, 2) -> [1 elem]
@@ -126,12 +130,21 @@ class OrderData(object):
     # implementations) and therefore no append will happen during a copy and
     # the len of the exbits can be queried with no concerns about another
     # thread making an append and with no need for a lock
+    # The list is only created with the first execution: clones taken before
+    # keep the empty tuple and have nothing pending anyhow
+    #
+    # Millions of instances (2 per order) may be alive in a backtest and
+    # therefore the attributes live in slots rather than in a __dict__
+    __slots__ = ('pclose', 'exbits', 'p1', 'p2',
+                 'dt', 'size', 'remsize', 'price', 'pricelimit', '_plimit',
+                 'trailamount', 'trailpercent',
+                 'value', 'comm', 'margin', 'pnl', 'psize', 'pprice')
 
     def __init__(self, dt=None, size=0, price=0.0, pricelimit=0.0, remsize=0,
                  pclose=0.0, trailamount=0.0, trailpercent=0.0):
 
         self.pclose = pclose
-        self.exbits = collections.deque()  # for historical purposes
+        self.exbits = ()  # for historical purposes - list on first add
         self.p1, self.p2 = 0, 0  # indices to pending notifications
 
         self.dt = dt
@@ -188,6 +201,9 @@ class OrderData(object):
 
     def addbit(self, exbit):
         # Stores an ExecutionBit and recalculates own values from ExBit
+        if not self.exbits:  # no execution yet, create the storage
+            self.exbits = []
+
         self.exbits.append(exbit)
 
         self.remsize -= exbit.size
@@ -213,6 +229,28 @@ class OrderData(object):
         # rebuild the indices to mark which exbits are pending in clone
         self.p1, self.p2 = self.p2, len(self.exbits)
 
+    def __copy__(self):
+        # exbits is shared (append only) like a regular shallow copy would do
+        obj = OrderData.__new__(self.__class__)
+        obj.pclose = self.pclose
+        obj.exbits = self.exbits
+        obj.p1, obj.p2 = self.p1, self.p2
+        obj.dt = self.dt
+        obj.size = self.size
+        obj.remsize = self.remsize
+        obj.price = self.price
+        obj.pricelimit = self.pricelimit
+        obj._plimit = self._plimit
+        obj.trailamount = self.trailamount
+        obj.trailpercent = self.trailpercent
+        obj.value = self.value
+        obj.comm = self.comm
+        obj.margin = self.margin
+        obj.pnl = self.pnl
+        obj.psize = self.psize
+        obj.pprice = self.pprice
+        return obj
+
     def clone(self):
         obj = copy(self)
         obj.markpending()
@@ -259,6 +297,15 @@ class OrderBase(with_metaclass(MetaParams, object)):
 
     refbasis = itertools.count(1)  # for a unique identifier per order
 
+    # The state of the order lives in slots. A __dict__ is still kept for the
+    # params set by the metaclass, for subclasses (like the ones from the live
+    # brokers) and for any attribute the end user may want to attach
+    __slots__ = ('p', 'ref', 'broker', '_info', '_infoowner',
+                 'comminfo', 'triggered',
+                 '_active', 'status', '_plimit', 'created', 'executed',
+                 'position', 'plen', 'dteos', '_limitoffset',
+                 'size', 'exectype', 'valid', '__dict__')
+
     def _getplimit(self):
         return self._plimit
 
@@ -267,6 +314,29 @@ class OrderBase(with_metaclass(MetaParams, object)):
 
     plimit = property(_getplimit, _setplimit)
 
+    def _getinfo(self):
+        # created on demand, because most orders never carry custom info. It
+        # is created in the original order (if this is a clone) to be shared
+        # by the order and all its clones
+        info = self._info
+        if info is None:
+            owner = self._infoowner
+            if owner is None:
+                owner = self
+
+            info = owner._info
+            if info is None:
+                info = owner._info = AutoOrderedDict()
+
+            self._info = info
+
+        return info
+
+    def _setinfo(self, val):
+        self._info = val
+
+    info = property(_getinfo, _setinfo)
+
     def __getattr__(self, name):
         # Return attr from params if not found in order
         return getattr(self.params, name)
@@ -300,39 +370,44 @@ class OrderBase(with_metaclass(MetaParams, object)):
         return '\n'.join(tojoin)
 
     def __init__(self):
+        p = self.p  # params are read directly, skipping __getattr__
         self.ref = next(self.refbasis)
         self.broker = None
-        self.info = AutoOrderedDict()
+        self._info = None
+        self._infoowner = None  # original order of a clone
         self.comminfo = None
         self.triggered = False
+        self.plen = None
 
-        self._active = self.parent is None
+        self._active = p.parent is None
         self.status = Order.Created
 
-        self.plimit = self.p.pricelimit  # alias via property
+        self.plimit = p.pricelimit  # alias via property
 
+        self.exectype = p.exectype
         if self.exectype is None:
             self.exectype = Order.Market
 
-        if not self.isbuy():
-            self.size = -self.size
+        self.size = p.size if self.isbuy() else -p.size
+        self.valid = p.valid
 
         # Set a reference price if price is not set using
         # the close price
-        pclose = self.data.close[0] if not self.simulated else self.price
-        if not self.price and not self.pricelimit:
+        data = p.data
+        pclose = data.close[0] if not p.simulated else p.price
+        if not p.price and not p.pricelimit:
             price = pclose
         else:
-            price = self.price
+            price = p.price
 
-        dcreated = self.data.datetime[0] if not self.p.simulated else 0.0
+        dcreated = data.datetime[0] if not p.simulated else 0.0
         self.created = OrderData(dt=dcreated,
                                  size=self.size,
                                  price=price,
-                                 pricelimit=self.pricelimit,
+                                 pricelimit=p.pricelimit,
                                  pclose=pclose,
-                                 trailamount=self.trailamount,
-                                 trailpercent=self.trailpercent)
+                                 trailamount=p.trailamount,
+                                 trailpercent=p.trailpercent)
 
         # Adjust price in case a trailing limit is wished
         if self.exectype in [Order.StopTrail, Order.StopTrailLimit]:
@@ -367,11 +442,11 @@ class OrderBase(with_metaclass(MetaParams, object)):
             else:  # assume float
                 valid = self.data.datetime[0] + self.valid
 
-        if not self.p.simulated:
+        if not p.simulated:
             # provisional end-of-session
             # get next session end
-            dtime = self.data.datetime.datetime(0)
-            session = self.data.p.sessionend
+            dtime = data.datetime.datetime(0)
+            session = data.p.sessionend
             dteos = dtime.replace(hour=session.hour, minute=session.minute,
                                   second=session.second,
                                   microsecond=session.microsecond)
@@ -380,14 +455,29 @@ class OrderBase(with_metaclass(MetaParams, object)):
                 # eos before current time ... no ... must be at least next day
                 dteos += datetime.timedelta(days=1)
 
-            self.dteos = self.data.date2num(dteos)
+            self.dteos = data.date2num(dteos)
         else:
             self.dteos = 0.0
 
+    def __copy__(self):
+        # Shallow copy of the slots and of the __dict__, which is several
+        # times faster than the generic copy protocol
+        cls = self.__class__
+        obj = cls.__new__(cls)
+        for name, val in zip(_OrderSlots, _getorderslots(self)):
+            setattr(obj, name, val)
+
+        obj.__dict__.update(self.__dict__)
+        if obj._infoowner is None:
+            obj._infoowner = self  # for the lazy creation of info
+        return obj
+
     def clone(self):
         # status, triggered and executed are the only moving parts in order
         # status and triggered are covered by copy
         # executed has to be replaced with an intelligent clone of itself
+        # The clone is therefore a cheap snapshot: the creation data, the
+        # params and the info (if already created) are shared with the order
         obj = copy(self)
         obj.executed = self.executed.clone()
         return obj  # status could change in next to completed
@@ -525,6 +615,11 @@ class OrderBase(with_metaclass(MetaParams, object)):
         pass  # generic interface
 
 
+# Slots copied by OrderBase.__copy__ (__dict__ is handled separately)
+_OrderSlots = tuple(x for x in OrderBase.__slots__ if x != '__dict__')
+_getorderslots = operator.attrgetter(*_OrderSlots)
+
+
 class Order(OrderBase):
     '''
     Class which holds creation/execution data and type of oder.
@@ -562,6 +657,7 @@ class Order(OrderBase):
       - issell(): returns bool indicating if the order sells
       - alive(): returns bool if order is in status Partial or Accepted
     '''
+    __slots__ = ()
 
     def execute(self, dt, size, price,
                 closed, closedvalue, closedcomm,
@@ -618,24 +714,26 @@ class Order(OrderBase):
 
 
 class BuyOrder(Order):
+    __slots__ = ()
     ordtype = Order.Buy
 
 
 class StopBuyOrder(BuyOrder):
-    pass
+    __slots__ = ()
 
 
 class StopLimitBuyOrder(BuyOrder):
-    pass
+    __slots__ = ()
 
 
 class SellOrder(Order):
+    __slots__ = ()
     ordtype = Order.Sell
 
 
 class StopSellOrder(SellOrder):
-    pass
+    __slots__ = ()
 
 
 class StopLimitSellOrder(SellOrder):
-    pass
+    __slots__ = ()
@@ -23,11 +23,20 @@ from __future__ import (absolute_import, division, print_function,
 
 
 from datetime import datetime, date, timedelta
+import functools
+import operator
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # preloaded data is resampled bar by bar
 
 from .dataseries import TimeFrame, _Bar
-from .utils.py3 import with_metaclass
+from .utils.py3 import with_metaclass, integer_types, zip
 from . import metabase
 from .utils.date import date2num, num2date
+from .utils.dateintern import (date2numarray, num2datearray,
+                               MUSECONDS_PER_MINUTE, MUSECONDS_PER_SECOND)
 
 
 class DTFaker(object):
@@ -481,6 +490,243 @@ class Resampler(_BaseResampler):
 
     replaying = False
 
+    # Preloaded data is resampled in a single pass (see ``batch``) if the
+    # settings allow it. Set it to False to always resample bar by bar
+    _batch = True
+
+    _batchframes = (TimeFrame.Seconds, TimeFrame.Minutes, TimeFrame.Days,
+                    TimeFrame.Weeks, TimeFrame.Months, TimeFrame.Years)
+
+    def batchok(self, data):
+        '''Returns ``True`` if the bars of ``data`` can be resampled with
+        ``batch`` once they have all been preloaded'''
+        boundoff = self.p.boundoff
+        return (self._batch and np is not None and
+                type(self).__module__ == __name__ and  # no custom logic
+                data._calendar is None and
+                self.p.timeframe in self._batchframes and
+                (not self.subdays or
+                 (isinstance(boundoff, integer_types) and boundoff >= 0)))
+
+    def batch(self, data, bars):
+        '''Resamples in a single pass the preloaded ``bars`` of ``data`` (a
+        dict of line name to numpy array) and returns a dict with the fields
+        of the resampled bars. The result is the same as delivering the bars
+        one by one to the resampler.
+
+        Returns ``None`` if the bars cannot be resampled in a single pass
+        with the same result: *NaN* prices or intraday timestamps which do
+        not move forward (late data)
+        '''
+        dts = bars['datetime']
+        opens, highs, lows = bars['open'], bars['high'], bars['low']
+        if np.isnan(opens).any() or np.isnan(highs).any() or \
+           np.isnan(lows).any():
+            return None  # the bars would not open/update the same way
+
+        n = len(dts)
+        if not n:
+            return dict((name, dts.copy()) for name in self.bar.keys())
+
+        state = self.compcount, self._nexteos
+        if self.p.timeframe >= TimeFrame.Weeks:
+            onedge, over, overdts = self._batchperiods(data, dts)
+        else:
+            ret = self._batchsessions(data, dts)
+            if ret is None:
+                return None
+
+            onedge, over, overdts = ret
+
+        ends = np.union1d(np.flatnonzero(onedge) + 1, np.flatnonzero(over))
+        isopen = not len(ends) or ends[-1] != n  # open bar delivered by last
+        if isopen:
+            ends = np.append(ends, n)
+
+        starts = np.concatenate(([0], ends[:-1]))
+
+        rdts = dts[ends - 1]  # bupdate keeps the time of the last bar
+        byover = np.zeros(len(ends), dtype=bool)
+        byover[:-1] = over[ends[:-1]]
+        rdts[byover] = overdts[ends[byover]]
+        if self.subdays and not (dts[ends[:-1]] > rdts[:-1]).all():
+            self.compcount, self._nexteos = state  # bar by bar from scratch
+            return None  # the bar after a delivered one would be late data
+
+        if isopen and self.doadjusttime:
+            self.bar.datetime = float(rdts[-1])
+            rdts[-1] = self._calcadjtime()
+
+        self.bar.bstart(maxdate=True)
+
+        return dict(
+            datetime=rdts,
+            open=opens[starts],
+            high=np.maximum.reduceat(highs, starts),
+            low=np.minimum.reduceat(lows, starts),
+            close=bars['close'][ends - 1],
+            volume=self._batchsum(bars['volume'], starts, ends),
+            openinterest=bars['openinterest'][ends - 1],
+        )
+
+    @staticmethod
+    def _batchsum(vals, starts, ends):
+        '''Sums the values of each group in order, like ``_Bar.bupdate``'''
+        if np.abs(vals).sum() < 2.0 ** 53 and (np.floor(vals) == vals).all():
+            return np.add.reduceat(vals, starts)  # exact in any order
+
+        vals = vals.tolist()
+        return np.array([functools.reduce(operator.add, vals[s:e], 0.0)
+                         for s, e in zip(starts.tolist(), ends.tolist())])
+
+    def _batchcompress(self, over):
+        '''Returns which of the bars going ``over`` complete the compression
+        (``compcount`` in ``_checkbarover``)'''
+        counts = np.cumsum(over) + self.compcount
+        self.compcount = int(counts[-1])
+        return over & (counts % self.p.compression == 0)
+
+    def _batchperiods(self, data, dts):
+        '''Weeks, months and years: the bars go over when the period of the
+        previous one is left behind'''
+        over = np.zeros(len(dts), dtype=bool)
+        if not self.componly:  # else the bar is always in the period
+            local = num2datearray(dts, tz=data._tz)
+            tframe = self.p.timeframe
+            if tframe == TimeFrame.Weeks:  # iso weeks start on mondays
+                days = local.astype('datetime64[D]').astype(np.int64)
+                period = days - (days + 3) % 7  # 1970-01-01 is a thursday
+            elif tframe == TimeFrame.Months:
+                period = local.astype('datetime64[M]').astype(np.int64)
+            else:
+                period = local.astype('datetime64[Y]').astype(np.int64)
+
+            over[1:] = period[1:] > period[:-1]
+
+        overdts = np.empty(len(dts))
+        overdts[1:] = dts[:-1]  # the last bar in the resampled bar
+        return np.zeros(len(dts), dtype=bool), self._batchcompress(over), \
+            overdts
+
+    def _batchsessions(self, data, dts):
+        '''Days and intraday timeframes: the bars are delimited by the end
+        of the sessions and, intraday, by the time boundaries'''
+        n = len(dts)
+        if (np.diff(dts) < 0).any():
+            return None
+
+        p = self.p
+        edge = np.zeros(n, dtype=bool)
+        ptover = np.zeros(n, dtype=bool)
+        if self.subdays:
+            # the edge is checked with local times, going over with utc-like
+            local = num2datearray(dts, tz=data._tz)
+            point, rest = self._batchpoints(local)
+            edge = (rest == 0) & (point % p.compression == 0)
+
+            point, _ = self._batchpoints(num2datearray(dts))
+            prev, point = point[:-1], point[1:]
+            ptover[1:] = point > prev
+            if p.bar2edge and p.compression != 1:
+                ptover[1:] &= point // p.compression > prev // p.compression
+
+        eosedge, eosover, eosdts = self._batcheos(data, dts, edge)
+
+        if self.componly:  # bars taken first, go over on the session end
+            onedge = np.zeros(n, dtype=bool)
+            onedge[eosedge] = True
+            return self._batchcompress(onedge), np.zeros(n, dtype=bool), dts
+
+        onedge = edge
+        onedge[eosedge] = True
+        over = ptover
+        over[eosover] = True
+        over[0] = False  # no bar open to go over
+        over[1:] &= ~onedge[:-1]
+        over &= ~onedge
+        if not (self.subdays and p.bar2edge):
+            over = self._batchcompress(over)
+
+        overdts = np.empty(n)
+        overdts[1:] = dts[:-1]  # the last bar in the resampled bar
+        if self.doadjusttime:
+            adjdts = np.full(n, float('NaN'))
+            adjdts[eosover] = eosdts  # the session end is the mark
+            idx = np.flatnonzero(over & np.isnan(adjdts))  # only intraday
+            if len(idx):
+                adjdts[idx] = self._batchadjtime(data, dts[idx - 1])
+
+            idx = np.flatnonzero(over)
+            adjdts, lastdts = adjdts[idx], overdts[idx]
+            overdts[idx] = np.where(adjdts > lastdts, adjdts, lastdts)
+
+        return onedge, over, overdts
+
+    def _batchpoints(self, dtimes):
+        '''Vectorized ``_gettmpoint`` for an array of datetime64'''
+        musecs = (dtimes - dtimes.astype('datetime64[D]')).astype(np.int64)
+        if self.p.timeframe == TimeFrame.Minutes:
+            unit = MUSECONDS_PER_MINUTE
+        else:
+            unit = int(MUSECONDS_PER_SECOND)
+
+        point, rest = np.divmod(musecs, unit)
+        return point + self.p.boundoff, rest
+
+    def _batchadjtime(self, data, dts):
+        '''Vectorized ``_calcadjtime`` for intraday timeframes within the
+        session'''
+        p = self.p
+        local = num2datearray(dts, tz=data._tz)
+        days = local.astype('datetime64[D]')
+        point, _ = self._batchpoints(local)
+        point = (point // p.compression + p.rightedge) * p.compression
+        if p.timeframe == TimeFrame.Minutes:
+            point = point * MUSECONDS_PER_MINUTE
+        else:
+            point = point * int(MUSECONDS_PER_SECOND)
+
+        return date2numarray(days + point.astype('timedelta64[us]'),
+                             tz=data._tz)
+
+    def _batcheos(self, data, dts, edge):
+        '''Replays the end of session checks (``_eoscheck``) over the sorted
+        ``dts``, with one step per session. Returns the indices of the bars
+        on the session end, of the bars going over it and the corresponding
+        session ends. The state of the checks is left as it would be
+        after the last bar'''
+        n = len(dts)
+        onedge, over, overdts = [], [], []
+        k = 0
+        self._nexteos, self._nextdteos = data._calcnexteos(float(dts[0]))
+        while True:
+            nextdteos = self._nextdteos
+            i = k + int(np.searchsorted(dts[k:], nextdteos))
+            if i >= n:
+                break
+
+            if dts[i] == nextdteos:
+                onedge.append(i)
+            elif (self.componly or not i or edge[i - 1] or edge[i] or
+                  dts[i - 1] > nextdteos or
+                  (onedge and onedge[-1] == i - 1)):
+                break  # eos overtaken with no bar open to check it for good
+            else:
+                over.append(i)
+                overdts.append(nextdteos)
+
+            self._lastdteos = nextdteos
+            self._lasteos = self._nexteos
+            k = i + 1
+            if k >= n:
+                self._nexteos, self._nextdteos = None, float('-inf')
+                break
+
+            self._nexteos, self._nextdteos = data._calcnexteos(float(dts[k]))
+
+        return (np.array(onedge, dtype=np.int64),
+                np.array(over, dtype=np.int64), np.array(overdts))
+
     def last(self, data):
         '''Called when the data is no longer producing bars
 
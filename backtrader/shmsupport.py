@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+'''
+
+.. module:: shmsupport
+
+Places the buffers of preloaded lines in shared memory segments, to let the
+processes of an optimization work with the same copy of the data.
+
+The buffers are ``numpy`` arrays which are pickled as a reference to the
+segment. Unpickling them in another process attaches to the segment and
+delivers a read-only view of it.
+
+.. moduleauthor:: Daniel Rodriguez
+
+'''
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import os
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # Python < 3.8
+    shared_memory = None
+
+from .npsupport import np
+
+
+# segments (and the array on them) attached/created by a process, keyed by
+# name and process id (forked processes inherit it). The creator removes them
+# with unlink. The processes which attach to them (the workers of an
+# optimization) keep them until they end, because the views delivered by
+# attach may be alive in any of the objects of the process
+_segments = dict()
+
+# unlinked segments which could not be closed yet, because a view of them was
+# still alive. Closing them is retried with each unlink
+_closing = list()
+
+
+def available():
+    '''Returns ``True`` if shared memory buffers can be used'''
+    return shared_memory is not None and np is not None
+
+
+if available():
+    class SharedArray(np.ndarray):
+        '''float64 numpy array held in a shared memory segment, which is
+        pickled as a reference to the segment'''
+
+        _shmname = None  # only set for the array covering the segment
+
+        def __reduce__(self):
+            if self._shmname is None:  # slice, copy ...
+                return super(SharedArray, self).__reduce__()
+
+            return attach, (self._shmname, len(self))
+
+
+def toshared(arr):
+    '''
+    Copies ``arr`` into a new shared memory segment and returns the array held
+    in the segment, which can be used as the buffer of a line.
+
+    The segment must be released with ``unlink``
+    '''
+    nbytes = max(len(arr), 1) * np.dtype(np.float64).itemsize
+    shm = shared_memory.SharedMemory(create=True, size=nbytes)
+
+    shmarr = np.ndarray(len(arr), dtype=np.float64, buffer=shm.buf)
+    shmarr[:] = arr
+    shmarr = shmarr.view(SharedArray)
+    shmarr._shmname = shm.name
+
+    _segments[shm.name, os.getpid()] = (shm, shmarr)
+    return shmarr
+
+
+def attach(name, length):
+    '''Returns a read-only view of the segment ``name`` holding ``length``
+    float64 values'''
+    key = (name, os.getpid())
+    try:
+        return _segments[key][1]  # own or already attached
+    except KeyError:
+        pass
+
+    try:
+        shm = shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13, registered in the tracker of creator
+        shm = shared_memory.SharedMemory(name=name)
+
+    shmarr = np.ndarray(length, dtype=np.float64, buffer=shm.buf)
+    shmarr = shmarr.view(SharedArray)
+    shmarr._shmname = name
+    shmarr.flags.writeable = False
+
+    _segments[key] = (shm, shmarr)
+    return shmarr
+
+
+def unlink(name):
+    '''Removes the segment ``name`` created by this process from the system
+    and closes it. The buffers held in it must have been dropped before: the
+    memory is no longer valid'''
+    shm, shmarr = _segments.pop((name, os.getpid()))
+    shm.unlink()
+    del shmarr  # the last view of the segment, unless held elsewhere
+
+    _closing.append(shm)
+    for shm in list(_closing):
+        try:
+            shm.close()
+        except BufferError:  # a view is still alive
+            continue
+
+        _closing.remove(shm)
@@ -26,6 +26,7 @@ import copy
 import datetime
 import inspect
 import itertools
+from multiprocessing.pool import ThreadPool
 import operator
 
 from .utils.py3 import (filter, keys, integer_types, iteritems, itervalues,
@@ -35,7 +36,7 @@ import backtrader as bt
 from .lineiterator import LineIterator, StrategyBase
 from .lineroot import LineSingle
 from .metabase import ItemCollection, findowner
-from .trade import Trade
+from .trade import Trade, TradeLog
 from .utils import OrderedDict, AutoOrderedDict, AutoDictList
 
 
@@ -91,6 +92,7 @@ class MetaStrategy(StrategyBase.__class__):
         _obj._slave_analyzers = list()
 
         _obj._tradehistoryon = False
+        _obj._tradelog = None  # created when the history is activated
 
         return _obj, args, kwargs
 
@@ -216,7 +218,7 @@ class Strategy(with_metaclass(MetaStrategy, StrategyBase)):
         return analyzer
 
     def _getanalyzer_slave(self, idx):
-        return self._slave_analyzers.append[idx]
+        return self._slave_analyzers[idx]
 
     def _addanalyzer(self, ancls, *anargs, **ankwargs):
         anname = ankwargs.pop('_name', '') or ancls.__name__.lower()
@@ -258,6 +260,24 @@ class Strategy(with_metaclass(MetaStrategy, StrategyBase)):
     def next_open(self):
         pass
 
+    def _onceindicators(self):
+        workers = self.cerebro.p.indworkers
+        groups = self._oncegroups() if workers > 1 else []
+        if len(groups) < 2:
+            super(Strategy, self)._onceindicators()
+            return
+
+        def oncegroup(indicators):
+            for indicator in indicators:
+                indicator._once()
+
+        pool = ThreadPool(min(workers, len(groups)))
+        try:
+            pool.map(oncegroup, groups)
+        finally:
+            pool.close()
+            pool.join()
+
     def _oncepost_open(self):
         minperstatus = self._minperstatus
         if minperstatus < 0:
@@ -374,6 +394,8 @@ class Strategy(with_metaclass(MetaStrategy, StrategyBase)):
         for analyzer in itertools.chain(self.analyzers, self._slave_analyzers):
             analyzer._start()
 
+        self._setnotifiers()
+
         for obs in self.observers:
             if not isinstance(obs, list):
                 obs = [obs]  # support of multi-data observers
@@ -472,11 +494,26 @@ class Strategy(with_metaclass(MetaStrategy, StrategyBase)):
 
     def set_tradehistory(self, onoff=True):
         self._tradehistoryon = onoff
+        if onoff and self._tradelog is None:
+            self._tradelog = TradeLog()
+
+    def gettradelog(self):
+        '''Returns the ``TradeLog`` holding (in columnar form) the update
+        events of the trades with history activated or ``None`` if the
+        history has never been activated'''
+        return self._tradelog
 
     def clear(self):
         self._orders.extend(self._orderspending)
-        self._orderspending = list()
-        self._tradespending = list()
+        del self._orderspending[:]  # reuse the lists
+        del self._tradespending[:]
+
+    def _notifytrade(self, trade, qtrades=None):
+        # A single snapshot of the trade is shared by all receivers
+        trade = copy.copy(trade)
+        self._tradespending.append(trade)
+        if qtrades is not None:
+            qtrades.append(trade)
 
     def _addnotification(self, order, quicknotify=False):
         if not order.p.simulated:
@@ -485,6 +522,8 @@ class Strategy(with_metaclass(MetaStrategy, StrategyBase)):
         if quicknotify:
             qorders = [order]
             qtrades = []
+        else:
+            qtrades = None
 
         if not order.executed.size:
             if quicknotify:
@@ -498,7 +537,8 @@ class Strategy(with_metaclass(MetaStrategy, StrategyBase)):
         datatrades = self._trades[tradedata][order.tradeid]
         if not datatrades:
             trade = Trade(data=tradedata, tradeid=order.tradeid,
-                          historyon=self._tradehistoryon)
+                          historyon=self._tradehistoryon,
+                          tradelog=self._tradelog)
             datatrades.append(trade)
         else:
             trade = datatrades[-1]
@@ -517,15 +557,14 @@ class Strategy(with_metaclass(MetaStrategy, StrategyBase)):
                              comminfo=order.comminfo)
 
                 if trade.isclosed:
-                    self._tradespending.append(copy.copy(trade))
-                    if quicknotify:
-                        qtrades.append(copy.copy(trade))
+                    self._notifytrade(trade, qtrades)
 
             # Update it if needed
             if exbit.opened:
                 if trade.isclosed:
                     trade = Trade(data=tradedata, tradeid=order.tradeid,
-                                  historyon=self._tradehistoryon)
+                                  historyon=self._tradehistoryon,
+                                  tradelog=self._tradelog)
                     datatrades.append(trade)
 
                 trade.update(order,
@@ -540,18 +579,45 @@ class Strategy(with_metaclass(MetaStrategy, StrategyBase)):
                 # orders have put the position down to 0 and the next order
                 # "opens" a position but "closes" the trade
                 if trade.isclosed:
-                    self._tradespending.append(copy.copy(trade))
-                    if quicknotify:
-                        qtrades.append(copy.copy(trade))
+                    self._notifytrade(trade, qtrades)
 
             if trade.justopened:
-                self._tradespending.append(copy.copy(trade))
-                if quicknotify:
-                    qtrades.append(copy.copy(trade))
+                self._notifytrade(trade, qtrades)
 
         if quicknotify:
             self._notify(qorders=qorders, qtrades=qtrades)
 
+    def _notifiers(self, kind):
+        # notify_{kind} is only worth calling if it has been overridden
+        name = 'notify_' + kind
+        if getattr(self.__class__, name) != getattr(Strategy, name):
+            return [getattr(self, name)]
+
+        return []
+
+    def _setnotifiers(self):
+        # Each kind of notification is only delivered to the strategy and the
+        # analyzers consuming it, in the order of the regular notification
+        analyzers = list(itertools.chain(self.analyzers,
+                                         self._slave_analyzers))
+
+        self._ordernotifiers = self._notifiers('order')
+        self._anordernotifiers = [notifier for analyzer in analyzers
+                                  for notifier in analyzer._notifiers('order')]
+
+        self._tradenotifiers = self._notifiers('trade')
+        self._tradenotifiers.extend(
+            notifier for analyzer in analyzers
+            for notifier in analyzer._notifiers('trade'))
+
+        # cash/value and fund go in pairs for each notified object
+        cashnotifiers = [(self._notifiers('cashvalue'),
+                          self._notifiers('fund'))]
+        cashnotifiers.extend((analyzer._notifiers('cashvalue'),
+                              analyzer._notifiers('fund'))
+                             for analyzer in analyzers)
+        self._cashnotifiers = [x for x in cashnotifiers if x[0] or x[1]]
+
     def _notify(self, qorders=[], qtrades=[]):
         if self.cerebro.p.quicknotify:
             # need to know if quicknotify is on, to not reprocess pendingorders
@@ -563,32 +629,33 @@ class Strategy(with_metaclass(MetaStrategy, StrategyBase)):
             procorders = self._orderspending
             proctrades = self._tradespending
 
-        for order in procorders:
-            if order.exectype != order.Historical or order.histnotify:
-                self.notify_order(order)
-            for analyzer in itertools.chain(self.analyzers,
-                                            self._slave_analyzers):
-                analyzer._notify_order(order)
+        if procorders and (self._ordernotifiers or self._anordernotifiers):
+            for order in procorders:
+                if order.exectype != order.Historical or order.histnotify:
+                    for notifier in self._ordernotifiers:
+                        notifier(order)
+                for notifier in self._anordernotifiers:
+                    notifier(order)
 
-        for trade in proctrades:
-            self.notify_trade(trade)
-            for analyzer in itertools.chain(self.analyzers,
-                                            self._slave_analyzers):
-                analyzer._notify_trade(trade)
+        if proctrades and self._tradenotifiers:
+            for trade in proctrades:
+                for notifier in self._tradenotifiers:
+                    notifier(trade)
 
         if qorders:
             return  # cash is notified on a regular basis
 
+        # the broker is always queried, it may have to update its own state
         cash = self.broker.getcash()
         value = self.broker.getvalue()
         fundvalue = self.broker.fundvalue
         fundshares = self.broker.fundshares
 
-        self.notify_cashvalue(cash, value)
-        self.notify_fund(cash, value, fundvalue, fundshares)
-        for analyzer in itertools.chain(self.analyzers, self._slave_analyzers):
-            analyzer._notify_cashvalue(cash, value)
-            analyzer._notify_fund(cash, value, fundvalue, fundshares)
+        for cvnotifiers, fundnotifiers in self._cashnotifiers:
+            for notifier in cvnotifiers:
+                notifier(cash, value)
+            for notifier in fundnotifiers:
+                notifier(cash, value, fundvalue, fundshares)
 
     def add_timer(self, when,
                   offset=datetime.timedelta(), repeat=datetime.timedelta(),
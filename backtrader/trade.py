@@ -21,6 +21,7 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+from array import array
 import itertools
 
 from .utils import AutoOrderedDict
@@ -84,6 +85,136 @@ class TradeHistory(AutoOrderedDict):
         return num2date(self.status.dt, tz or self.status.tz, naive)
 
 
+class TradeLog(object):
+    '''Columnar log of the update events of trades
+
+    Each update event of a trade with history activated takes a row in the
+    log. The row is spread over the columns, which are ``array.array``
+    objects (and therefore also offer the buffer protocol):
+
+      - ``ref`` (``int``): ``ref`` of the trade which was updated
+
+      - Resulting status of the trade (see ``TradeHistory.status``)
+
+        - ``status`` (``int``)
+        - ``dt`` (``float``)
+        - ``barlen`` (``int``)
+        - ``size`` (``int`` or ``float``)
+        - ``price`` (``float``)
+        - ``value`` (``float``)
+        - ``pnl`` (``float``)
+        - ``pnlcomm`` (``float``)
+
+      - Parameters of the update (see ``TradeHistory.event``)
+
+        - ``evsize`` (``int`` or ``float``)
+        - ``evprice`` (``float``)
+        - ``evcommission`` (``float``)
+
+    The orders which initiated the updates are kept in the list ``orders``
+
+    The ``size`` columns hold integers until a non-integer size (or one out
+    of the range of a C ``long``) is seen. The column is then converted to
+    hold floats, which also changes the type of the values of the earlier
+    rows, as delivered by ``TradeHistory`` entries, from ``int`` to ``float``
+    '''
+    def __init__(self):
+        self.ref = array(str('l'))
+        self.status = array(str('b'))
+        self.dt = array(str('d'))
+        self.barlen = array(str('l'))
+        self.size = array(str('l'))
+        self.price = array(str('d'))
+        self.value = array(str('d'))
+        self.pnl = array(str('d'))
+        self.pnlcomm = array(str('d'))
+        self.evsize = array(str('l'))
+        self.evprice = array(str('d'))
+        self.evcommission = array(str('d'))
+        self.orders = list()
+
+    def __len__(self):
+        return len(self.ref)
+
+    def _addsize(self, name, size):
+        col = getattr(self, name)
+        try:
+            col.append(size)
+        except (TypeError, OverflowError):  # convert the column to floats
+            col = array(str('d'), col)
+            col.append(size)
+            setattr(self, name, col)
+
+    def add(self, trade, dt, order, size, price, commission):
+        '''Adds an update event of ``trade`` (already updated) and returns
+        the index of the row'''
+        self.ref.append(trade.ref)
+        self.status.append(trade.status)
+        self.dt.append(dt)
+        self.barlen.append(trade.barlen)
+        self._addsize('size', trade.size)
+        self.price.append(trade.price)
+        self.value.append(trade.value)
+        self.pnl.append(trade.pnl)
+        self.pnlcomm.append(trade.pnlcomm)
+        self._addsize('evsize', size)
+        self.evprice.append(price)
+        self.evcommission.append(commission)
+        self.orders.append(order)
+        return len(self.orders) - 1
+
+    def gethistory(self, idx, tz=None):
+        '''Returns a ``TradeHistory`` for the event in row ``idx``'''
+        histentry = TradeHistory(
+            self.status[idx], self.dt[idx], self.barlen[idx],
+            self.size[idx], self.price[idx], self.value[idx],
+            self.pnl[idx], self.pnlcomm[idx], tz)
+        histentry.doupdate(self.orders[idx], self.evsize[idx],
+                           self.evprice[idx], self.evcommission[idx])
+        return histentry
+
+
+class TradeHistoryView(object):
+    '''Read-only list of the ``TradeHistory`` entries of a trade
+
+    The events are stored in a ``TradeLog`` and the entries are only
+    materialized when accessed
+    '''
+    __slots__ = ('tradelog', 'rows', 'tz')
+
+    def __init__(self, tradelog=None):
+        self.tradelog = tradelog
+        self.rows = list()  # indices of the events in the log
+        self.tz = None
+
+    def add(self, trade, dt, order, size, price, commission):
+        if self.tradelog is None:  # standalone trade, private log
+            self.tradelog = TradeLog()
+
+        self.tz = trade.data._tz
+        self.rows.append(
+            self.tradelog.add(trade, dt, order, size, price, commission))
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self.tradelog.gethistory(idx, self.tz)
+                    for idx in self.rows[key]]
+
+        return self.tradelog.gethistory(self.rows[key], self.tz)
+
+    def __iter__(self):
+        for idx in self.rows:
+            yield self.tradelog.gethistory(idx, self.tz)
+
+    def __str__(self):
+        return str(list(self))
+
+    __repr__ = __str__
+
+
 class Trade(object):
     '''Keeps track of the life of an trade: size, price,
     commission (and value?)
@@ -136,6 +267,11 @@ class Trade(object):
         The first entry in the history is the Opening Event
         The last entry in the history is the Closing Event
 
+        The list is a read-only ``TradeHistoryView``. The events are stored
+        in the ``TradeLog`` passed as ``tradelog`` (a private one is created
+        if ``None``) and each ``TradeHistory`` entry is only created when
+        accessed
+
     '''
     refbasis = itertools.count(1)
 
@@ -156,7 +292,7 @@ class Trade(object):
         )
 
     def __init__(self, data=None, tradeid=0, historyon=False,
-                 size=0, price=0.0, value=0.0, commission=0.0):
+                 size=0, price=0.0, value=0.0, commission=0.0, tradelog=None):
 
         self.ref = next(self.refbasis)
         self.data = data
@@ -180,7 +316,7 @@ class Trade(object):
         self.barlen = 0
 
         self.historyon = historyon
-        self.history = list()
+        self.history = TradeHistoryView(tradelog)
 
         self.status = self.Created
 
@@ -296,9 +432,4 @@ class Trade(object):
         # Update the history if needed
         if self.historyon:
             dt0 = self.data.datetime[0] if not order.p.simulated else 0.0
-            histentry = TradeHistory(
-                self.status, dt0, self.barlen,
-                self.size, self.price, self.value,
-                self.pnl, self.pnlcomm, self.data._tz)
-            histentry.doupdate(order, size, price, commission)
-            self.history.append(histentry)
+            self.history.add(self, dt0, order, size, price, commission)
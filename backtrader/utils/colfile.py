@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+'''
+
+.. module:: colfile
+
+Binary columnar files holding float64 columns of the same length.
+
+Layout (native byte order, recorded in the header)::
+
+  header (64 bytes): magic, byteorder, key (20 bytes), ncols, nrows
+  ncols x nrows float64 values, one column after the other
+
+The ``key`` is free for the writer to use (the digest of whatever the
+content was generated from) and lets the reader discard stale files.
+
+.. moduleauthor:: Daniel Rodriguez
+
+'''
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import array
+import io
+import mmap
+import os
+import struct
+import sys
+
+
+MAGIC = b'BTCOLS01'
+HEADER = struct.Struct(str('=8sc20sQQ'))
+HEADERSIZE = 64  # keeps the columns aligned
+ITEMSIZE = array.array(str('d')).itemsize
+NOKEY = b'\x00' * 20
+
+_BYTEORDER = sys.byteorder[0].encode('ascii')  # b'l' or b'b'
+
+
+def write(path, columns, key=NOKEY):
+    '''
+    Writes ``columns`` (iterables of floats of the same length, usually
+    ``array.array('d')``) to ``path``.
+
+    The file is first written under a temporary name and then moved into
+    place, to make sure readers never see a partially written file
+    '''
+    cols = [c if isinstance(c, array.array) and c.typecode == 'd'
+            else array.array(str('d'), c) for c in columns]
+
+    nrows = len(cols[0]) if cols else 0
+    if any(len(c) != nrows for c in cols):
+        raise ValueError('columns must have the same length')
+
+    header = HEADER.pack(MAGIC, _BYTEORDER, key, len(cols), nrows)
+    header += b'\x00' * (HEADERSIZE - len(header))
+
+    tmppath = '%s.%d.tmp' % (path, os.getpid())
+    try:
+        with io.open(tmppath, 'wb') as f:
+            f.write(header)
+            for col in cols:
+                col.tofile(f)
+
+        if hasattr(os, 'replace'):
+            os.replace(tmppath, path)
+        else:  # Python 2
+            if os.path.exists(path):
+                os.remove(path)
+            os.rename(tmppath, path)
+    finally:
+        if os.path.exists(tmppath):
+            os.remove(tmppath)
+
+
+class ColumnFile(object):
+    '''
+    Memory mapped read-only view of a columnar file. ``columns`` holds a
+    sequence of floats for each column (``memoryview`` over the mapping or an
+    ``array.array`` copy in Python 2)
+
+    Raises ``ValueError`` if the file is not a valid columnar file or has
+    been written with a different byte order
+    '''
+    def __init__(self, path):
+        self.path = path
+        self._mm = None
+        self.columns = []
+
+        with io.open(path, 'rb') as f:
+            header = f.read(HEADER.size)
+            if len(header) != HEADER.size:
+                raise ValueError('%s: not a columnar file' % path)
+
+            magic, byteorder, self.key, self.ncols, self.nrows = \
+                HEADER.unpack(header)
+
+            if magic != MAGIC:
+                raise ValueError('%s: not a columnar file' % path)
+            if byteorder != _BYTEORDER:
+                raise ValueError('%s: byte order mismatch' % path)
+
+            size = HEADERSIZE + self.ncols * self.nrows * ITEMSIZE
+            if os.fstat(f.fileno()).st_size != size:
+                raise ValueError('%s: truncated columnar file' % path)
+
+            if not self.nrows:
+                self.columns = [array.array(str('d'))] * self.ncols
+                return
+
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        colsize = self.nrows * ITEMSIZE
+        for i in range(self.ncols):
+            offset = HEADERSIZE + i * colsize
+            try:
+                col = memoryview(self._mm)[offset:offset + colsize].cast('d')
+            except (AttributeError, TypeError):  # Python 2, no cast
+                col = array.array(str('d'))
+                col.fromstring(self._mm[offset:offset + colsize])
+
+            self.columns.append(col)
+
+    def __len__(self):
+        return self.nrows
+
+    def close(self):
+        '''Releases the columns and the mapping'''
+        for col in self.columns:
+            if isinstance(col, memoryview):
+                col.release()
+
+        self.columns = []
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
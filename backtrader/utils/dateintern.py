@@ -27,6 +27,11 @@ import time as _time
 
 from .py3 import string_types
 
+try:
+    import numpy as np
+except ImportError:
+    np = None  # array conversions not available
+
 
 ZERO = datetime.timedelta(0)
 
@@ -227,6 +232,234 @@ def date2num(dt, tz=None):
     return base
 
 
+# ordinal of the numpy datetime64 epoch
+EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+MUSECONDS_PER_HOUR = 3600 * 1000000
+MUSECONDS_PER_MINUTE = 60 * 1000000
+
+
+def _fsumcols(cols):
+    '''
+    Vectorized ``math.fsum``: returns the array in which the element ``i`` is
+    ``math.fsum(col[i] for col in cols)`` for arrays of finite values.
+
+    It is the algorithm of ``math.fsum`` run on all elements at once. Zeros
+    stand in for the partials which are discarded in the scalar version
+    '''
+    partials = list()
+    for x in cols:
+        newpartials = list()
+        for y in partials:
+            hi = x + y  # exact error of the sum with TwoSum
+            yy = hi - x
+            newpartials.append((x - (hi - yy)) + (y - yy))
+            x = hi
+
+        newpartials.append(x)
+        partials = newpartials
+
+    # sum the partials from the top, stopping if inexact. Zero partials do
+    # not alter the sum and are skipped when looking at the partial below
+    hi = partials[-1]
+    lo = np.zeros_like(hi)
+    below = np.zeros_like(hi)  # 1st non-zero partial below the stop
+    active = np.ones(len(hi), dtype=bool)
+    for y in reversed(partials[:-1]):
+        below = np.where(active | (below != 0.0), below, y)
+        x = hi
+        xy = x + y
+        xylo = y - (xy - x)
+        hi = np.where(active, xy, hi)
+        lo = np.where(active, xylo, lo)
+        active &= xylo == 0.0
+
+    # round half-even using the sign of the partials below
+    fix = ((lo < 0.0) & (below < 0.0)) | ((lo > 0.0) & (below > 0.0))
+    y = lo * 2.0
+    x = hi + y
+    fix &= y == (x - hi)
+    return np.where(fix, x, hi)
+
+
+# bound of the error of adding the (at most 4) fractional terms of date2num
+_FRACERROR = 2.0 ** -48
+
+
+def _musecs2num(musecs):
+    '''date2num for int64 microseconds since the epoch (UTC)'''
+    days, musecs = np.divmod(musecs, int(MUSECONDS_PER_DAY))
+
+    hours, musecs = np.divmod(musecs, MUSECONDS_PER_HOUR)
+    minutes, musecs = np.divmod(musecs, MUSECONDS_PER_MINUTE)
+    seconds, musecs = np.divmod(musecs, int(MUSECONDS_PER_SECOND))
+
+    cols = (
+        (days + EPOCH_ORDINAL).astype(np.float64),
+        hours / HOURS_PER_DAY,
+        minutes / MINUTES_PER_DAY,
+        seconds / SECONDS_PER_DAY,
+        musecs / MUSECONDS_PER_DAY,
+    )
+    base = cols[0]
+    frac = ((cols[1] + cols[2]) + cols[3]) + cols[4]
+    nums = base + frac
+
+    # exact rounding error of the last sum (TwoSum) to find doubtful values
+    bb = nums - base
+    err = (base - (nums - bb)) + (frac - bb)
+    doubt = np.abs(err) >= np.spacing(base) / 2.0 - _FRACERROR
+    if doubt.any():
+        nums[doubt] = _fsumcols([col[doubt] for col in cols])
+
+    return nums
+
+
+# transition tables of the timezones, see _tztable
+_tztables = dict()
+
+
+def _tdmusecs(td):
+    return (td.days * 86400 + td.seconds) * 1000000 + td.microseconds
+
+
+def _tztable(tz):
+    '''
+    Returns a tuple ``(transitions, offsets)`` with the UTC times (int64
+    microseconds since the epoch) at which the offset of ``tz`` changes and
+    the offsets (microseconds) in force from each of them or ``None`` if the
+    table cannot be built.
+
+    The DST transitions of ``pytz`` timezones are precomputed by ``pytz``
+    itself. Other timezones are only supported if they have a fixed offset
+    '''
+    try:
+        return _tztables[tz]
+    except KeyError:
+        pass
+    except TypeError:
+        return None  # not hashable, not cacheable either
+
+    transitions = getattr(tz, '_utc_transition_times', None)
+    tinfos = getattr(tz, '_transition_info', None)
+    if transitions and tinfos:  # pytz with DST
+        transitions = np.array(transitions, dtype='datetime64[us]')
+        transitions = transitions.astype(np.int64)
+        offsets = [tinfo[0] for tinfo in tinfos]
+    else:
+        try:
+            offset = tz.utcoffset(None)
+        except (AttributeError, TypeError, ValueError):
+            offset = None  # the offset depends on the time
+
+        if offset is None:
+            _tztables[tz] = None
+            return None
+
+        transitions = np.array([np.iinfo(np.int64).min], dtype=np.int64)
+        offsets = [offset]
+
+    offsets = np.array([_tdmusecs(x) for x in offsets], dtype=np.int64)
+    _tztables[tz] = table = (transitions, offsets)
+    return table
+
+
+def _tzindex(transitions, musecs):
+    '''Index of the offset in force at the UTC times ``musecs``'''
+    idx = np.searchsorted(transitions, musecs, side='right') - 1
+    return np.maximum(idx, 0, out=idx)
+
+
+def date2numarray(values, tz=None):
+    '''
+    Vectorized ``date2num`` for an array of naive ``numpy.datetime64`` values,
+    which are UTC times or local times of ``tz`` if given (localized as
+    ``tz.localize`` does). The results are bit-identical to the ones of
+    ``date2num`` for the corresponding ``datetime`` objects (microsecond
+    resolution)
+
+    The fractional part of the day is added with plain floating point, which
+    is enough to round the final result correctly (as ``math.fsum`` does)
+    unless it is too close to the middle of two floats. Those values are
+    summed with the vectorized ``fsum``.
+
+    Local times are converted with the transition table of ``tz``. Times for
+    which more than one offset is possible (around a transition) and
+    timezones without table are localized one by one
+    '''
+    values = np.asarray(values).astype('datetime64[us]')
+    musecs = values.astype(np.int64)
+    if tz is None:
+        return _musecs2num(musecs)
+
+    table = _tztable(tz)
+    if table is None:
+        return np.array([date2num(tz.localize(x))
+                         for x in values.astype(object)], dtype=np.float64)
+
+    # the time is unambiguous if no transition can happen between the
+    # earliest and latest possible UTC times
+    transitions, offsets = table
+    idx = _tzindex(transitions, musecs - offsets.max())
+    doubt = idx != _tzindex(transitions, musecs - offsets.min())
+
+    nums = _musecs2num(musecs - offsets[idx])
+    if doubt.any():
+        nums[doubt] = [date2num(tz.localize(x))
+                       for x in values[doubt].astype(object)]
+
+    return nums
+
+
+def num2datearray(nums, tz=None):
+    '''
+    Vectorized ``num2date`` which returns an array of naive
+    ``numpy.datetime64`` values (microsecond resolution), in UTC or local to
+    ``tz`` if given. The results are the same as the ones of ``num2date``
+
+    Local times are calculated with the transition table of ``tz`` and one by
+    one for timezones without table
+    '''
+    nums = np.asarray(nums, dtype=np.float64)
+    if tz is not None and _tztable(tz) is None:
+        return np.array([num2date(x, tz) for x in nums.tolist()],
+                        dtype='datetime64[us]')
+
+    ix = np.trunc(nums)
+    remainder = nums - ix
+    hours, remainder = np.divmod(HOURS_PER_DAY * remainder, 1.0)
+    minutes, remainder = np.divmod(MINUTES_PER_HOUR * remainder, 1.0)
+    seconds, remainder = np.divmod(SECONDS_PER_MINUTE * remainder, 1.0)
+    musec = np.trunc(MUSECONDS_PER_SECOND * remainder).astype(np.int64)
+    musec[musec < 10] = 0  # compensate for rounding errors
+
+    musecs = (ix.astype(np.int64) - EPOCH_ORDINAL) * int(MUSECONDS_PER_DAY)
+    musecs += hours.astype(np.int64) * MUSECONDS_PER_HOUR
+    musecs += minutes.astype(np.int64) * MUSECONDS_PER_MINUTE
+    musecs += seconds.astype(np.int64) * int(MUSECONDS_PER_SECOND)
+    musecs += musec
+
+    if tz is not None:
+        transitions, offsets = _tztable(tz)
+        musecs += offsets[_tzindex(transitions, musecs)]
+
+    # compensate for rounding errors
+    roundup = musec > 999990
+    musecs[roundup] += 1000000 - musec[roundup]
+
+    return musecs.astype('datetime64[us]')
+
+
+def tzmaxoffset(tz):
+    '''Returns the largest UTC offset of ``tz`` in days (the unit of
+    ``date2num``) or ``None`` if the timezone has no transition table'''
+    table = _tztable(tz)
+    if table is None:
+        return None
+
+    return int(table[1].max()) / MUSECONDS_PER_DAY
+
+
 def time2num(tm):
     """
     Converts the hour/minute/second/microsecond part of tm (datetime.datetime
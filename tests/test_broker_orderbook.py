@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import random
+
+import testcommon
+
+import backtrader as bt
+
+
+class RestingOrdersStrategy(bt.Strategy):
+    '''Keeps many resting orders of all kinds open and checks that the orders
+    which execute are exactly those reached by the prices of the bar'''
+    def start(self):
+        self.rnd = random.Random(7)
+        self.executed = 0
+
+    def notify_order(self, order):
+        if order.status == order.Completed:
+            self.executed += 1
+
+    def next(self):
+        self.checkresting()
+
+        rnd = self.rnd
+        for data in self.datas:
+            close = data.close[0]
+            for i in range(4):
+                exectype = rnd.choice([bt.Order.Limit, bt.Order.Stop,
+                                       bt.Order.StopLimit, bt.Order.Market,
+                                       bt.Order.StopTrail])
+                kwargs = dict(data=data, exectype=exectype, size=1,
+                              price=close * (1 + rnd.uniform(-0.05, 0.05)))
+                if exectype == bt.Order.StopLimit:
+                    kwargs['plimit'] = kwargs['price'] * 1.01
+                elif exectype == bt.Order.StopTrail:
+                    kwargs['trailpercent'] = 0.02
+                    kwargs.pop('price')
+
+                if rnd.random() < 0.2:
+                    kwargs['valid'] = rnd.randint(0, 5)
+
+                order = rnd.choice([self.buy, self.sell])(**kwargs)
+                if rnd.random() < 0.1:
+                    self.sell(data=data, exectype=bt.Order.Limit, size=1,
+                              price=close * 1.02, oco=order)
+
+            if rnd.random() < 0.2:
+                self.buy_bracket(data=data, size=2, price=close * 0.99,
+                                 limitprice=close * 1.02,
+                                 stopprice=close * 0.97)
+
+    def checkresting(self):
+        # resting limit/stop orders not reached by the prices of the last bar
+        for order in self.broker.get_orders_open():
+            if order.valid or not order.active() or \
+               order.exectype not in [bt.Order.Limit, bt.Order.Stop]:
+                continue
+
+            if order.created.dt >= order.data.datetime[0]:
+                continue  # not yet seen a bar
+
+            data, price = order.data, order.created.price
+            if (order.exectype == bt.Order.Limit) == order.isbuy():
+                assert price < data.low[0]
+            else:
+                assert price > data.high[0]
+
+    def stop(self):
+        self.value = '%.2f' % self.broker.getvalue()
+        self.open = len(self.broker.get_orders_open())
+
+
+chkvals = ('-7798.89', 1624, 181)
+
+
+def test_run(main=False):
+    cerebro = bt.Cerebro()
+    for i in range(2):
+        cerebro.adddata(testcommon.getdata(i))
+
+    cerebro.addstrategy(RestingOrdersStrategy)
+    strat = cerebro.run()[0]
+    vals = (strat.value, strat.executed, strat.open)
+    if main:
+        print(vals)
+    else:
+        assert vals == chkvals
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import datetime
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+import testcommon
+
+import backtrader as bt
+
+ORDER_HISTORY = [
+    ('2006-02-06', 1, 3678.87, 0),
+    ('2006-02-06', 1, 3690.00, 'd1'),
+    ('2006-03-13', -1, 3801.03, None),
+    (datetime.date(2006, 3, 20), 1, 3833.25, 0),
+    ('2006-04-13T00:00:00', -1, 3777.24, 0),
+    (datetime.datetime(2006, 5, 2), -1, 3839.24, 'd1'),
+    ('2006-05-02', 1, 3839.24, 0),
+    ('2006-09-14', -1, 3809.08, 0),
+]
+
+FUND_HISTORY = [
+    ('2006-01-02', 100.0, 10000.0),
+    ('2006-03-01', 101.5, 10150.0),
+    (datetime.date(2006, 6, 1), 99.0, 9900.0),
+    ('2006-09-01T00:00:00', 104.0, 10400.0),
+]
+
+
+def columns(rows, names):
+    return dict(zip(names, map(list, zip(*rows))))
+
+
+class HistStrategy(bt.Strategy):
+    def start(self):
+        self.orders = list()
+        self.funds = list()
+
+    def notify_order(self, order):
+        if order.status == order.Completed:
+            self.orders.append((len(self), order.data._name,
+                                order.executed.size, order.executed.price))
+
+    def next(self):
+        self.funds.append((self.broker.get_fundvalue(),
+                           self.broker.getvalue()))
+
+
+def runhistory(orders, fund=None):
+    # the fund history is synchronized with the master data of next mode
+    cerebro = bt.Cerebro(runonce=fund is None)
+    cerebro.adddata(testcommon.getdata(0), name='d0')
+    cerebro.adddata(testcommon.getdata(0), name='d1')
+    cerebro.addstrategy(HistStrategy)
+    cerebro.add_order_history(orders, notify=True)
+    if fund is not None:
+        cerebro.set_fund_history(fund)
+
+    strat = cerebro.run()[0]
+    return strat.orders, strat.funds
+
+
+def test_run(main=False):
+    onames = ('datetime', 'size', 'price', 'data')
+    fnames = ('datetime', 'share_value', 'net_asset_value')
+
+    rorders, rfunds = runhistory(ORDER_HISTORY, FUND_HISTORY)
+    assert len(rorders) == len(ORDER_HISTORY)
+
+    corders, cfunds = runhistory(columns(ORDER_HISTORY, onames),
+                                 columns(FUND_HISTORY, fnames))
+    assert (corders, cfunds) == (rorders, rfunds)
+
+    # without the optional data column, all orders go to the 1st data
+    rows = [x[:3] for x in ORDER_HISTORY]
+    assert runhistory(columns(rows, onames[:3])) == runhistory(rows)
+
+    if pd is not None:
+        df = pd.DataFrame(ORDER_HISTORY, columns=onames)
+        df['datetime'] = [bt.brokers.bbroker._histdatetime(x)
+                          for x in df['datetime']]
+        df['data'] = [{0: 'd0', None: 'd0'}.get(x, x) for x in df['data']]
+        fdf = pd.DataFrame(FUND_HISTORY, columns=fnames)
+        fdf['datetime'] = pd.to_datetime(
+            [bt.brokers.bbroker._histdatetime(x) for x in fdf['datetime']])
+        fdf = fdf.set_index('datetime')
+        assert runhistory(df, fdf) == (rorders, rfunds)
+
+    if main:
+        for order in rorders:
+            print(order)
+        print(rfunds[-1])
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import math
+import random
+
+import testcommon
+
+import backtrader as bt
+
+
+class PositionsStrategy(bt.Strategy):
+    '''Opens, reverses and closes positions at random in some of the datas
+    and checks the index of open positions and the valuation of the broker
+    against walking all the positions'''
+    params = (('nanbar', 50),)
+
+    def start(self):
+        self.rnd = random.Random(11)
+        self.checked = 0
+        self.getposition(self.data2)  # flat position, ranked 1st
+
+    def next(self):
+        broker = self.broker
+        positems = [(d, p) for d, p in broker.positions.items() if p]
+        assert broker._positems == positems
+
+        value, lever = broker.get_value(), broker.get_leverage()
+        vlever, vmkt = broker.get_value(lever=True), broker.get_value(mkt=True)
+        fulldatas = list(broker.positions)
+
+        if len(self) == self.p.nanbar + 1:
+            # a flat data with a NaN close does not taint the value
+            assert math.isnan(self.data2.close[0])
+            assert not math.isnan(value)
+            fulldatas.remove(self.data2)
+
+        if len(fulldatas) > 1:  # a single data returns its own value
+            broker._get_value(datas=fulldatas)  # walk all positions
+            assert broker.get_value() == value
+            assert broker.get_leverage() == lever
+            assert broker.get_value(lever=True) == vlever
+            assert broker.get_value(mkt=True) == vmkt
+            self.checked += 1
+
+        if len(self) == self.p.nanbar:
+            self.data2.close[1] = float('NaN')
+
+        rnd = self.rnd
+        for data in [self.data0, self.data1]:
+            action = rnd.random()
+            if action < 0.3:
+                self.buy(data=data, size=rnd.randint(1, 3))
+            elif action < 0.6:
+                self.sell(data=data, size=rnd.randint(1, 3))
+            elif action < 0.8:
+                self.close(data=data)
+
+
+def test_run(main=False):
+    for runonce in [True, False]:
+        cerebro = bt.Cerebro(runonce=runonce)
+        cerebro.broker.set_cash(1000000)
+        for i in [0, 1, 0]:
+            cerebro.adddata(testcommon.getdata(i))
+
+        cerebro.addstrategy(PositionsStrategy)
+        strat = cerebro.run()[0]
+
+        if main:
+            print(runonce, strat.checked, cerebro.broker.get_value())
+        else:
+            assert strat.checked > 200
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import os.path
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+
+# data 0 and 1 go to the 1st shard and 2 and 3 to the 2nd: each shard sees the
+# same calendar as the unsharded run
+FILES = ['2006-day-001.txt', '2006-day-002.txt'] * 2
+CASH = 1000000.0
+
+
+class ShardStrategy(bt.Strategy):
+    '''Trades each data independently of the others'''
+    def __init__(self):
+        self.smas = [btind.SMA(d, period=10) for d in self.datas]
+
+    def next(self):
+        for d, sma in zip(self.datas, self.smas):
+            if not self.getposition(d).size:
+                if d.close[0] > sma[0]:
+                    self.buy(data=d)
+            elif d.close[0] < sma[0]:
+                self.close(data=d)
+
+
+def runshards(writer=False, **kwargs):
+    cerebro = bt.Cerebro(**kwargs)
+    if writer:
+        cerebro.addwriter(bt.WriterStringIO)
+    cerebro.broker.setcash(CASH)
+    for fname in FILES:
+        datapath = os.path.join(testcommon.modpath, testcommon.dataspath,
+                                fname)
+        cerebro.adddata(bt.feeds.BacktraderCSVData(dataname=datapath))
+
+    cerebro.addstrategy(ShardStrategy)
+    cerebro.addanalyzer(bt.analyzers.TradeAnalyzer)
+    return cerebro, cerebro.run()
+
+
+def test_run(main=False):
+    cerebro, strats = runshards()
+    value = '%.2f' % cerebro.broker.getvalue()
+    cash = '%.2f' % cerebro.broker.getcash()
+    trades = strats[0].analyzers[0].get_analysis().total.total
+
+    cerebro, results = runshards(shards=2)
+    result = results[0]
+    assert result.strategycls is ShardStrategy
+    assert len(result.shards) == 2
+    assert [len(sres.datas) for sres in result.shards] == [2, 2]
+    assert [sres.value[0] for sres in result.shards] == [CASH / 2] * 2
+
+    assert ('%.2f' % result.value[-1], '%.2f' % result.cash[-1]) == \
+        (value, cash)
+    assert sum(sres.analyzers[0].get_analysis().total.total
+               for sres in result.shards) == trades
+
+    # one data per shard with a declared allocation of the cash
+    cerebro, results = runshards(shards=4, shardalloc=[1, 1, 1, 2])
+    result = results[0]
+    assert len(result.shards) == 4
+    assert [sres.value[0] for sres in result.shards] == \
+        [CASH / 5] * 3 + [CASH * 2 / 5]
+    assert result.value[0] == CASH
+    assert result.datetime == sorted(result.datetime)
+
+    try:  # a weight is missing
+        runshards(shards=2, shardalloc=[1, 1, 1])
+    except ValueError as e:
+        assert 'shardalloc' in str(e)
+    else:
+        assert False, 'shardalloc with a missing weight accepted'
+
+    try:  # each shard would write its own output
+        runshards(writer=True, shards=2)
+    except ValueError as e:
+        assert 'writers' in str(e)
+    else:
+        assert False, 'writers accepted with shards'
+
+    if main:
+        print(value, cash, trades, len(result.datetime), result.value[-1])
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import datetime
+import os.path
+
+import testcommon
+
+import backtrader as bt
+
+
+class SyncStrategy(bt.Strategy):
+    '''Records the bars (and ticks) delivered by each data in each step'''
+    def start(self):
+        self.bars = list()
+
+    def prenext(self):
+        self.next()
+
+    def next(self):
+        self.bars.append(tuple(
+            (len(d), d.datetime[0], d.close[0], d.tick_close) if len(d)
+            else (0,)  # nothing delivered yet
+            for d in self.datas))
+
+
+def getdata(fname, **kwargs):
+    datapath = os.path.join(testcommon.modpath, testcommon.dataspath, fname)
+    return testcommon.DATAFEED(dataname=datapath, **kwargs)
+
+
+def runsync(daily='2006-day-002.txt', todate=datetime.datetime(2006, 9, 30),
+            **kwargs):
+    cerebro = bt.Cerebro(**kwargs)
+    # different calendars and ranges
+    cerebro.adddata(getdata('2006-day-001.txt'))
+    cerebro.adddata(getdata(daily,
+                            fromdate=datetime.datetime(2006, 3, 1),
+                            todate=todate))
+    cerebro.adddata(getdata('2006-week-001.txt',
+                            timeframe=bt.TimeFrame.Weeks))
+    cerebro.adddata(getdata('2006-month-001.txt',
+                            timeframe=bt.TimeFrame.Months))
+    cerebro.addstrategy(SyncStrategy)
+    return cerebro.run()[0].bars
+
+
+def test_run(main=False):
+    def notick(bars):  # ticks are only kept alike in next mode
+        return [[x[:3] for x in step] for step in bars]
+
+    bars = runsync(runonce=True, preload=True)  # heap in runonce
+    nextbars = runsync(runonce=False, preload=True)  # heap in runnext
+    loadbars = runsync(runonce=False, preload=False)  # bars on demand
+
+    if main:
+        print(len(bars), bars[-1])
+    else:
+        assert len(bars) == 256  # 2006-day-002 has dates not in data0
+
+    assert notick(bars) == notick(nextbars)
+    assert nextbars == loadbars
+
+    # oldsync uses data0 as the master clock: only comparable if it has
+    # all the dates of the other datas and none of them ends before it
+    kw = dict(daily='2006-day-001.txt', todate=testcommon.TODATE)
+    nextbars = runsync(runonce=False, preload=True, **kw)
+    for runonce in [True, False]:  # _runonce_old / _runnext_old
+        oldbars = runsync(runonce=runonce, preload=True, oldsync=True, **kw)
+        assert notick(oldbars) == notick(nextbars)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import os
+import os.path
+import shutil
+import tempfile
+
+import testcommon
+
+import backtrader as bt
+
+
+class CacheFeedStrategy(bt.Strategy):
+    def start(self):
+        self.vals = list()
+
+    def next(self):
+        self.vals.append(tuple(line[0] for line in self.data.lines))
+
+
+def runcache(datapath, cache, preload=True, todate=testcommon.TODATE,
+             **kwargs):
+    cerebro = bt.Cerebro(preload=preload)
+    data = testcommon.DATAFEED(dataname=datapath,
+                               fromdate=testcommon.FROMDATE,
+                               todate=todate,
+                               cache=cache,
+                               **kwargs)
+    cerebro.adddata(data)
+    cerebro.addstrategy(CacheFeedStrategy)
+    return cerebro.run()[0].vals
+
+
+def test_run(main=False):
+    srcpath = os.path.join(testcommon.modpath, testcommon.dataspath,
+                           '2005-2006-day-001.txt')
+
+    tmpdir = tempfile.mkdtemp()
+    try:
+        datapath = os.path.join(tmpdir, 'data.txt')
+        shutil.copyfile(srcpath, datapath)
+        cachepath = datapath + bt.feed.CSVDataBase.CACHEEXT
+
+        parsed = runcache(datapath, cache=False)
+        assert not os.path.exists(cachepath)
+
+        recorded = runcache(datapath, cache=True)  # creates the cache
+        assert os.path.exists(cachepath)
+
+        replayed = runcache(datapath, cache=True)  # uses the cache
+        nextreplayed = runcache(datapath, cache=True, preload=False)
+
+        assert recorded == parsed
+        assert replayed == parsed
+        assert nextreplayed == parsed
+
+        # a change in the parsing params discards the cache
+        cerebro = bt.Cerebro()
+        data = testcommon.DATAFEED(dataname=datapath, cache=True,
+                                   sessionend=bt.datetime.time(17, 0))
+        cerebro.adddata(data)
+        cerebro.addstrategy(CacheFeedStrategy)
+        vals = cerebro.run()[0].vals
+        assert vals[0][0] != parsed[0][0]
+
+        # preloading stopped by todate still caches the entire file
+        todate = bt.datetime.datetime(2006, 6, 30)
+        os.remove(cachepath)
+        partial = runcache(datapath, cache=True, todate=todate)
+        assert os.path.exists(cachepath)
+        assert 0 < len(partial) < len(parsed)
+        assert partial == parsed[:len(partial)]
+        assert runcache(datapath, cache=True) == parsed
+
+        # without preloading the rest of the file is not parsed for it
+        os.remove(cachepath)
+        nextpartial = runcache(datapath, cache=True, preload=False,
+                               todate=todate)
+        assert nextpartial == partial
+        assert not os.path.exists(cachepath)
+
+        runcache(datapath, cache=True, preload=False)  # reaches the end
+        assert os.path.exists(cachepath)
+
+        # preloading from the cache does not go bar by bar
+        if bt.feed.np is not None:
+            def loadcache(self):
+                raise AssertionError('cache loaded bar by bar')
+
+            tzinput = 'US/Eastern'  # a plain value: the feed is cached
+            tzparsed = runcache(datapath, cache=False, tzinput=tzinput)
+            runcache(datapath, cache=True, tzinput=tzinput)  # record it
+
+            _loadcache = bt.feed.CSVDataBase._loadcache
+            bt.feed.CSVDataBase._loadcache = loadcache
+            try:
+                assert runcache(datapath, cache=True) == parsed
+                assert runcache(datapath, cache=True, todate=todate) == \
+                    partial
+                assert runcache(datapath, cache=True, tzinput=tzinput) == \
+                    tzparsed
+            finally:
+                bt.feed.CSVDataBase._loadcache = _loadcache
+
+        if main:
+            print('bars:', len(replayed), replayed[-1])
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
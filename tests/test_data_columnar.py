@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import array
+import os.path
+import shutil
+import tempfile
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+from backtrader.feeds import columnar
+
+
+class ColumnarStrategy(bt.Strategy):
+    def __init__(self):
+        self.sma = btind.SMA(self.data, period=15)
+
+    def start(self):
+        self.vals = list()
+
+    def next(self):
+        self.vals.append((self.data.datetime[0], self.data.close[0],
+                          self.data.volume[0], self.sma[0]))
+
+
+def runfeed(data, **kwargs):
+    cerebro = bt.Cerebro(**kwargs)
+    cerebro.adddata(data)
+    cerebro.addstrategy(ColumnarStrategy)
+    return cerebro.run()[0].vals
+
+
+class WriterStrategy(bt.Strategy):
+    params = (('path', None),)
+
+    def start(self):
+        self.cols = [array.array(str('d')) for x in columnar.COLUMNS]
+
+    def next(self):
+        for col, field in zip(self.cols, columnar.COLUMNS):
+            col.append(getattr(self.data.lines, field)[0])
+
+    def stop(self):
+        columnar.writebars(self.p.path, self.cols)
+
+
+def writefile(path):
+    # all bars of the source, the range is applied by the columnar feed
+    cerebro = bt.Cerebro()
+    cerebro.adddata(testcommon.getdata(0, fromdate=None, todate=None))
+    cerebro.addstrategy(WriterStrategy, path=path)
+    cerebro.run()
+
+
+def test_run(main=False):
+    tmpdir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmpdir, 'data.btbars')
+        writefile(path)
+
+        parsed = runfeed(testcommon.getdata(0))
+
+        kwargs = dict(fromdate=testcommon.FROMDATE, todate=testcommon.TODATE)
+        for ckwargs in [dict(), dict(preload=False), dict(runonce=False)]:
+            vals = runfeed(bt.feeds.ColumnarData(dataname=path, **kwargs),
+                           **ckwargs)
+            assert vals == parsed
+
+        if main:
+            print('bars:', len(parsed), parsed[-1])
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import os.path
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+
+try:
+    import pandas
+except ImportError:
+    pandas = None
+
+
+class PandasStrategy(bt.Strategy):
+    def __init__(self):
+        self.sma = btind.SMA(self.data, period=15)
+
+    def start(self):
+        self.vals = list()
+
+    def next(self):
+        self.vals.append((self.data.datetime[0], self.data.close[0],
+                          self.data.openinterest[0], self.sma[0]))
+
+
+def runpandas(datacls, dataframe, **kwargs):
+    cerebro = bt.Cerebro(**kwargs)
+    cerebro.adddata(datacls(dataname=dataframe,
+                            fromdate=testcommon.FROMDATE,
+                            todate=testcommon.TODATE))
+    cerebro.addstrategy(PandasStrategy)
+    return cerebro.run()[0].vals
+
+
+def test_run(main=False):
+    if pandas is None:
+        return  # the feeds need pandas
+
+    datapath = os.path.join(testcommon.modpath, testcommon.dataspath,
+                            '2005-2006-day-001.txt')
+    dataframe = pandas.read_csv(datapath, index_col=0, parse_dates=True)
+    dataframe.index += pandas.Timedelta(hours=16, seconds=30)
+    dataframe['OpenInterest'] = dataframe['OpenInterest'].astype(int)
+
+    for datacls in [bt.feeds.PandasData, bt.feeds.PandasDirectData]:
+        loaded = runpandas(datacls, dataframe, preload=False)  # bar by bar
+        for kwargs in [dict(), dict(runonce=False)]:
+            preloaded = runpandas(datacls, dataframe, **kwargs)
+            assert preloaded == loaded
+
+        if main:
+            print(datacls.__name__, len(loaded), loaded[-1])
+
+    # NaT is not a date: preloading fails as loading bar by bar does
+    index = dataframe.index.tolist()
+    index[300] = pandas.NaT
+    dataframe.index = pandas.DatetimeIndex(index)
+    for datacls in [bt.feeds.PandasData, bt.feeds.PandasDirectData]:
+        for kwargs in [dict(preload=False), dict()]:
+            try:
+                runpandas(datacls, dataframe, **kwargs)
+            except ValueError:
+                pass
+            else:
+                assert False, 'NaT loaded as a date'
+
+
+if __name__ == '__main__':
+    test_run(main=True)
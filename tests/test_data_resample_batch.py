@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import datetime
+import os.path
+
+import testcommon
+
+import backtrader as bt
+from backtrader.resamplerfilter import Resampler
+
+
+class ResampleBatchStrategy(bt.Strategy):
+    def start(self):
+        self.vals = list()
+
+    def next(self):
+        self.vals.append(tuple(line[0] for line in self.data.lines))
+
+
+def runresample(batch, runonce=True, sessionend=None, **kwargs):
+    datapath = os.path.join(testcommon.modpath, testcommon.dataspath,
+                            '2006-min-005.txt')
+    data = bt.feeds.BacktraderCSVData(dataname=datapath,
+                                      timeframe=bt.TimeFrame.Minutes,
+                                      compression=5,
+                                      sessionend=sessionend)
+    data.resample(**kwargs)
+
+    cerebro = bt.Cerebro(runonce=runonce)
+    cerebro.adddata(data)
+    cerebro.addstrategy(ResampleBatchStrategy)
+
+    Resampler._batch = batch
+    try:
+        return cerebro.run()[0].vals
+    finally:
+        Resampler._batch = True
+
+
+def test_run(main=False):
+    configs = [
+        dict(timeframe=bt.TimeFrame.Minutes, compression=15),
+        dict(timeframe=bt.TimeFrame.Minutes, compression=60, rightedge=False),
+        dict(timeframe=bt.TimeFrame.Minutes, compression=7, bar2edge=False),
+        dict(timeframe=bt.TimeFrame.Days, compression=1),
+        dict(timeframe=bt.TimeFrame.Days, compression=2,
+             sessionend=datetime.time(17, 15)),
+        dict(timeframe=bt.TimeFrame.Weeks, compression=1),
+        dict(timeframe=bt.TimeFrame.Months, compression=2),
+    ]
+
+    for kwargs in configs:
+        vals = runresample(False, **kwargs)  # bar by bar
+        assert vals
+        for runonce in [True, False]:
+            assert runresample(True, runonce=runonce, **kwargs) == vals
+
+        if main:
+            print(kwargs, len(vals), vals[-1])
+
+
+if __name__ == '__main__':
+    test_run(main=True)
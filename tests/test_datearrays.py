@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import datetime
+import operator
+import random
+
+import testcommon
+
+from backtrader import npsupport
+from backtrader.utils import dateintern
+from backtrader.utils.dateintern import (date2num, num2date, date2numarray,
+                                         num2datearray)
+
+try:
+    import pytz
+except ImportError:
+    pytz = None
+
+
+def getdatetimes(rnd, n):
+    base = datetime.datetime(1950, 1, 1)
+    dts = [base + datetime.timedelta(microseconds=rnd.randint(0, 10 ** 17))
+           for i in range(n)]
+
+    # dst transitions (around 1-2 am) in 15 minutes steps and session ends
+    dtmin = datetime.datetime(2016, 3, 1)
+    dts += [dtmin + datetime.timedelta(minutes=15 * i)
+            for i in range(4 * 24 * 250)]
+    dts += [datetime.datetime.combine(dtmin.date(), dateintern.TIME_MAX) +
+            datetime.timedelta(days=i) for i in range(500)]
+    return dts
+
+
+def test_run(main=False):
+    if npsupport.np is None:
+        return  # nothing to be vectorized
+
+    np = npsupport.np
+    dts = getdatetimes(random.Random(2017), 5000)
+    values = np.array(dts, dtype='datetime64[us]')
+
+    nums = [date2num(x) for x in dts]
+    assert date2numarray(values).tolist() == nums
+    assert num2datearray(nums).tolist() == [num2date(x) for x in nums]
+
+    tzs = [dateintern.UTC]
+    if pytz is not None:
+        tzs += [pytz.timezone('US/Eastern'), pytz.timezone('Europe/Berlin')]
+
+    for tz in tzs:
+        tznums = [date2num(tz.localize(x)) for x in dts]
+        assert date2numarray(values, tz=tz).tolist() == tznums
+
+        assert num2datearray(nums, tz=tz).tolist() == \
+            [num2date(x, tz=tz) for x in nums]
+
+        src = np.array(nums)
+        tm = datetime.time(11, 30)
+        vals = npsupport.timeop(operator.lt, src, tm, 0, len(src), tz=tz)
+        assert vals.tolist() == \
+            [float(num2date(x, tz=tz).time() < tm) for x in nums]
+
+    if main:
+        print('datetimes checked:', len(dts), 'timezones:', len(tzs))
+
+
+if __name__ == '__main__':
+    test_run(main=True)
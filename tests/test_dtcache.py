@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import testcommon
+
+import backtrader as bt
+
+
+class DtCacheStrategy(bt.Strategy):
+    def start(self):
+        self.checked = 0
+
+    def next(self):
+        dtline = self.data.datetime
+        dt = dtline.datetime()
+        assert dt == bt.num2date(dtline[0])
+        assert dtline.datetime() is dt  # decoded only once
+        assert dtline.date() == dt.date() and dtline.time() == dt.time()
+
+        if len(self.data) > 1:
+            assert dtline.datetime(-1) == bt.num2date(dtline[-1])
+
+        self.checked += 1
+
+
+def test_run(main=False):
+    for runonce in [True, False]:
+        cerebro = bt.Cerebro(runonce=runonce)
+        cerebro.adddata(testcommon.getdata(0))
+        cerebro.addstrategy(DtCacheStrategy)
+        strat = cerebro.run()[0]
+        assert strat.checked == len(strat.data)
+
+        if main:
+            print('bars checked:', strat.checked)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import datetime
+import os.path
+
+import testcommon
+
+import backtrader as bt
+from backtrader import feed
+from backtrader.utils import dateintern
+
+try:
+    import pytz
+except ImportError:
+    pytz = None
+
+
+class CountingCSVData(testcommon.DATAFEED):
+    '''Counts the lines parsed from the file'''
+    def _loadline(self, linetokens):
+        self.parsed += 1
+        return super(CountingCSVData, self)._loadline(linetokens)
+
+    def start(self):
+        self.parsed = 0
+        super(CountingCSVData, self).start()
+
+
+def loaddata(tz, bulk):
+    datapath = os.path.join(testcommon.modpath, testcommon.dataspath,
+                            testcommon.datafiles[0])
+    data = CountingCSVData(dataname=datapath, tzinput=tz,
+                           fromdate=datetime.datetime(2006, 3, 1),
+                           todate=datetime.datetime(2006, 6, 30))
+
+    np = feed.np
+    if not bulk:
+        feed.np = None  # tzinput applied to each bar during the load
+    try:
+        cerebro = bt.Cerebro(preload=True)
+        cerebro.adddata(data)
+        cerebro.run()
+    finally:
+        feed.np = np
+
+    return [tuple(line.array) for line in data.lines], data.parsed
+
+
+def test_run(main=False):
+    if feed.np is None:
+        return  # tzinput is only applied in bulk with numpy
+
+    tzs = [dateintern.UTC]
+    if pytz is not None:
+        tzs += [pytz.timezone('US/Eastern'), pytz.timezone('Asia/Tokyo')]
+
+    for tz in tzs:
+        bars, parsed = loaddata(tz, bulk=True)
+        bars1, parsed1 = loaddata(tz, bulk=False)
+
+        assert bars == bars1
+        # loading stops right after todate also in bulk mode
+        assert parsed == parsed1 < 255
+
+        if main:
+            print(tz, len(bars[0]), parsed)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
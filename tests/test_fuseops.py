@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+from backtrader import npsupport
+
+
+class RunStrategy(bt.Strategy):
+    def __init__(self):
+        d = self.data
+        self.hl = d.high - d.low
+        self.ratio = self.hl / (d.close + d.open) * 100.0
+        self.cmp = abs(d.close - d.open) > self.hl / 2.0
+        self.sma = btind.SMA(d.close - d.open, period=10)
+
+    def start(self):
+        self.vals = list()
+
+    def next(self):
+        self.vals.append((self.ratio[0], self.cmp[0], self.sma[0]))
+
+
+def runfused(fuseops):
+    cerebro = bt.Cerebro(fuseops=fuseops)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.addstrategy(RunStrategy)
+    return cerebro.run()[0]
+
+
+def test_run(main=False):
+    nps = npsupport.np
+    try:
+        for np in set([None, nps]):  # fused python loop and numpy
+            npsupport.np = np
+            strat = runfused(False)
+            stfused = runfused(True)
+
+            assert str(stfused.vals) == str(strat.vals)  # nan != nan
+
+            # intermediate nodes are not materialized unless accessed
+            assert 'array' not in stfused.ratio.a.__dict__
+            # accessing it materializes the values of the regular calculation
+            assert list(stfused.hl.array) == list(strat.hl.array)
+    finally:
+        npsupport.np = nps
+
+    if main:
+        print('values:', len(stfused.vals), stfused.vals[-1])
+
+
+if __name__ == '__main__':
+    test_run(main=True)
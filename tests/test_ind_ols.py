@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+from fractions import Fraction
+import os.path
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+
+PERIOD = 20
+FILES = ['orcl-2003-2005.txt', 'yhoo-2003-2005.txt']
+
+
+def olsref(xs, ys):
+    '''Regression of ys on xs with exact (rational) arithmetic'''
+    xs, ys = [Fraction(x) for x in xs], [Fraction(y) for y in ys]
+    n = len(xs)
+    sx, sy = sum(xs), sum(ys)
+    sxx = sum(x * x for x in xs)
+    sxy = sum(x * y for x, y in zip(xs, ys))
+    beta = (n * sxy - sx * sy) / (n * sxx - sx * sx)
+    alpha = (sy - beta * sx) / n
+    return float(alpha), float(beta)
+
+
+class OLSStrategy(bt.Strategy):
+    def __init__(self):
+        self.slint = btind.OLS_Slope_InterceptN(period=PERIOD)
+        self.slint2 = btind.OLS_Slope_InterceptN(period=PERIOD,
+                                                 prepend_constant=False)
+        self.beta = btind.OLS_BetaN(period=PERIOD)
+        self.transf = btind.OLS_TransformationN(period=PERIOD)
+
+    def start(self):
+        self.vals = list()
+
+    def next(self):
+        vals = [self.slint.slope[0], self.slint.intercept[0],
+                self.slint2.slope[0], self.slint2.intercept[0],
+                self.beta[0], self.transf.zscore[0]]
+        self.vals.append(vals)
+
+        # the parameters are in the order of statsmodels: constant first
+        alpha, beta = olsref(self.data1.get(size=PERIOD),
+                             self.data0.get(size=PERIOD))
+        assert abs(vals[0] - alpha) <= 1e-9 * abs(alpha)
+        assert abs(vals[1] - beta) <= 1e-9 * abs(beta) + 1e-12
+        assert vals[2:5] == [vals[1], vals[0], vals[1]]
+
+
+def runols(**kwargs):
+    cerebro = bt.Cerebro(**kwargs)
+    for fname in FILES:
+        datapath = os.path.join(testcommon.modpath, testcommon.dataspath,
+                                fname)
+        cerebro.adddata(bt.feeds.YahooFinanceCSVData(dataname=datapath))
+
+    cerebro.addstrategy(OLSStrategy)
+    return cerebro.run()[0].vals
+
+
+def test_run(main=False):
+    vals = runols()
+    assert vals
+    # rolling sums in next mode deliver the same values as in once mode
+    assert runols(runonce=False) == vals
+    assert runols(runonce=False, preload=False) == vals
+
+    if main:
+        print(len(vals), vals[-1])
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+from backtrader import indicator
+from backtrader.indicator import linedigest
+
+
+class CountingAverage(bt.Indicator):
+    lines = ('avg',)
+    params = (('period', 20),)
+
+    calls = 0  # number of calculated values
+    onces = 0  # number of calculations in once mode
+
+    def __init__(self):
+        self.addminperiod(self.p.period)
+
+    def _once(self):
+        CountingAverage.onces += 1
+        super(CountingAverage, self)._once()
+
+    def next(self):
+        CountingAverage.calls += 1
+        self.lines.avg[0] = sum(self.data.get(size=self.p.period)) / \
+            self.p.period
+
+
+class DistanceToAverage(bt.Indicator):
+    '''Composite indicator: the average is calculated by a child'''
+    lines = ('dist',)
+    params = (('period', 20),)
+
+    def __init__(self):
+        self.avg = CountingAverage(self.data, period=self.p.period)
+        self.lines.dist = self.data - self.avg
+
+
+class CacheStrategy(bt.Strategy):
+    params = (('period', 20), ('other', 0))
+
+    def __init__(self):
+        self.dist = DistanceToAverage(self.data, period=self.p.period)
+        self.macd = btind.MACD(self.data)
+
+    def start(self):
+        digests.append(None)  # a new run
+
+
+digests = list()  # ids of the lines hashed in each run
+
+
+def countdigest(line):
+    digests.append(id(line))
+    return linedigest(line)
+
+
+def runcache(indcache):
+    CountingAverage.calls = CountingAverage.onces = 0
+    cerebro = bt.Cerebro(maxcpus=1, optreturn=False, indcache=indcache)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.optstrategy(CacheStrategy, period=(20, 30), other=range(4))
+    strats = [x[0] for x in cerebro.run()]
+    vals = [(list(x.dist.array), list(x.dist.avg.array),
+             list(x.macd.macd.array), list(x.macd.signal.array))
+            for x in strats]
+    return CountingAverage.calls, CountingAverage.onces, vals
+
+
+def checkkey():
+    cerebro = bt.Cerebro(indcache=100)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.addstrategy(CacheStrategy)
+    strat = cerebro.run()[0]
+
+    # values changed in place change the key
+    rkey = strat.dist._resultkey()
+    close = strat.data.close
+    oldval, close.array[10] = close.array[10], 0.0
+    assert strat.dist._resultkey() != rkey
+    close.array[10] = oldval
+    assert strat.dist._resultkey() == rkey
+
+    # the storage is part of the key
+    npstorage = bt.LineBuffer._npstorage
+    bt.LineBuffer._npstorage = not npstorage
+    try:
+        assert strat.dist._resultkey() != rkey
+    finally:
+        bt.LineBuffer._npstorage = npstorage
+
+
+def test_run(main=False):
+    checkkey()
+
+    calls, onces, vals = runcache(0)
+
+    indicator.linedigest = countdigest
+    try:
+        del digests[:]
+        callscache, oncescache, valscache = runcache(100)
+    finally:
+        indicator.linedigest = linedigest
+
+    assert str(valscache) == str(vals)  # nan != nan
+    # only the 1st combination of each period calculates, the others do not
+    # even calculate the child of the composite indicator
+    assert callscache == calls // 4
+    assert (onces, oncescache) == (8, 2)
+
+    # each line is hashed at most once in a run
+    runs = ' '.join(str(x) for x in digests).split('None')
+    assert len(runs) == 1 + 8
+    for run in runs:
+        assert len(run.split()) == len(set(run.split()))
+
+    if main:
+        print('calculated values:', calls, callscache)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import os.path
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+
+FILES = [
+    (bt.feeds.YahooFinanceCSVData, 'orcl-2003-2005.txt'),
+    (bt.feeds.YahooFinanceCSVData, 'yhoo-2003-2005.txt'),
+    (bt.feeds.BacktraderCSVData, '2006-day-001.txt'),
+    (bt.feeds.BacktraderCSVData, '2006-day-002.txt'),
+]
+
+
+class IndWorkersStrategy(bt.Strategy):
+    def __init__(self):
+        self.inds = list()
+        for d in self.datas:
+            sma = btind.SMA(d, period=15)
+            inds = [
+                sma,
+                btind.Stochastic(d, period=10),
+                btind.MACDHisto(d),
+                btind.ErrorCorrecting(d),  # calculated with next
+                btind.CrossOver(d.close, sma),
+                (d.high - d.low) / d.close,
+            ]
+            self.inds.append(inds)
+
+        # reads the indicators of two datas (with the same dates)
+        self.spread = self.inds[0][0] - self.inds[1][0]
+
+    def start(self):
+        self.groups = len(self._oncegroups())
+        self.vals = list()
+
+    def next(self):
+        vals = [x[0] for inds in self.inds for ind in inds for x in ind.lines]
+        vals.append(self.spread[0])
+        self.vals.append(['%.8f' % x for x in vals])
+
+
+def runworkers(indworkers, linestorage='array'):
+    cerebro = bt.Cerebro(indworkers=indworkers, linestorage=linestorage)
+    for feedcls, fname in FILES:
+        datapath = os.path.join(testcommon.modpath, testcommon.dataspath,
+                                fname)
+        cerebro.adddata(feedcls(dataname=datapath))
+
+    cerebro.addstrategy(IndWorkersStrategy)
+    strat = cerebro.run()[0]
+    return strat.vals, strat.groups
+
+
+def test_run(main=False):
+    linestorages = ['array'] if np is None else ['array', 'numpy']
+    for linestorage in linestorages:
+        vals, groups = runworkers(1, linestorage)
+        assert vals
+        # one group per data (moved by the indicator calculated with next),
+        # but data0 and data1 are together because of the spread
+        assert groups == len(FILES) - 1
+
+        assert runworkers(4, linestorage) == (vals, groups)
+
+        if main:
+            print(linestorage, groups, len(vals), vals[-1][:4])
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import datetime
+import operator
+
+import testcommon
+
+import backtrader as bt
+from backtrader import npsupport
+
+
+class OpsStrategy(bt.Strategy):
+    '''Creates operations of all kinds on the lines of the data'''
+    def __init__(self):
+        c, o = self.data.close, self.data.open
+        self.ops = [
+            # line against line: _once_op
+            c + o, c - o, c * o, c / o,
+            c < o, c > o, c <= o, c >= o, c == o, c != o,
+            # line against value: _once_val_op and _once_val_op_r
+            c + 1.5, c / 3.0, c > 3700.0, c == 3700.0,
+            1.5 - c, 3700.0 / c,
+            # single operand: LineOwnOperation
+            abs(c - o), -c,
+            # time of the day: _once_time_op
+            self.data.datetime < datetime.time(12),
+            self.data.datetime >= datetime.time(12),
+            # delay: shiftop
+            c(-1), o(-5),
+            # equal operands (and NaN only in the comparisons with NaN)
+            c < c, c <= c, c > c, c >= c, c == c, c != c,
+        ]
+
+
+def sameval(x, y):
+    return x == y or (x != x and y != y)  # NaN is the same as NaN
+
+
+def calcop(op, vectorize):
+    '''Calculates the "once" operation again, vectorized (if numpy is
+    available) or in the python loop, and returns the results'''
+    start, end = op._minperiod - 1, op.buflen()
+    for i in range(start, end):
+        op.array[i] = -1.0  # discard previous results
+
+    np = npsupport.np
+    if not vectorize:
+        npsupport.np = None  # the vectorized functions give up
+
+    try:
+        op.once(start, end)
+    finally:
+        npsupport.np = np
+
+    return list(op.array[start:end])
+
+
+def checkops(ops):
+    for op in ops:
+        vec, loop = calcop(op, True), calcop(op, False)
+        assert len(vec) == len(loop)
+        assert all(sameval(x, y) for x, y in zip(vec, loop))
+
+
+def test_run(main=False):
+    for linestorage in ['array', 'numpy']:
+        if linestorage == 'numpy' and npsupport.np is None:
+            continue
+
+        cerebro = bt.Cerebro(runonce=True, linestorage=linestorage)
+        cerebro.adddata(testcommon.getdata(0))
+        cerebro.addstrategy(OpsStrategy)
+        strat = cerebro.run()[0]
+        c, o = strat.data.close, strat.data.open
+
+        if npsupport.np is not None:  # make sure the loop is not compared
+            assert npsupport.binaryop(operator.add, c.array, o.array,
+                                      0, len(c.array)) is not None
+
+        checkops(strat.ops)
+
+        # NaN operands and comparisons with NaN
+        c.array[10] = o.array[20] = o.array[21] = float('NaN')
+        checkops(strat.ops)
+        assert calcop(strat.ops[9], True)[20] == 1.0  # x != NaN
+
+        # division by zero: not vectorized, the loop gives the result
+        o.array[30] = 0.0
+        if linestorage == 'numpy':
+            with npsupport.np.errstate(divide='ignore'):
+                checkops(strat.ops[3:4])  # numpy scalars deliver inf
+        else:
+            for vectorize in [True, False]:  # c / o raises in both cases
+                try:
+                    calcop(strat.ops[3], vectorize)
+                except ZeroDivisionError:
+                    pass
+                else:
+                    assert False, 'ZeroDivisionError not raised'
+
+        if main:
+            print(linestorage, 'operations checked:', len(strat.ops))
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class RunStrategy(bt.Strategy):
+    def __init__(self):
+        self.sma = btind.SMA(self.data, period=30)
+        self.diff = self.data.close - self.data.open
+
+    def start(self):
+        self.vals = list()
+
+    def next(self):
+        self.vals.append((self.sma[0], self.diff[0]))
+
+
+def runstorage(linestorage):
+    cerebro = bt.Cerebro(linestorage=linestorage)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.addstrategy(RunStrategy)
+    return cerebro.run()[0]
+
+
+def test_run(main=False):
+    if np is None:
+        return  # numpy storage is not available
+
+    starray = runstorage('array')
+    stnumpy = runstorage('numpy')
+
+    assert stnumpy.vals == starray.vals
+
+    assert isinstance(stnumpy.data.close.array, np.ndarray)
+    assert stnumpy.data.close.array.dtype == np.float64
+    assert isinstance(stnumpy.sma.lines.sma.array, np.ndarray)
+    assert not isinstance(starray.data.close.array, np.ndarray)
+
+    # the interface of the default storage is kept for slices
+    assert list(stnumpy.data.close.get(size=5)) == \
+        list(starray.data.close.get(size=5))
+
+    if main:
+        print('values:', len(stnumpy.vals), stnumpy.vals[-1])
+
+
+if __name__ == '__main__':
+    test_run(main=True)
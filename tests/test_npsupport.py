@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import array
+import math
+import random
+
+import testcommon
+
+from backtrader import npsupport
+
+
+def test_run(main=False):
+    if npsupport.np is None:
+        return  # nothing to be vectorized
+
+    rnd = random.Random(2017)
+    period = 30
+    prices = [round(rnd.uniform(3000.0, 4500.0), 2) for i in range(500)]
+    volumes = [float(rnd.randint(0, 10 ** 7)) for i in range(500)]
+
+    for vals in (prices, volumes):
+        src = array.array(str('d'), vals)
+
+        start, end = period - 1, len(src)
+        windows = [src[i - period + 1:i + 1] for i in range(start, end)]
+
+        fsums = npsupport.windowfsum(src, period, start, end)
+        assert fsums is not None
+        assert list(fsums) == [math.fsum(w) for w in windows]
+
+        assert list(npsupport.windowmax(src, period, start, end)) == \
+            [max(w) for w in windows]
+        assert list(npsupport.windowmin(src, period, start, end)) == \
+            [min(w) for w in windows]
+
+    # NaN makes the result order dependent: no vectorization
+    src[100] = float('NaN')
+    assert npsupport.windowmax(src, period, start, end) is None
+
+    # element-wise keeps the semantics of the built-ins
+    other = array.array(str('d'), [3500.0] * len(src))
+    vmax = npsupport.elementop(max, [src, other, 0.0], start, end)
+    pmax = [max(src[i], other[i], 0.0) for i in range(start, end)]
+    assert all(x == y or (x != x and y != y) for x, y in zip(vmax, pmax))
+
+    if main:
+        print('fsum windows checked:', len(windows))
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import testcommon
+
+import backtrader as bt
+
+
+class SchedStrategy(testcommon.CrossStrategy):
+    def stop(self):
+        self.bars = len(self)
+
+
+def objective(analyzers):
+    return analyzers.returns.get_analysis()['rtot']
+
+
+def getcerebro():
+    cerebro = bt.Cerebro(maxcpus=1, optreturn=False)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.addanalyzer(bt.analyzers.Returns, _name='returns')
+    cerebro.optstrategy(SchedStrategy, period=range(10, 26))
+    return cerebro
+
+
+def test_run(main=False):
+    full = dict((x[0].p.period, objective(x[0].analyzers))
+                for x in getcerebro().run())
+
+    # 16 run on 1/4 of the data -> 8 on 1/2 of the data -> 4 on all data
+    cerebro = getcerebro()
+    cerebro.optscheduler(bt.SuccessiveHalving, objective=objective,
+                         minfraction=0.25)
+    results = [x[0] for x in cerebro.run()]
+
+    assert len(results) == 4
+    for strat in results:
+        assert strat.bars == 255  # the entire data
+        assert objective(strat.analyzers) == full[strat.p.period]
+
+    cerebro = getcerebro()
+    cerebro.optscheduler(bt.SuccessiveHalving)  # no objective
+    try:
+        cerebro.run()
+    except ValueError:
+        pass
+    else:
+        assert False, 'SuccessiveHalving run without objective'
+
+    cerebro = getcerebro()
+    cerebro.optscheduler(bt.RandomSearch, samples=3, seed=5)
+    results = [x[0] for x in cerebro.run()]
+    assert len(results) == 3
+
+    try:
+        bt.RandomSearch(objective=objective)  # does not rank combinations
+    except TypeError:
+        pass
+    else:
+        assert False, 'RandomSearch accepted an objective'
+
+    if main:
+        print('sampled:', [x.p.period for x in results])
+
+
+if __name__ == '__main__':
+    test_run(main=True)
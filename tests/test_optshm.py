@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import testcommon
+
+import backtrader as bt
+from backtrader import shmsupport
+
+
+class ShmStrategy(testcommon.CrossStrategy):
+    def stop(self):
+        # the preloaded datas are read-only views in the worker processes
+        arr = self.data.close.array
+        self.shared = isinstance(arr, shmsupport.SharedArray) and \
+            not arr.flags.writeable
+        self.value = self.broker.getvalue()
+
+
+def runshm(optshm, maxcpus=2):
+    cerebro = bt.Cerebro(maxcpus=maxcpus, optshm=optshm, optreturn=False)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.optstrategy(ShmStrategy, period=range(10, 14))
+    return [strats[0] for strats in cerebro.run()], cerebro.datas[0]
+
+
+def checkrelease(maxcpus=2):
+    '''Runs with shared memory lines and checks that the segments are
+    released and the lines use private memory again'''
+    from multiprocessing import shared_memory
+
+    names = list()
+
+    def toshared(arr, _toshared=shmsupport.toshared):
+        shmarr = _toshared(arr)
+        names.append(shmarr._shmname)
+        return shmarr
+
+    shmsupport.toshared, _toshared = toshared, shmsupport.toshared
+    try:
+        try:
+            data = runshm(True, maxcpus)[1]
+        except ValueError:  # the pool cannot be created
+            data = None
+    finally:
+        shmsupport.toshared = _toshared
+
+    assert names  # the lines were moved to shared memory
+    assert not [key for key in shmsupport._segments if key[0] in names]
+    assert not shmsupport._closing  # no view kept alive
+    if data is not None:
+        assert not isinstance(data.close.array, shmsupport.SharedArray)
+
+    for name in names:
+        try:
+            shared_memory.SharedMemory(name=name)
+        except FileNotFoundError:
+            pass
+        else:
+            assert False, 'segment not unlinked'
+
+
+def test_run(main=False):
+    if not shmsupport.available():
+        return  # shared memory lines cannot be used
+
+    checkrelease()
+    checkrelease(maxcpus=-1)  # fails after moving the lines
+
+    strats = runshm(False)[0]
+    stshm = runshm(True)[0]
+
+    assert [x.value for x in stshm] == [x.value for x in strats]
+    assert all(x.shared for x in stshm)
+
+    if main:
+        print('values:', [x.value for x in stshm])
+
+
+if __name__ == '__main__':
+    test_run(main=True)
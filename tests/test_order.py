@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import testcommon
+
+import backtrader as bt
+from backtrader.order import OrderData, OrderExecutionBit
+
+
+class SnapshotStrategy(bt.Strategy):
+    '''Issues orders with custom info/attributes and checks that the
+    notifications are snapshots of the orders at notification time'''
+    def start(self):
+        self.orders = dict()
+        self.notified = list()
+
+    def notify_order(self, order):
+        orig = self.orders[order.ref]
+        assert order is not orig and order == orig
+        assert order.created is orig.created  # shared with the original
+        if orig.tag is None and order.status == order.Submitted:
+            # info first used in a notification, must reach the original
+            order.info.seen = True
+
+        assert order.info is orig.info
+        assert order.info.get('name') == orig.tag
+
+        pending = order.executed.getpending()
+        if order.status == order.Completed:
+            assert len(pending) == 1
+            assert pending[0] is orig.executed[-1]
+            assert pending[0].size == order.executed.size
+        else:
+            assert not pending
+
+        self.notified.append((order.ref, order.getstatusname()))
+
+    def next(self):
+        if len(self) % 25:
+            return
+
+        if self.position:
+            order = self.close()  # no custom info
+            order.tag = None
+        else:
+            order = self.buy(size=1, name='buy')
+            order.tag = order.info.name  # attributes can still be attached
+
+        self.orders[order.ref] = order
+
+    def stop(self):
+        for order in self.orders.values():
+            assert not order.alive()
+            assert len(order.executed) == 1
+            if order.tag is None:
+                assert order.info.seen
+
+
+def test_run(main=False):
+    # execution bits and order data hold no per-instance __dict__
+    for obj in [OrderData(), OrderExecutionBit()]:
+        assert not hasattr(obj, '__dict__')
+
+    cerebro = bt.Cerebro()
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.addstrategy(SnapshotStrategy)
+    strat = cerebro.run()[0]
+
+    statuses = [status for ref, status in strat.notified]
+    if main:
+        print(len(strat.orders), statuses[:3])
+    else:
+        assert len(strat.orders) == 10
+        assert statuses == ['Submitted', 'Accepted', 'Completed'] * 10
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import testcommon
+
+import backtrader as bt
+
+def getcerebro(maxcpus):
+    cerebro = bt.Cerebro(maxcpus=maxcpus)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.addanalyzer(bt.analyzers.Returns)
+    cerebro.optstrategy(testcommon.CrossStrategy, period=range(10, 16))
+    return cerebro
+
+
+def getvalues(runstrats):
+    return [(x[0].p.period, x[0].analyzers[0].get_analysis()['rtot'])
+            for x in runstrats]
+
+
+def test_run(main=False):
+    values = getvalues(getcerebro(maxcpus=1).run())
+
+    # single process and ordered delivery
+    assert getvalues(getcerebro(maxcpus=1).run_iter()) == values
+
+    # several processes with completion order delivery
+    runiter = getcerebro(maxcpus=2).run_iter(ordered=False, chunksize=2)
+    assert sorted(getvalues(runiter)) == values
+
+    if main:
+        print('values:', values)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import testcommon
+
+import backtrader as bt
+
+
+class OrderLog(bt.Analyzer):
+    '''Only consumes orders'''
+    def start(self):
+        self.rets = list()
+
+    def notify_order(self, order):
+        self.rets.append((order.ref, order.getstatusname()))
+
+
+class TradeLog(bt.Analyzer):
+    '''Only consumes trades and keeps an order consuming child'''
+    def __init__(self):
+        self.orderlog = OrderLog()
+
+    def start(self):
+        self.rets = list()
+
+    def notify_trade(self, trade):
+        self.rets.append((trade.ref, trade.status, trade.pnlcomm))
+
+
+class Silent(bt.Analyzer):
+    '''Consumes nothing'''
+    pass
+
+
+class NotifyStrategy(bt.Strategy):
+    def start(self):
+        self.orders = list()
+        self.trades = list()
+        self.cashvalues = 0
+
+    def notify_order(self, order):
+        self.orders.append((order.ref, order.getstatusname()))
+
+    def notify_trade(self, trade):
+        self.trades.append((trade.ref, trade.status, trade.pnlcomm))
+
+    def notify_cashvalue(self, cash, value):
+        self.cashvalues += 1
+
+    def next(self):
+        if len(self) % 10:
+            return
+
+        if self.position:
+            self.close()
+        else:
+            self.buy()
+
+
+def runstrat(quicknotify):
+    cerebro = bt.Cerebro(quicknotify=quicknotify)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.addstrategy(NotifyStrategy)
+    cerebro.addanalyzer(OrderLog, _name='orderlog')
+    cerebro.addanalyzer(TradeLog, _name='tradelog')
+    cerebro.addanalyzer(Silent, _name='silent')
+    return cerebro.run()[0]
+
+
+def test_run(main=False):
+    strats = [runstrat(quicknotify) for quicknotify in [False, True]]
+
+    for strat in strats:
+        orderlog = strat.analyzers.orderlog
+        tradelog = strat.analyzers.tradelog
+        silent = strat.analyzers.silent
+
+        # only those consuming a notification receive it
+        assert strat._anordernotifiers == [orderlog.notify_order,
+                                           tradelog.orderlog.notify_order]
+        assert strat._tradenotifiers == [strat.notify_trade,
+                                         tradelog.notify_trade]
+        assert strat._cashnotifiers == [([strat.notify_cashvalue], [])]
+        assert not silent._notifiers('order')
+
+        # and all of them see the same notifications
+        assert strat.orders == orderlog.rets == tradelog.orderlog.rets
+        assert strat.trades == tradelog.rets
+        if main:
+            print(len(strat.orders), len(strat.trades), strat.cashvalues)
+        else:
+            assert len(strat.orders) == 75
+            assert len(strat.trades) == 25
+            assert strat.cashvalues == 255
+
+    # refs are global counters, compare the rest
+    for attr in ['orders', 'trades']:
+        vals = [[x[1:] for x in getattr(strat, attr)] for strat in strats]
+        assert vals[0] == vals[1]
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015, 2016, 2017 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import testcommon
+
+import backtrader as bt
+from backtrader.trade import Trade, TradeHistory
+
+
+class FakeData(object):
+    '''Minimal interface for a standalone trade'''
+    _tz = None
+
+    def __len__(self):
+        return 0
+
+    @property
+    def datetime(self):
+        return [0.0]
+
+    @property
+    def close(self):
+        return [0.0]
+
+
+class HistoryStrategy(bt.Strategy):
+    def start(self):
+        self.closed = list()
+
+    def notify_trade(self, trade):
+        if trade.isclosed:
+            self.closed.append(trade)
+
+    def next(self):
+        if len(self) % 10:
+            return
+
+        if not self.position:
+            self.buy(size=2)
+        elif self.position.size < 4:
+            self.buy(size=2)
+        else:
+            self.sell(size=4)
+
+
+def test_run(main=False):
+    cerebro = bt.Cerebro(tradehistory=True)
+    cerebro.broker.setcash(100000.0)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.addstrategy(HistoryStrategy)
+    strat = cerebro.run()[0]
+
+    tradelog = strat.gettradelog()
+    nevents = 0
+    for trade in strat.closed:
+        history = trade.history
+        assert len(history) == 3  # open, increase, close
+        assert history[0].status.status == Trade.Open
+        assert history[-1].status.status == Trade.Closed
+        assert history[-1].status.pnlcomm == trade.pnlcomm
+        assert [h.event.size for h in history] == [2, 2, -4]
+        assert [h.status.size for h in history[1:]] == [4, 0]
+        assert all(isinstance(h, TradeHistory) for h in history)
+
+        for h, idx in zip(history, history.rows):
+            assert tradelog.ref[idx] == trade.ref
+            assert tradelog.dt[idx] == h.status.dt
+            assert tradelog.orders[idx] is h.event.order
+
+        nevents += len(history)
+
+    # the log holds the columns for all events of all trades
+    if main:
+        print(len(strat.closed), len(tradelog), sum(tradelog.pnlcomm))
+    else:
+        assert len(strat.closed) == 8
+        assert len(tradelog) == nevents + 1  # last trade still open
+        assert '%.2f' % sum(tradelog.pnlcomm) == '733.46'
+
+    # without history no log is created
+    cerebro = bt.Cerebro()
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.addstrategy(HistoryStrategy)
+    strat = cerebro.run()[0]
+    assert strat.gettradelog() is None
+    assert not any(trade.history for trade in strat.closed)
+
+    # standalone trades, with float sizes, keep their own log
+    data = FakeData()
+    trade = Trade(data=data, historyon=True)
+    comminfo = bt.CommissionInfo()
+    order = bt.BuyOrder(data=data, size=0.5, price=10.0, simulated=True)
+    trade.update(order, 1, 10.0, 10.0, 0.0, 0.0, comminfo)
+    trade.update(order, 0.5, 12.0, 6.0, 0.0, 0.0, comminfo)
+    assert [h.event.size for h in trade.history] == [1.0, 0.5]
+    assert trade.history[1].status.size == 1.5
+    assert len(trade.history.tradelog) == 2
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -116,6 +116,22 @@ def runtest(datas,
     return cerebros
 
 
+class CrossStrategy(bt.Strategy):
+    '''Goes long when the close crosses over its moving average and closes
+    the position when it crosses under it'''
+    params = (('period', 15),)
+
+    def __init__(self):
+        sma = bt.indicators.SMA(self.data, period=self.p.period)
+        self.cross = bt.indicators.CrossOver(self.data.close, sma)
+
+    def next(self):
+        if self.cross > 0.0:
+            self.buy()
+        elif self.cross < 0.0:
+            self.close()
+
+
 class TestStrategy(bt.Strategy):
     params = dict(main=False,
                   chkind=[],
@@ -22,6 +22,7 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
 import argparse
+import array
 import datetime
 import os.path
 import time
@@ -29,6 +30,7 @@ import sys
 
 
 import backtrader as bt
+from backtrader.feeds import columnar
 from backtrader.utils.py3 import bytes
 
 
@@ -93,6 +95,30 @@ class RewriteStrategy(bt.Strategy):
         self.f.write(bytes(txt))
 
 
+class ColumnarStrategy(bt.Strategy):
+    '''Writes the bars to the native columnar format of ``ColumnarData``'''
+    params = (
+        ('outfile', None),
+    )
+
+    def start(self):
+        self.cols = [array.array(str('d')) for x in columnar.COLUMNS]
+        self.dlines = [getattr(self.data.lines, x) for x in columnar.COLUMNS]
+
+    def next(self):
+        for col, dline in zip(self.cols, self.dlines):
+            col.append(dline[0])
+
+    def stop(self):
+        columnar.writebars(self.p.outfile, self.cols)
+
+
+OUTFORMATS = dict(
+    btcsv=RewriteStrategy,
+    columnar=ColumnarStrategy,
+)
+
+
 def runstrat(pargs=None):
     args = parse_args(pargs)
 
@@ -123,9 +149,14 @@ def runstrat(pargs=None):
     data = dfcls(dataname=args.infile, **dfkwargs)
     cerebro.adddata(data)
 
-    cerebro.addstrategy(RewriteStrategy,
-                        separator=args.separator,
-                        outfile=args.outfile)
+    skwargs = dict(outfile=args.outfile)
+    if args.outformat == 'columnar':
+        if args.outfile is None:
+            raise ValueError('An output file is needed for columnar')
+    else:
+        skwargs['separator'] = args.separator
+
+    cerebro.addstrategy(OUTFORMATS[args.outformat], **skwargs)
 
     cerebro.run(stdstats=False)
 
@@ -141,7 +172,8 @@ def runstrat(pargs=None):
 def parse_args(pargs=None):
     parser = argparse.ArgumentParser(
         formatter_class=argparse.ArgumentDefaultsHelpFormatter,
-        description='Rewrite formats to BacktraderCSVData format')
+        description=('Rewrite formats to BacktraderCSVData format or to the '
+                     'native columnar format of ColumnarData'))
 
     parser.add_argument('--format', '-fmt', required=False,
                         choices=DATAFORMATS.keys(),
@@ -154,6 +186,10 @@ def parse_args(pargs=None):
     parser.add_argument('--outfile', '-o', default=None, required=False,
                         help='File to write to')
 
+    parser.add_argument('--outformat', '-ofmt', required=False,
+                        choices=OUTFORMATS.keys(), default='btcsv',
+                        help='Format of the output file')
+
     parser.add_argument('--fromdate', '-f', required=False,
                         help='Starting date in YYYY-MM-DD format')
 